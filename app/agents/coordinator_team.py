@@ -1,37 +1,135 @@
-from agno.team.team import Team
-from agno.models.groq import Groq
-from agno.tools.reasoning import ReasoningTools
-from agents.memory_agent import MemoryAgent
-from agents.knowledge_agent import KnowledgeAgent
-from agents.rag_agent import RAGAgent
+from agents.registry import AgentRegistry, lazy
+from agents.mcp_client import MCPClient
+from agents import router
+from agents.router import IntentRouter
 import os
 import re
 import asyncio
-import json
 import sys
-from groq import Groq as GroqClient
-from utils.db import get_chat_history
+import time
+from utils.db import DEFAULT_SESSION, get_chat_history
+from utils.aio import iterate_with_timeout, read_prefix, run_blocking, stream_blocking
+from utils.symbols import SessionSymbolCache, get_resolver
+from utils.llm_cache import context_hash, get_llm_cache
+from utils.context import ContextManager, ConversationContext
+from utils.recall import RECALL_HISTORY, RecallManager
+from utils import bars
+from utils.dates import DateParser, format_day
+from utils.market_data import format_dates
+from utils.metrics import RequestProfiler, get_metrics, span
 
-class MCPClient:
-    def __init__(self):
-        self.loop = asyncio.get_event_loop()
+FALLBACK_MODEL = "qwen-qwq-32b"
+# Follow-ups like "what about it?" depend on the conversation, so their cache key includes the history
+REFERENTIAL = re.compile(r"\b(?:it|its|that|this|they|them|their|he|she|his|her|those|these|above|same)\b", re.IGNORECASE)
+
+# Seconds each stage of process_query may take before it is skipped or reported as timed out;
+# for streamed answers the limit applies to the wait for each chunk
+STAGE_TIMEOUTS = {
+    "history": 5,
+    "memory": 45,
+    "knowledge": 45,
+    "rag": 90,
+    "mcp": 30,
+    "fallback": 60,
+}
+# Characters of a MemoryAgent answer read before deciding whether it found anything
+MEMORY_PREFIX_CHARS = 80
+
+async def _single(text):
+    yield text
+
+# Historical answers: ranges longer than these many days are listed as weekly, then monthly bars
+HISTORY_INTERVALS = ((93, "1d"), (2 * 365, "1wk"))
+# Bars listed in one answer, the most recent ones; the summary line still covers the whole range
+HISTORY_MAX_BARS = 120
+
+def history_params(expr):
+    """fetch_historical_data output options for a parsed date range (None: the default month)."""
+    days = (expr.end - expr.start).days if expr is not None else 0
+    interval = next((interval for limit, interval in HISTORY_INTERVALS if days <= limit), "1mo")
+    return {"interval": interval, "format": "packed", "summary": True, "limit": HISTORY_MAX_BARS, "tail": True}
+
+def is_history(result):
+    return isinstance(result, list) or (isinstance(result, dict) and "data" in result)
 
-    async def send(self, method, params):
-        request = json.dumps({"method": method, "params": params})
-        sys.stdout.write(request + "\n")
-        sys.stdout.flush()
-        response_json = await self.loop.run_in_executor(None, sys.stdin.readline)
-        response = json.loads(response_json.strip())
-        return response.get("response", response.get("error", "Error"))
+def format_history(result):
+    """Chat text for a fetch_historical_data result, either plain rows or a columnar payload."""
+    if isinstance(result, list):
+        return "\n".join([f"{d['Date']}: Open=${d['Open']:.2f}, Close=${d['Close']:.2f}" for d in result])
+    series = bars.decode(result["data"], result["format"])
+    lines = [
+        f"{d}: Open=${o:.2f}, Close=${c:.2f}"
+        for d, o, c in zip(format_dates(series['Date']), series['Open'].tolist(), series['Close'].tolist())
+    ]
+    if result.get("next_cursor") is not None:
+        # Earlier bars were left out when paging back from the newest one, later ones otherwise
+        if result.get("tail"):
+            lines.insert(0, "...")
+        else:
+            lines.append("...")
+    summary = result.get("summary") or {}
+    if summary.get("last_close") is not None:
+        change = f" ({summary['change_pct']:+.2f}%)" if summary.get("change_pct") is not None else ""
+        lines.append(
+            f"{summary['start']} to {summary['end']}: Close ${summary['first_close']:.2f} -> ${summary['last_close']:.2f}{change}, "
+            f"high ${summary['high']:.2f}, low ${summary['low']:.2f}, {summary['count']} trading days"
+        )
+    return "\n".join(lines)
+
+def format_indicators(symbol, result):
+    """Chat text for a compute_indicators result."""
+    values = ", ".join(
+        f"{name} = {value:.2f}" if value is not None else f"{name} = n/a (not enough data)"
+        for name, value in result["latest"].items()
+    )
+    close = f" (close ${result['close']:.2f})" if result.get("close") is not None else ""
+    return f"{symbol} on {result['as_of']}{close}: {values}"
 
 class ReasoningStockTeam:
     def __init__(self):
-        self.memory_agent = MemoryAgent()
-        self.knowledge_agent = KnowledgeAgent()
-        self.rag_agent = RAGAgent()
-        self.groq_client = GroqClient(api_key=os.getenv("GROQ_API_KEY"))
+        self.agents = AgentRegistry({
+            "memory": lazy("agents.memory_agent", "MemoryAgent"),
+            "knowledge": lazy("agents.knowledge_agent", "KnowledgeAgent"),
+            "rag": lazy("agents.rag_agent", "RAGAgent"),
+            "groq_client": self._build_groq_client,
+            "team": self._build_team,
+        })
         self.mcp_client = None
-        self.team = Team(
+        self.router = IntentRouter(resolver=get_resolver)
+        self.session_symbols = SessionSymbolCache()
+        self.contexts = ContextManager()
+        self.date_parser = DateParser()
+        self.recall = RecallManager(get_resolver, self.date_parser)
+
+    @property
+    def memory_agent(self):
+        return self.agents.get("memory")
+
+    @property
+    def knowledge_agent(self):
+        return self.agents.get("knowledge")
+
+    @property
+    def rag_agent(self):
+        return self.agents.get("rag")
+
+    @property
+    def groq_client(self):
+        return self.agents.get("groq_client")
+
+    @property
+    def team(self):
+        return self.agents.get("team")
+
+    def _build_groq_client(self):
+        from groq import AsyncGroq
+        return AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+
+    def _build_team(self):
+        from agno.team.team import Team
+        from agno.models.groq import Groq
+        from agno.tools.reasoning import ReasoningTools
+        return Team(
             name="Stock Market Team",
             mode="coordinate",
             model=Groq(id="qwen-qwq-32b", api_key=os.getenv("GROQ_API_KEY")),
@@ -55,87 +153,360 @@ class ReasoningStockTeam:
     async def initialize_mcp_client(self):
         if self.mcp_client is None:
             self.mcp_client = MCPClient()
-            print("Connected to MCP server", file=sys.stderr)
+            self.mcp_client.start()
         return self.mcp_client
 
-    def infer_context(self, query, chat_history):
-        query_lower = query.lower()
-        if 'price' in query_lower or 'predict' in query_lower or 'historical' in query_lower:
-            symbol_map = {
-                'nvidia': 'NVDA', 'amazon': 'AMZN', 'tesla': 'TSLA', 'apple': 'AAPL',
-                'microsoft': 'MSFT', 'google': 'GOOGL', 'intel': 'INTC'
-            }
-            for entry in reversed(chat_history):
-                query_text = entry['user_query'].lower()
-                for company, symbol in symbol_map.items():
-                    if company in query_text:
-                        return {'type': 'stock', 'value': symbol}
-                symbol_match = re.search(r'\b([A-Z]{1,5})\b', query_text)
-                if symbol_match:
-                    return {'type': 'stock', 'value': symbol_match.group(1).upper()}
-        return None
+    def infer_context(self, query, chat_history, session_id=DEFAULT_SESSION):
+        """Symbol the query is about: named in the query, else the session's last one, else from history."""
+        resolver = get_resolver()
+        symbol = resolver.resolve(query)
+        if symbol is None:
+            symbol = self.session_symbols.get(session_id)
+        if symbol is None:
+            # Newest first: the most recent mention wins
+            for entry in chat_history:
+                symbol = resolver.resolve(entry['user_query'])
+                if symbol:
+                    break
+        if symbol is None:
+            return None
+        self.session_symbols.remember(session_id, symbol)
+        return {'type': 'stock', 'value': symbol}
+
+    async def run_stage(self, stage, func, *args):
+        """Run a blocking pipeline stage off the event loop; None if it exceeds its timeout."""
+        try:
+            with span("stage", stage=stage):
+                return await run_blocking(func, *args, timeout=STAGE_TIMEOUTS[stage])
+        except asyncio.TimeoutError:
+            print(f"{stage} stage timed out after {STAGE_TIMEOUTS[stage]}s", file=sys.stderr)
+            return None
+
+    async def load_context(self, session_id):
+        """The session's rolling context; built from stored history the first time it is needed."""
+        context = self.contexts.get(session_id)
+        if context is None:
+            try:
+                rows = await self.run_stage("history", get_chat_history, session_id)
+            except Exception as e:
+                print(f"history stage failed: {e}", file=sys.stderr)
+                rows = None
+            if rows is None:
+                # History unavailable: answer without it, and try again on the next request
+                return ConversationContext()
+            context = self.contexts.seed(session_id, rows)
+        return context
+
+    async def load_recall(self, session_id):
+        """The session's recall index, built from stored history on first use; None if history is unavailable."""
+        recall = self.recall.get(session_id)
+        if recall is None:
+            try:
+                rows = await self.run_stage("history", get_chat_history, session_id, RECALL_HISTORY)
+            except Exception as e:
+                print(f"history stage failed: {e}", file=sys.stderr)
+                rows = None
+            if rows is None:
+                return None
+            recall = self.recall.seed(session_id, rows)
+        return recall
+
+    async def process_query(self, query, uploaded_file, session_id=DEFAULT_SESSION, profile=False):
+        agent_name, chunks = await self.process_query_stream(query, uploaded_file, session_id, profile)
+        return "".join([chunk async for chunk in chunks]), agent_name
+
+    async def process_query_stream(self, query, uploaded_file, session_id=DEFAULT_SESSION, profile=False):
+        """(agent_name, chunks) where chunks is an async iterator over the answer text.
+
+        Routing, and deciding which agent answers, happen before this returns;
+        the answering model's tokens are yielded as they arrive. The turn is
+        added to the session context once the stream has been read to the end.
+        With profile set, the request is profiled until then (see utils.metrics).
+        """
+        started = time.perf_counter()
+        profiler = RequestProfiler(query, session_id).start() if profile else None
+        # The context is only needed by the memory and general stages; load it while the agents run
+        context_task = asyncio.create_task(self.load_context(session_id))
+        try:
+            with span("route"):
+                intent = self.router.route(query, has_file=bool(uploaded_file))
+            if "symbol" in intent.params:
+                self.session_symbols.remember(session_id, intent.params["symbol"])
+            answer = None
+            if self.router.is_confident(intent):
+                answer = await self.answer_intent(intent, query, uploaded_file, context_task, session_id)
+            if answer is None:
+                answer = await self.answer_escalated(query, uploaded_file, context_task, session_id)
+        except BaseException:
+            self._release(context_task)
+            if profiler is not None:
+                profiler.stop()
+            raise
+        response, agent_name = answer
+        return agent_name, self._record(query, session_id, response, agent_name, context_task, started, profiler)
 
-    async def process_query(self, query, uploaded_file):
+    async def _record(self, query, session_id, response, agent_name, context_task, started, profiler=None):
+        metrics = get_metrics()
+        chunks = []
+        if profiler is not None:
+            # The stream is read from other tasks; blocking work it starts still belongs to this request
+            profiler.activate()
+        try:
+            if isinstance(response, str):
+                response = _single(response)
+            async for chunk in response:
+                if not chunks:
+                    metrics.observe("first_chunk", time.perf_counter() - started, agent=agent_name)
+                chunks.append(chunk)
+                yield chunk
+            metrics.observe("request", time.perf_counter() - started, agent=agent_name)
+            self.contexts.add_turn(session_id, query, "".join(chunks), agent_name)
+            self.recall.add_turn(session_id, query, "".join(chunks), agent_name)
+        finally:
+            self._release(context_task)
+            if profiler is not None:
+                profiler.stop()
+
+    @staticmethod
+    def _release(context_task):
+        context_task.cancel()
+        if context_task.done() and not context_task.cancelled():
+            # Mark a failed load as handled when an earlier stage already answered
+            context_task.exception()
+
+    async def guard_stream(self, stream, agent_name, footer=True):
+        """Re-yield an answer stream, turning a mid-answer failure into error text."""
+        try:
+            async for chunk in stream:
+                yield chunk
+        except asyncio.TimeoutError:
+            yield "\n\nError: the request timed out. Please try again."
+        except Exception as e:
+            yield f"\n\nError: {str(e)}"
+        if footer:
+            yield f"\n\n*Response by {agent_name}*"
+
+    async def answer_memory(self, query, context_task, session_id=DEFAULT_SESSION):
+        recall = await self.load_recall(session_id)
+        if recall is not None:
+            if not len(recall):
+                # Nothing to remember yet; the agent would only say so
+                return None
+            # Lists of past symbols, dates and questions come straight from the index
+            with span("stage", stage="recall"):
+                answer = recall.answer(query)
+            if answer:
+                return f"{answer}\n\n*Response by MemoryAgent*", "MemoryAgent"
+        context = await context_task
+        parts = []
+        if len(context):
+            parts.append(f"Conversation so far:\n{context.text()}")
+        relevant = recall.prompt(query) if recall is not None else ""
+        if relevant:
+            parts.append(f"Relevant earlier turns:\n{relevant}")
+        prompt = "\n\n".join(parts + [f"Question: {query}"]) if parts else query
+        source = stream_blocking(self.memory_agent.stream, prompt, timeout=STAGE_TIMEOUTS["memory"])
+        try:
+            # Read enough of the answer to tell whether the agent found anything
+            prefix, stream = await read_prefix(source, MEMORY_PREFIX_CHARS)
+        except asyncio.TimeoutError:
+            print(f"memory stage timed out after {STAGE_TIMEOUTS['memory']}s", file=sys.stderr)
+            await source.aclose()
+            return None
+        if not prefix.strip() or "No relevant history found" in prefix:
+            await source.aclose()
+            return None
+        return self.guard_stream(stream, "MemoryAgent"), "MemoryAgent"
+
+    async def answer_knowledge(self, query, session_id, csv_lookup=False):
+        knowledge_response = await self.run_stage(
+            "knowledge", lambda: self.knowledge_agent.query_knowledge(query, session_id, stream=True, csv_lookup=csv_lookup))
+        if not knowledge_response:
+            return None
+        if isinstance(knowledge_response, str):
+            return knowledge_response, "KnowledgeAgent"
+        stream = stream_blocking(iter, knowledge_response, timeout=STAGE_TIMEOUTS["knowledge"])
+        return self.guard_stream(stream, "KnowledgeAgent", footer=False), "KnowledgeAgent"
+
+    async def answer_rag(self, query, uploaded_file):
+        prompt = await self.run_stage("rag", self.rag_agent.build_prompt, query, uploaded_file)
+        if prompt is None:
+            return None
+        stream = stream_blocking(self.rag_agent.stream_answer, prompt, timeout=STAGE_TIMEOUTS["rag"])
+        return self.guard_stream(stream, "RAGAgent", footer=False), "RAGAgent"
+
+    async def answer_intent(self, intent, query, uploaded_file, context_task, session_id=DEFAULT_SESSION):
+        """Answer a locally classified query without the KnowledgeAgent LLM; None falls back to the full chain."""
+        if intent.name == router.MEMORY:
+            return await self.answer_memory(query, context_task, session_id)
+        if intent.name == router.OPEN_PRICE:
+            # Answered from the CSV, however the open price was asked for
+            return await self.answer_knowledge(query, session_id, csv_lookup=True)
+        if intent.name == router.PDF:
+            return await self.answer_rag(query, uploaded_file)
+        return await self.answer_general(query, context_task, intent, session_id)
+
+    async def answer_escalated(self, query, uploaded_file, context_task, session_id=DEFAULT_SESSION):
         memory_keywords = ['earlier', 'previous', 'history']
         if any(keyword in query.lower() for keyword in memory_keywords):
-            memory_response = self.memory_agent.agent.run(query).content
-            if "No relevant history found" not in memory_response:
-                return f"{memory_response}\n\n*Response by MemoryAgent*", "MemoryAgent"
+            answer = await self.answer_memory(query, context_task, session_id)
+            if answer:
+                return answer
 
-        knowledge_response = self.knowledge_agent.query_knowledge(query)
-        if knowledge_response:
-            return knowledge_response, "KnowledgeAgent"
+        answer = await self.answer_knowledge(query, session_id)
+        if answer:
+            return answer
 
         if uploaded_file:
-            rag_response = self.rag_agent.query_rag(query, uploaded_file)
-            if "Failed to process PDF" not in rag_response:
-                return rag_response, "RAGAgent"
+            answer = await self.answer_rag(query, uploaded_file)
+            if answer:
+                return answer
+        return await self.answer_general(query, context_task, session_id=session_id)
 
+    async def answer_general(self, query, context_task, intent=None, session_id=DEFAULT_SESSION):
         try:
-            chat_history = get_chat_history()
-            history_text = "\n".join([f"User: {h['user_query']} | Agent: {h['agent_name']} | Response: {h['response']}" for h in chat_history])
-            context = self.infer_context(query, chat_history)
+            context = await context_task
+            history_text = context.text()
+            chat_history = context.history()
             query_lower = query.lower()
 
-            mcp_client = await self.initialize_mcp_client()
+            if intent is not None:
+                # Classified locally: the tool and its parameters come from the router
+                method = intent.name if intent.name in router.STOCK_INTENTS else None
+                symbol = intent.params.get("symbol")
+                symbols = intent.params.get("symbols")
+            elif self.router.extract_indicators(query):
+                method = router.INDICATORS
+                symbol = None
+                symbols = self.router.extract_symbols(query)
+            else:
+                method = next((name for name, keyword in (
+                    (router.STOCK_PRICE, 'price'), (router.HISTORICAL, 'historical'), (router.PREDICT, 'predict')
+                ) if keyword in query_lower), None)
+                symbol = None
+                symbols = self.router.extract_symbols(query) if method else None
+            if method and not symbol:
+                inferred = self.infer_context(query, chat_history, session_id)
+                if inferred and inferred['type'] == 'stock':
+                    symbol = inferred['value']
+                elif intent is not None:
+                    return "Please specify a stock symbol (e.g., NVDA, TSLA).\n\n*Response by GeneralAgent*", "GeneralAgent"
 
             general_response = None
-            if context and context['type'] == 'stock':
-                symbol = context['value']
-                if 'price' in query_lower:
-                    date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', query)
-                    params = {"symbol": symbol}
-                    if date_match:
-                        params["date"] = date_match.group(1)
-                    response = await mcp_client.send("fetch_stock_price", params)
-                    general_response = response
-                elif 'historical' in query_lower:
-                    response = await mcp_client.send("fetch_historical_data", {"market": symbol, "period": "1mo"})
-                    general_response = "\n".join([f"{d['Date']}: Open=${d['Open']:.2f}, Close=${d['Close']:.2f}" for d in response]) if isinstance(response, list) else response
-                elif 'predict' in query_lower:
-                    days_match = re.search(r'(\d+)\s*(day|days)', query)
-                    days_ahead = int(days_match.group(1)) if days_match else 1
-                    response = await mcp_client.send("predict_stock_price", {"market": symbol, "days_ahead": days_ahead})
-                    general_response = response
+            if method and symbols and len(symbols) > 1:
+                # Several symbols in one question: one batch tool call instead of one per symbol
+                general_response = await self.call_stock_tool_batch(method, symbols, query, intent.params if intent else {})
+            elif method and symbol:
+                general_response = await self.call_stock_tool(method, symbol, query, intent.params if intent else {})
             if not general_response:
-                general_response = await self.fallback_groq_query(query, history_text)
+                stream = iterate_with_timeout(self.fallback_groq_stream(query, history_text), STAGE_TIMEOUTS["fallback"])
+                return self.guard_stream(stream, "GeneralAgent"), "GeneralAgent"
 
+        except asyncio.TimeoutError:
+            general_response = "Error: the request timed out. Please try again."
         except Exception as e:
             general_response = f"Error: {str(e)}"
         return f"{general_response}\n\n*Response by GeneralAgent*", "GeneralAgent"
 
-    async def fallback_groq_query(self, query, history_text):
+    async def call_stock_tool(self, method, symbol, query, params):
+        mcp_client = await self.initialize_mcp_client()
+        mcp_timeout = STAGE_TIMEOUTS["mcp"]
+        if method == router.STOCK_PRICE:
+            day = self.date_parser.parse_day(query)
+            tool_params = {"symbol": symbol}
+            if day:
+                tool_params["date"] = format_day(day)
+            return await mcp_client.send("fetch_stock_price", tool_params, timeout=mcp_timeout)
+        if method == router.HISTORICAL:
+            expr = self.date_parser.parse(query)
+            tool_params = {"market": symbol, "period": "1mo", **history_params(expr)}
+            if expr is not None:
+                tool_params["start"], tool_params["end"] = format_day(expr.start), format_day(expr.end)
+            response = await mcp_client.send("fetch_historical_data", tool_params, timeout=mcp_timeout)
+            return format_history(response) if is_history(response) else response
+        if method == router.PREDICT:
+            days_ahead = self.days_ahead(query, params)
+            return await mcp_client.send("predict_stock_price", {"market": symbol, "days_ahead": days_ahead}, timeout=mcp_timeout)
+        if method == router.INDICATORS:
+            tool_params = {"market": symbol, "indicators": params.get("indicators") or self.router.extract_indicators(query)}
+            day = self.date_parser.parse_day(query)
+            if day:
+                tool_params["end"] = format_day(day)
+            response = await mcp_client.send("compute_indicators", tool_params, timeout=mcp_timeout)
+            return format_indicators(symbol, response) if isinstance(response, dict) else response
+        return None
+
+    async def call_stock_tool_batch(self, method, symbols, query, params):
+        """As call_stock_tool for several symbols, through the server's batch tools."""
+        mcp_client = await self.initialize_mcp_client()
+        mcp_timeout = STAGE_TIMEOUTS["mcp"]
+        if method == router.STOCK_PRICE:
+            day = self.date_parser.parse_day(query)
+            tool_params = {"symbols": symbols}
+            if day:
+                tool_params["date"] = format_day(day)
+            response = await mcp_client.send("fetch_stock_price_batch", tool_params, timeout=mcp_timeout)
+        elif method == router.HISTORICAL:
+            expr = self.date_parser.parse(query)
+            tool_params = {"symbols": symbols, "period": "1mo", **history_params(expr)}
+            if expr is not None:
+                tool_params["start"], tool_params["end"] = format_day(expr.start), format_day(expr.end)
+            response = await mcp_client.send("fetch_historical_data_batch", tool_params, timeout=mcp_timeout)
+        elif method == router.PREDICT:
+            tool_params = {"symbols": symbols, "days_ahead": self.days_ahead(query, params)}
+            response = await mcp_client.send("predict_stock_price_batch", tool_params, timeout=mcp_timeout)
+        elif method == router.INDICATORS:
+            # No batch tool: one compute_indicators call per symbol, all in flight at once
+            answers = await asyncio.gather(*(self.call_stock_tool(method, symbol, query, params) for symbol in symbols))
+            return "\n".join(answers)
+        else:
+            return None
+        if not isinstance(response, dict):
+            return response
+        lines = []
+        for symbol in symbols:
+            item = response.get(symbol) or {"error": "No data"}
+            value = item.get("result", f"Error: {item.get('error')}")
+            if method == router.HISTORICAL:
+                lines.append(f"{symbol}:\n{format_history(value) if is_history(value) else value}")
+            else:
+                lines.append(f"{symbol}: {value}")
+        return ("\n\n" if method == router.HISTORICAL else "\n").join(lines)
+
+    def days_ahead(self, query, params):
+        days_ahead = params.get("days_ahead")
+        if days_ahead is None:
+            days_match = re.search(r'(\d+)\s*(day|days)', query)
+            days_ahead = int(days_match.group(1)) if days_match else 1
+        return days_ahead
+
+    async def fallback_groq_stream(self, query, history_text):
+        """Text chunks of the fallback model's answer, served whole from the LLM cache on a hit."""
         system_prompt = (
             "Answer general questions using chat history for context. "
             "Defer stock market queries to specialized tools.\n\nChat History:\n{history_text}"
         )
-        response = self.groq_client.chat.completions.create(
-            model="qwen-qwq-32b",
-            messages=[
-                {"role": "system", "content": system_prompt.format(history_text=history_text)},
-                {"role": "user", "content": query}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content
\ No newline at end of file
+
+        async def complete():
+            response = await self.groq_client.chat.completions.create(
+                model=FALLBACK_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt.format(history_text=history_text)},
+                    {"role": "user", "content": query}
+                ],
+                temperature=0.7,
+                max_tokens=1000,
+                stream=True
+            )
+            async for chunk in response:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    yield content
+
+        context = context_hash(history_text) if REFERENTIAL.search(query) else None
+        with span("agent_run", agent="GeneralAgent"):
+            async for chunk in get_llm_cache().astream("fallback", FALLBACK_MODEL, query, complete, context=context):
+                yield chunk
+
+    async def fallback_groq_query(self, query, history_text):
+        return "".join([chunk async for chunk in self.fallback_groq_stream(query, history_text)])
@@ -1,27 +1,49 @@
 import pandas as pd
 import os
 from datetime import datetime
-import re
 from agno.agent import Agent
 from agno.models.groq import Groq
 from agno.tools.yfinance import YFinanceTools
 from agno.tools.reasoning import ReasoningTools
-from utils.db import get_chat_history
+from utils.db import DEFAULT_SESSION, get_chat_history
+from utils.market_data import DEFAULT_CSV_PATH, get_store
+from utils.market_cache import get_market_cache
+from utils.llm_cache import get_llm_cache
+from utils.metrics import span
+from utils.dates import DateParser, format_day
+
+class CachedYFinanceTools(YFinanceTools):
+    """YFinanceTools whose price lookups go through the shared market data cache."""
+
+    def get_current_stock_price(self, symbol: str) -> str:
+        """
+        Use this function to get the current stock price for a given symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+
+        Returns:
+            str: The current stock price or error message.
+        """
+        try:
+            hist = get_market_cache().history(symbol, period="1d")
+            if hist.empty:
+                return f"Could not fetch current price for {symbol}"
+            return f"{hist['Close'].iloc[-1]:.4f}"
+        except Exception as e:
+            return f"Error fetching current price for {symbol}: {e}"
 
 class KnowledgeAgent:
     def __init__(self):
-        self.csv_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'stock_market_data.csv')
-        try:
-            self.df = pd.read_csv(self.csv_path)
-            self.df['Date'] = pd.to_datetime(self.df['Date']).dt.strftime('%m/%d/%Y')
-        except FileNotFoundError:
-            self.df = None
+        self.csv_path = DEFAULT_CSV_PATH
+        self.store = get_store(self.csv_path)
+        self.date_parser = DateParser(year_resolver=self.latest_csv_date)
         self.agent = Agent(
             name="KnowledgeAgent",
             role="Handle stock market data queries",
             model=Groq(id="qwen-qwq-32b", api_key=os.getenv("GROQ_API_KEY")),
             tools=[
-                YFinanceTools(stock_price=True, analyst_recommendations=True, company_info=True, company_news=True),
+                CachedYFinanceTools(stock_price=True, analyst_recommendations=True, company_info=True, company_news=True),
                 ReasoningTools(add_instructions=True)
             ],
             instructions=[
@@ -40,87 +62,72 @@ class KnowledgeAgent:
             add_datetime_to_instructions=True
         )
 
-    def parse_date(self, query):
-        patterns = [
-            r'(\d{1,2})(?:st|nd|rd|th)?\s+(\w+)\s+(\d{4})',
-            r'(\w+)\s+(\d{1,2}),?\s+(\d{4})',
-            r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})'
-        ]
-        month_map = {
-            'january': '01', 'february': '02', 'march': '03', 'april': '04', 'may': '05', 'june': '06',
-            'july': '07', 'august': '08', 'september': '09', 'october': '10', 'november': '11', 'december': '12',
-            'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04', 'jun': '06', 'jul': '07',
-            'aug': '08', 'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
-        }
-
-        for pattern in patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
-            if match:
-                try:
-                    if pattern == patterns[0]:
-                        day, month, year = match.groups()
-                        month = month_map.get(month.lower(), month)
-                        return f"{month}/{int(day):02d}/{year}"
-                    elif pattern == patterns[1]:
-                        day, month, year = match.groups()
-                        month = month_map.get(month.lower(), month)
-                        return f"{month}/{int(day):02d}/{year}"
-                    elif pattern == patterns[2]:
-                        month, day, year = match.groups()
-                        return f"{int(month):02d}/{int(day):02d}/{year}"
-                except (ValueError, KeyError):
-                    continue
+    def latest_csv_date(self, month, day):
+        latest = self.store.latest_date_on(month, day)
+        return None if latest is None else latest.astype(object)
 
-        no_year_pattern = r'(\d{1,2})(?:st|nd|rd|th)?\s+(\w+)(?!\s+\d{4})'
-        match = re.search(no_year_pattern, query, re.IGNORECASE)
-        if match:
-            day, month = match.groups()
-            month = month_map.get(month.lower(), month)
-            if self.df is not None:
-                date_prefix = f"{month}/{int(day):02d}/"
-                matching_dates = [d for d in self.df['Date'] if d.startswith(date_prefix)]
-                if matching_dates:
-                    latest_date = max(matching_dates)
-                    return latest_date
-        return None
+    def parse_date(self, query):
+        """First single date in the query as MM/DD/YYYY; year-less dates resolve to the latest one in the CSV."""
+        day = self.date_parser.parse_day(query)
+        return format_day(day) if day else None
 
-    def get_last_date_from_history(self):
-        chat_history = get_chat_history()
-        for entry in reversed(chat_history):
+    def get_last_date_from_history(self, session_id=DEFAULT_SESSION):
+        # History is newest first: the most recently mentioned date wins
+        chat_history = get_chat_history(session_id)
+        for entry in chat_history:
             date_str = self.parse_date(entry['user_query'])
             if date_str:
                 return date_str
         return None
 
-    def query_knowledge(self, query):
+    def stream_yfinance(self, query):
+        """Text chunks of the YFinance agent's answer, ending with the agent footer."""
+        try:
+            with span("agent_run", agent="KnowledgeAgent"):
+                yield from get_llm_cache().stream(
+                    "knowledge", self.agent.model.id, query,
+                    lambda: (chunk.content for chunk in self.agent.run(query, stream=True) if chunk.content))
+            yield "\n\n*Response by KnowledgeAgent*"
+        except Exception as e:
+            yield f"Error querying YFinanceTools: {str(e)}.\n\n*Response by KnowledgeAgent*"
+
+    def query_knowledge(self, query, session_id=DEFAULT_SESSION, stream=False, csv_lookup=False):
+        """Answer a stock market query, or None for non-stock queries.
+
+        CSV answers are plain strings. The YFinance agent answer is returned as a
+        generator of text chunks when stream is set. With csv_lookup (the router
+        classified the query as an open-price question) the query is answered
+        from the CSV whatever its wording; otherwise only queries naming the
+        "market open price" are.
+        """
         query_lower = query.lower()
         if any(keyword in query_lower for keyword in ['ceo', 'capital', 'president', 'news']):
             return None
-        if self.df is None:
+        if self.store.data() is None:
             return f"Error: CSV file not found at {self.csv_path}.\n\n*Response by KnowledgeAgent*"
+        csv_lookup = csv_lookup or 'market open price' in query_lower
         if query_lower.strip() == "market open price":
-            date_str = self.get_last_date_from_history()
+            date_str = self.get_last_date_from_history(session_id)
             if not date_str:
                 return "No recent date mentioned. Please provide a date (e.g., '4th June 2025').\n\n*Response by KnowledgeAgent*"
         else:
             date_str = self.parse_date(query)
-            if not date_str and 'market open price' in query_lower:
+            if not date_str and csv_lookup:
                 return "Please provide a valid date (e.g., '4th June 2025' or '4/10/2025').\n\n*Response by KnowledgeAgent*"
-        if 'market open price' in query_lower and date_str:
+        if csv_lookup and date_str:
             try:
-                result = self.df[self.df['Date'] == date_str]
-                if not result.empty:
-                    open_price = result['Open'].iloc[0]
+                row = self.store.get_row(None, date_str)
+                if row is not None:
+                    open_price = row['Open']
                     formatted_date = pd.to_datetime(date_str).strftime('%B %d, %Y')
-                    if not re.search(r'\d{4}', query, re.IGNORECASE):
+                    expr = self.date_parser.parse(query)
+                    if expr is not None and not expr.explicit_year:
                         return f"The market open price on {formatted_date} (assuming {formatted_date[-4:]}) was {open_price:.2f}.\n\n*Response by KnowledgeAgent*"
                     return f"The market open price on {formatted_date} was {open_price:.2f}.\n\n*Response by KnowledgeAgent*"
                 else:
                     return f"No data available for {date_str} in the CSV file.\n\n*Response by KnowledgeAgent*"
             except Exception as e:
                 return f"Error processing CSV: {str(e)}.\n\n*Response by KnowledgeAgent*"
-        try:
-            yfinance_response = self.agent.run(query).content
-            return f"{yfinance_response}\n\n*Response by KnowledgeAgent*"
-        except Exception as e:
-            return f"Error querying YFinanceTools: {str(e)}.\n\n*Response by KnowledgeAgent*"
\ No newline at end of file
+        if stream:
+            return self.stream_yfinance(query)
+        return "".join(self.stream_yfinance(query))
\ No newline at end of file
@@ -0,0 +1,98 @@
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future
+from utils.metrics import span
+
+MCP_SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_server.py")
+
+class MCPClient:
+    """Keeps one MCP server subprocess alive and multiplexes tagged requests over its stdio."""
+
+    def __init__(self, command=None, timeout=30.0):
+        self.command = command or [sys.executable, MCP_SERVER_PATH]
+        self.timeout = timeout
+        self.process = None
+        self.pending = {}
+        self._ids = itertools.count(1)
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self.process is not None and self.process.poll() is None:
+                return self.process
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                bufsize=1
+            )
+            threading.Thread(target=self._read_responses, args=(self.process,), name="mcp-client-reader", daemon=True).start()
+            print("Connected to MCP server", file=sys.stderr)
+            return self.process
+
+    def _read_responses(self, process):
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                # Stray output from a tool; not part of the protocol
+                continue
+            future = self.pending.pop(message.get("id"), None)
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_result(message)
+        for request_id in list(self.pending):
+            future = self.pending.pop(request_id, None)
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_exception(ConnectionError("MCP server exited"))
+
+    def request(self, method, params):
+        """Send one request without waiting; returns a concurrent.futures.Future for the raw reply."""
+        process = self.start()
+        request_id = next(self._ids)
+        future = Future()
+        future.request_id = request_id
+        self.pending[request_id] = future
+        line = json.dumps({"id": request_id, "method": method, "params": params})
+        try:
+            with self._write_lock:
+                process.stdin.write(line + "\n")
+                process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.pending.pop(request_id, None)
+            future.set_exception(ConnectionError(f"MCP server unavailable: {e}"))
+        return future
+
+    async def send(self, method, params, timeout=None):
+        future = None
+        try:
+            with span("mcp_call", tool=method):
+                future = self.request(method, params)
+                response = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            return f"MCP request {method} timed out"
+        finally:
+            if future is not None:
+                # A request that timed out or was cancelled must not stay pending; a late reply is dropped
+                self.pending.pop(future.request_id, None)
+        result = response.get("response", response.get("error", "Error"))
+        if isinstance(result, dict):
+            return result.get("result", result.get("error", result))
+        return result
+
+    def close(self):
+        with self._start_lock:
+            if self.process is None:
+                return
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+            self.process = None
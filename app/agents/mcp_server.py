@@ -2,12 +2,24 @@ import asyncio
 import os
 import json
 import sys
-import yfinance as yf
-import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from sklearn.linear_model import LinearRegression
 from datetime import datetime, timedelta
 
+# Allow `python app/agents/mcp_server.py` to import the shared utils package
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from utils import bars
+from utils.market_data import DEFAULT_CSV_PATH, PRICE_COLUMNS, format_dates, get_store
+from utils.market_cache import get_market_cache
+from utils.forecast import get_forecast_cache
+from utils import indicators
+from utils.indicators import get_indicator_cache
+from utils.metrics import get_metrics, serve_metrics, set_readiness, span
+from utils.warmup import WarmUp
+
 # Mock MCP SDK (replace with actual modelcontextprotocol)
 class MCPTool:
     def __init__(self, name, description, func):
@@ -16,41 +28,101 @@ class MCPTool:
         self.func = func
 
 class MCPServer:
-    def __init__(self, name):
+    def __init__(self, name, max_workers=None):
         self.name = name
         self.tools = {}
+        self.max_workers = max_workers or int(os.getenv("MCP_MAX_WORKERS", "8"))
+        self.executor = None
+        # Started by run() once requests are being read; see the "ready" method
+        self.warmup = None
 
     def register_tool(self, name, description, func):
         self.tools[name] = MCPTool(name, description, func)
 
+    async def call_tool(self, method, params):
+        if method == "ping":
+            return {"result": "pong"}
+        if method == "ready":
+            return {"result": self.warmup.status() if self.warmup is not None else {"ready": True, "ok": True, "stages": {}}}
+        if method == "list_tools":
+            return {"result": [{"name": t.name, "description": t.description} for t in self.tools.values()]}
+        if method == "metrics":
+            metrics = get_metrics()
+            return {"result": metrics.to_prometheus() if params.get("format") == "prometheus" else metrics.to_json()}
+        tool = self.tools[method]
+        with span("mcp_tool", tool=method):
+            if self.executor is None:
+                return await tool.func(params)
+            # Tools do blocking I/O (yfinance, pandas), so they run on the bounded worker pool
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, _run_in_worker, tool.func, params)
+
     async def handle_request(self, request):
+        request_id = None
         try:
             data = json.loads(request)
+            request_id = data.get("id")
             method = data.get("method")
             params = data.get("params", {})
-            if method in self.tools:
-                result = await self.tools[method].func(params)
-                return json.dumps({"response": result})
-            return json.dumps({"error": f"Unknown method: {method}"})
+            if method in self.tools or method in ("ping", "ready", "list_tools", "metrics"):
+                result = await self.call_tool(method, params)
+                return json.dumps({"id": request_id, "response": result})
+            return json.dumps({"id": request_id, "error": f"Unknown method: {method}"})
         except Exception as e:
-            return json.dumps({"error": f"Server error: {str(e)}"})
+            return json.dumps({"id": request_id, "error": f"Server error: {str(e)}"})
+
+    async def _serve_line(self, line):
+        response = await self.handle_request(line)
+        # Only the event loop thread writes, so responses never interleave
+        sys.stdout.write(response + "\n")
+        sys.stdout.flush()
 
     async def run(self):
-        print(f"Starting MCP server {self.name}...", file=sys.stderr)
-        while True:
-            try:
-                request = sys.stdin.readline().strip()
-                if not request:
+        print(f"Starting MCP server {self.name} with {self.max_workers} workers...", file=sys.stderr)
+        loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mcp-tool")
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-stdin")
+        in_flight = set()
+        if self.warmup is not None:
+            set_readiness(self.warmup.status)
+            self.warmup.start()
+        try:
+            while True:
+                try:
+                    line = await loop.run_in_executor(reader, sys.stdin.readline)
+                except Exception as e:
+                    sys.stdout.write(json.dumps({"error": f"IO error: {str(e)}"}) + "\n")
+                    sys.stdout.flush()
+                    continue
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
                     continue
-                response = await self.handle_request(request)
-                sys.stdout.write(response + "\n")
-                sys.stdout.flush()
-            except Exception as e:
-                sys.stdout.write(json.dumps({"error": f"IO error: {str(e)}"}) + "\n")
-                sys.stdout.flush()
+                # Requests are tagged with ids, so they are answered as they complete, not in order
+                task = asyncio.create_task(self._serve_line(line))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.gather(*in_flight)
+        finally:
+            reader.shutdown(wait=False)
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+_worker_state = threading.local()
+
+def _run_in_worker(func, params):
+    # One event loop per worker thread, reused across tool calls
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None:
+        loop = _worker_state.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(func(params))
 
 app = MCPServer("stock-market-server")
-csv_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'stock_market_data.csv')
+MAX_BATCH_SYMBOLS = int(os.getenv("MCP_MAX_BATCH_SYMBOLS", "500"))
+csv_path = DEFAULT_CSV_PATH
+store = get_store(csv_path)
 
 async def fetch_stock_price(params):
     symbol = params.get("symbol", "").strip().upper()
@@ -58,13 +130,13 @@ async def fetch_stock_price(params):
     if not symbol:
         return {"error": "Stock symbol is required"}
     try:
-        stock = yf.Ticker(symbol)
+        cache = get_market_cache()
         if date:
             try:
                 date_obj = datetime.strptime(date, "%m/%d/%Y")
                 start_date = date_obj - timedelta(days=1)
                 end_date = date_obj + timedelta(days=1)
-                hist = stock.history(start=start_date, end=end_date)
+                hist = cache.history(symbol, start=start_date, end=end_date)
                 if not hist.empty and date_obj.strftime('%Y-%m-%d') in hist.index:
                     price = hist.loc[date_obj.strftime('%Y-%m-%d'), "Close"]
                     return {"result": f"{price:.2f}"}
@@ -72,7 +144,7 @@ async def fetch_stock_price(params):
             except ValueError:
                 return {"error": "Invalid date format. Use MM/DD/YYYY"}
         else:
-            info = stock.history(period="1d")
+            info = cache.history(symbol, period="1d")
             if not info.empty:
                 price = info["Close"].iloc[-1]
                 return {"result": f"{price:.2f}"}
@@ -80,25 +152,76 @@ async def fetch_stock_price(params):
     except Exception as e:
         return {"error": str(e)}
 
+def history_options(params):
+    """Output options for the historical tools, or None for the plain list of {'Date', 'Open', 'Close'} rows.
+
+    interval: 1d, 1wk or 1mo; format: rows, columns or packed (see utils.bars);
+    columns: price columns to include; summary: add range statistics;
+    limit/cursor: page through the bars, the cursor being the previous
+    page's next_cursor; tail: page backwards from the newest bar. Raises
+    ValueError for invalid values.
+    """
+    if all(params.get(key) is None for key in ("interval", "format", "columns", "summary", "limit", "cursor", "tail")):
+        return None
+    interval = params.get("interval") or "1d"
+    if interval not in bars.INTERVALS:
+        raise ValueError(f"Unsupported interval {interval}. Use one of {', '.join(bars.INTERVALS)}")
+    fmt = params.get("format") or "columns"
+    if fmt not in bars.FORMATS:
+        raise ValueError(f"Unsupported format {fmt}. Use one of {', '.join(bars.FORMATS)}")
+    columns = params.get("columns") or bars.DEFAULT_COLUMNS
+    if isinstance(columns, str):
+        columns = columns.split(",")
+    columns = [name.strip().capitalize() for name in columns]
+    unknown = [name for name in columns if name not in PRICE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns {', '.join(unknown)}. Use any of {', '.join(PRICE_COLUMNS)}")
+    limit = params.get("limit")
+    if limit is not None and int(limit) < 1:
+        raise ValueError("limit must be positive")
+    cursor = params.get("cursor")
+    return {
+        "interval": interval,
+        "fmt": fmt,
+        "columns": columns,
+        "summary": bool(params.get("summary")),
+        "limit": None if limit is None else int(limit),
+        "cursor": None if cursor is None else int(cursor),
+        "tail": bool(params.get("tail")),
+    }
+
+def history_result(series, options):
+    if options is None:
+        return bars.encode(series, "rows")
+    return bars.history_payload(series, **options)
+
 async def fetch_historical_data(params):
     symbol = params.get("market", "").strip().upper()
     period = params.get("period", "1mo")
+    # Optional inclusive MM/DD/YYYY bounds; they take precedence over period
+    start, end = params.get("start"), params.get("end")
     if not symbol:
         return {"error": "Stock symbol is required"}
     try:
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path)
-            df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%m/%d/%Y')
-            if 'Symbol' in df.columns and symbol in df['Symbol'].values:
-                data = df[df['Symbol'] == symbol][['Date', 'Open', 'Close']].to_dict('records')
-                return {"result": data}
-        stock = yf.Ticker(symbol)
-        hist = stock.history(period=period)
+        if start or end:
+            try:
+                start = datetime.strptime(start, "%m/%d/%Y") if start else None
+                end = datetime.strptime(end, "%m/%d/%Y") if end else None
+            except ValueError:
+                return {"error": "Invalid date format. Use MM/DD/YYYY"}
+        try:
+            options = history_options(params)
+        except ValueError as e:
+            return {"error": str(e)}
+        if store.has_symbol(symbol):
+            return {"result": history_result(store.get_range(symbol, start, end), options)}
+        if start or end:
+            # yfinance's end is exclusive
+            hist = get_market_cache().history(symbol, start=start, end=end + timedelta(days=1) if end else None)
+        else:
+            hist = get_market_cache().history(symbol, period=period)
         if not hist.empty:
-            data = hist[['Open', 'Close']].reset_index().to_dict('records')
-            for d in data:
-                d['Date'] = d['Date'].strftime('%m/%d/%Y')
-            return {"result": data}
+            return {"result": history_result(bars.frame_series(hist), options)}
         return {"error": f"No historical data for {symbol}"}
     except Exception as e:
         return {"error": str(e)}
@@ -109,35 +232,230 @@ async def predict_stock_price(params):
     if not symbol:
         return {"error": "Stock symbol is required"}
     try:
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path)
-            df['Date'] = pd.to_datetime(df['Date'])
-            if 'Symbol' in df.columns and symbol in df['Symbol'].values:
-                df = df[df['Symbol'] == symbol]
-            else:
-                df = None
-        if df is None:
-            stock = yf.Ticker(symbol)
-            df = stock.history(period="1y").reset_index()
+        forecasts = get_forecast_cache()
+        if store.has_symbol(symbol):
+            model = forecasts.from_store(store, symbol)
+        else:
+            df = get_market_cache().history(symbol, period="1y").reset_index()
             if df.empty:
                 return {"error": f"No historical data for {symbol}"}
-            df['Date'] = pd.to_datetime(df['Date'])
-        df['Days'] = (df['Date'] - df['Date'].min()).dt.days
-        X = df[['Days']].values
-        y = df['Close'].values
-        model = LinearRegression()
-        model.fit(X, y)
-        last_day = df['Days'].max()
-        future_day = last_day + days_ahead
-        predicted_price = model.predict([[future_day]])[0]
+            import pandas as pd
+            dates = pd.to_datetime(df['Date']).values.astype('datetime64[D]')
+            model = forecasts.sync(("yfinance", symbol), dates, df['Close'].values)
+        if model.n == 0:
+            # Every close in the series is missing
+            return {"error": f"No historical data for {symbol}"}
+        predicted_price = model.predict_ahead(int(days_ahead))
         return {"result": f"{predicted_price:.2f}"}
     except Exception as e:
         return {"error": str(e)}
 
+def indicator_specs(params):
+    """[(name, window)] from params["indicators"]: "sma:50"-style strings, {"name", "window"} dicts
+    or a comma-separated string. Raises ValueError for unknown names or bad windows."""
+    requested = params.get("indicators") or []
+    if isinstance(requested, str):
+        requested = requested.split(",")
+    specs = []
+    for item in requested:
+        if isinstance(item, dict):
+            name, window = str(item.get("name", "")), item.get("window")
+        else:
+            name, _, window = str(item).partition(":")
+        name = name.strip().lower()
+        if name not in indicators.INDICATORS:
+            raise ValueError(f"Unknown indicator {name}. Use any of {', '.join(indicators.INDICATORS)}")
+        window = int(window) if window not in (None, "") else indicators.DEFAULT_WINDOWS[name]
+        if not 1 <= window <= indicators.MAX_WINDOW:
+            raise ValueError(f"Window must be between 1 and {indicators.MAX_WINDOW}")
+        specs.append((name, window))
+    if not specs:
+        raise ValueError("At least one indicator is required")
+    return list(dict.fromkeys(specs))
+
+async def compute_indicators(params):
+    """Several indicators for one symbol on its last bar (or the last one up to end); with
+    points > 1 or a start date, also their series in a utils.bars format (columns by default)."""
+    symbol = params.get("market", params.get("symbol", "")).strip().upper()
+    if not symbol:
+        return {"error": "Stock symbol is required"}
+    try:
+        specs = indicator_specs(params)
+        points = int(params.get("points", 1))
+        fmt = params.get("format") or "columns"
+        if fmt not in bars.FORMATS:
+            return {"error": f"Unsupported format {fmt}. Use one of {', '.join(bars.FORMATS)}"}
+        try:
+            start = datetime.strptime(params["start"], "%m/%d/%Y") if params.get("start") else None
+            end = datetime.strptime(params["end"], "%m/%d/%Y") if params.get("end") else None
+        except ValueError:
+            return {"error": "Invalid date format. Use MM/DD/YYYY"}
+        cache = get_indicator_cache()
+        if store.has_symbol(symbol):
+            series = store.get_range(symbol)
+            computed = [cache.from_store(store, symbol, name, window) for name, window in specs]
+        else:
+            # Enough upstream history for the longest window, and for any past dates asked about
+            longest = max(window for _, window in specs)
+            period = "max" if start or end or longest > 1000 else "1y" if longest <= 150 else "5y"
+            hist = get_market_cache().history(symbol, period=period)
+            if hist.empty:
+                return {"error": f"No historical data for {symbol}"}
+            series = bars.frame_series(hist)
+            computed = [cache.sync(("yfinance", symbol), series, name, window) for name, window in specs]
+        days = series['Date'].astype('datetime64[D]')
+        hi = len(days) if end is None else int(np.searchsorted(days, np.datetime64(end.date(), 'D'), side='right'))
+        if not hi:
+            return {"error": f"No historical data for {symbol}" + (f" on or before {params['end']}" if end else "")}
+        lo = max(0, hi - points) if start is None else int(np.searchsorted(days, np.datetime64(start.date(), 'D'), side='left'))
+        labels = [indicators.label(name, window) for name, window in specs]
+        outputs = [indicator.output() for indicator in computed]
+        result = {
+            "as_of": format_dates(days[hi - 1:hi])[0],
+            "close": bars.json_number(series['Close'][hi - 1]),
+            "latest": {name: bars.json_number(values[hi - 1]) for name, values in zip(labels, outputs)},
+        }
+        if points > 1 or start:
+            window_series = {'Date': days[lo:hi], **{name: values[lo:hi] for name, values in zip(labels, outputs)}}
+            result["format"] = fmt
+            result["data"] = bars.encode(window_series, fmt, labels)
+        return {"result": result}
+    except Exception as e:
+        return {"error": str(e)}
+
+def batch_symbols(params):
+    """Distinct upper-cased symbols from params["symbols"] (a list or a comma-separated string)."""
+    symbols = params.get("symbols") or []
+    if isinstance(symbols, str):
+        symbols = symbols.split(",")
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+def batch_error(symbols):
+    if not symbols:
+        return {"error": "At least one stock symbol is required"}
+    if len(symbols) > MAX_BATCH_SYMBOLS:
+        return {"error": f"At most {MAX_BATCH_SYMBOLS} symbols per request"}
+    return None
+
+# Batch tools answer {"result": {symbol: <what the single-symbol tool returns for it>}}
+async def fetch_stock_price_batch(params):
+    symbols = batch_symbols(params)
+    date = params.get("date", None)
+    error = batch_error(symbols)
+    if error:
+        return error
+    try:
+        cache = get_market_cache()
+        if date:
+            try:
+                date_obj = datetime.strptime(date, "%m/%d/%Y")
+            except ValueError:
+                return {"error": "Invalid date format. Use MM/DD/YYYY"}
+            day = date_obj.strftime('%Y-%m-%d')
+            frames = cache.history_many(symbols, start=date_obj - timedelta(days=1), end=date_obj + timedelta(days=1))
+            return {"result": {
+                symbol: {"result": f"{hist.loc[day, 'Close']:.2f}"} if not hist.empty and day in hist.index
+                else {"error": f"No data for {symbol} on {date}"}
+                for symbol, hist in frames.items()
+            }}
+        frames = cache.history_many(symbols, period="1d")
+        return {"result": {
+            symbol: {"result": f"{hist['Close'].iloc[-1]:.2f}"} if not hist.empty else {"error": f"No data for {symbol}"}
+            for symbol, hist in frames.items()
+        }}
+    except Exception as e:
+        return {"error": str(e)}
+
+async def fetch_historical_data_batch(params):
+    symbols = batch_symbols(params)
+    period = params.get("period", "1mo")
+    start, end = params.get("start"), params.get("end")
+    error = batch_error(symbols)
+    if error:
+        return error
+    try:
+        if start or end:
+            try:
+                start = datetime.strptime(start, "%m/%d/%Y") if start else None
+                end = datetime.strptime(end, "%m/%d/%Y") if end else None
+            except ValueError:
+                return {"error": "Invalid date format. Use MM/DD/YYYY"}
+        try:
+            options = history_options(params)
+        except ValueError as e:
+            return {"error": str(e)}
+        # Local series in one pass over the loaded data; the rest in one upstream request
+        results = {
+            symbol: {"result": history_result(series, options)}
+            for symbol, series in store.get_ranges(symbols, start, end).items() if series is not None
+        }
+        remote = [symbol for symbol in symbols if symbol not in results]
+        if remote:
+            cache = get_market_cache()
+            if start or end:
+                frames = cache.history_many(remote, start=start, end=end + timedelta(days=1) if end else None)
+            else:
+                frames = cache.history_many(remote, period=period)
+            for symbol, hist in frames.items():
+                if hist.empty:
+                    results[symbol] = {"error": f"No historical data for {symbol}"}
+                else:
+                    results[symbol] = {"result": history_result(bars.frame_series(hist), options)}
+        return {"result": {symbol: results[symbol] for symbol in symbols}}
+    except Exception as e:
+        return {"error": str(e)}
+
+async def predict_stock_price_batch(params):
+    symbols = batch_symbols(params)
+    days_ahead = params.get("days_ahead", 1)
+    error = batch_error(symbols)
+    if error:
+        return error
+    try:
+        forecasts = get_forecast_cache()
+        models = {symbol: model for symbol, model in forecasts.from_store_many(store, symbols).items() if model is not None}
+        remote = [symbol for symbol in symbols if symbol not in models]
+        if remote:
+            import pandas as pd
+            for symbol, df in get_market_cache().history_many(remote, period="1y").items():
+                if df.empty:
+                    continue
+                df = df.reset_index()
+                dates = pd.to_datetime(df['Date']).values.astype('datetime64[D]')
+                models[symbol] = forecasts.sync(("yfinance", symbol), dates, df['Close'].values)
+        # A series whose closes are all missing gets the same no-data answer as an unknown symbol
+        ready = [symbol for symbol in symbols if symbol in models and models[symbol].n]
+        # One vectorized evaluation for every symbol
+        predictions = forecasts.predict_many([models[symbol] for symbol in ready], [int(days_ahead)])[:, 0] if ready else []
+        results = {symbol: {"result": f"{price:.2f}"} for symbol, price in zip(ready, predictions)}
+        return {"result": {symbol: results.get(symbol, {"error": f"No historical data for {symbol}"}) for symbol in symbols}}
+    except Exception as e:
+        return {"error": str(e)}
+
 # Register tools manually
 app.register_tool("fetch_stock_price", "Fetch current or historical stock price", fetch_stock_price)
 app.register_tool("fetch_historical_data", "Fetch historical stock data", fetch_historical_data)
 app.register_tool("predict_stock_price", "Predict future stock price", predict_stock_price)
+app.register_tool("compute_indicators", "Compute SMA, EMA, rolling std, RSI and VWAP for a symbol", compute_indicators)
+app.register_tool("fetch_stock_price_batch", "Fetch current or historical prices for several symbols", fetch_stock_price_batch)
+app.register_tool("fetch_historical_data_batch", "Fetch historical data for several symbols", fetch_historical_data_batch)
+app.register_tool("predict_stock_price_batch", "Predict future prices for several symbols", predict_stock_price_batch)
+
+def warm_market_data():
+    store.data()
+
+def warm_upstream():
+    # The provider's client library (yfinance brings pandas with it)
+    provider = get_market_cache().provider
+    if hasattr(provider, "warm_up"):
+        provider.warm_up()
+
+# Run in the background once the server is reading requests; a tool called
+# before its stage has finished loads what it needs itself.
+app.warmup = WarmUp([("market_data", warm_market_data), ("upstream", warm_upstream)], name="mcp-warmup")
 
 if __name__ == "__main__":
+    # stdout carries the protocol, so server-side metrics are served over HTTP or the "metrics" method
+    if os.getenv("MCP_METRICS_PORT"):
+        serve_metrics(int(os.getenv("MCP_METRICS_PORT")))
     asyncio.run(app.run())
\ No newline at end of file
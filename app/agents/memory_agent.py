@@ -3,6 +3,7 @@ from agno.memory.v2.memory import Memory
 from agno.memory.v2.db.sqlite import SqliteMemoryDb
 from agno.models.groq import Groq
 import os
+from utils.metrics import span
 
 class MemoryAgent:
     def __init__(self):
@@ -27,4 +28,11 @@ class MemoryAgent:
             add_datetime_to_instructions=True,
             add_history_to_messages=True,
             num_history_runs=3
-        )
\ No newline at end of file
+        )
+
+    def stream(self, prompt):
+        """Text chunks of the agent's answer as the model produces them."""
+        with span("agent_run", agent="MemoryAgent"):
+            for chunk in self.agent.run(prompt, stream=True):
+                if chunk.content:
+                    yield chunk.content
@@ -1,7 +1,9 @@
 from agno.agent import Agent
 from agno.models.groq import Groq
 import os
-from utils.rag import process_pdf
+from utils.rag import TOP_K, get_document_index
+from utils.llm_cache import get_llm_cache
+from utils.metrics import span
 
 class RAGAgent:
     def __init__(self):
@@ -10,7 +12,8 @@ class RAGAgent:
             role="Handle queries based on uploaded PDF content",
             model=Groq(id="qwen-qwq-32b", api_key=os.getenv("GROQ_API_KEY")),
             instructions=[
-                "Answer queries based on the provided PDF content.",
+                "Answer queries based on the provided PDF excerpts.",
+                "Cite the page numbers of the excerpts you use.",
                 "Indicate in the response that you are the RAGAgent.",
                 "If PDF processing fails, return an error message."
             ],
@@ -18,13 +21,29 @@ class RAGAgent:
             add_datetime_to_instructions=True
         )
 
+    def build_prompt(self, query, uploaded_file, top_k=TOP_K):
+        # The index is built once per distinct file and reused for follow-up questions
+        index = get_document_index(uploaded_file)
+        if index is None or not len(index):
+            return None
+        hits = index.search(query, k=top_k)
+        if not hits:
+            excerpts = "No passage in the PDF matches the query."
+        else:
+            excerpts = "\n\n".join(f"[Page {page}] {text}" for page, text, _ in hits)
+        return f"Based on the following excerpts from the PDF, answer the query:\n\n{excerpts}\n\nQuery: {query}"
+
+    def stream_answer(self, prompt):
+        """Text chunks of the answer to a build_prompt prompt, ending with the agent footer."""
+        # The prompt carries the retrieved excerpts, so it already identifies the document
+        with span("agent_run", agent="RAGAgent"):
+            yield from get_llm_cache().stream(
+                "rag", self.agent.model.id, prompt,
+                lambda: (chunk.content for chunk in self.agent.run(prompt, stream=True) if chunk.content))
+        yield "\n\n*Response by RAGAgent*"
+
     def query_rag(self, query, uploaded_file):
-        # Process the uploaded PDF
-        pdf_text = process_pdf(uploaded_file)
-        if not pdf_text:
+        prompt = self.build_prompt(query, uploaded_file)
+        if prompt is None:
             return "Failed to process PDF.\n\n*Response by RAGAgent*"
-
-        # Construct prompt with PDF content
-        prompt = f"Based on the following PDF content, answer the query:\n\n{pdf_text}\n\nQuery: {query}"
-        response = self.agent.run(prompt).content
-        return f"{response}\n\n*Response by RAGAgent*"
\ No newline at end of file
+        return "".join(self.stream_answer(prompt))
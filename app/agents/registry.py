@@ -0,0 +1,106 @@
+import importlib
+import threading
+from utils.warmup import WarmUp
+
+class AgentRegistry:
+    """Builds each registered agent once, on first use, and shares it across threads."""
+
+    def __init__(self, factories=None):
+        self._factories = dict(factories or {})
+        self._instances = {}
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+
+    def get(self, name):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        # Each entry is built under its own lock, with the registry lock released,
+        # so a factory can get() the agents it depends on and different entries
+        # build concurrently
+        with self._lock:
+            building = self._building.setdefault(name, threading.Lock())
+        with building:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = self._factories[name]()
+                with self._lock:
+                    self._instances[name] = instance
+        return instance
+
+    def is_built(self, name):
+        return name in self._instances
+
+    def built(self):
+        return list(self._instances)
+
+def lazy(module, name):
+    """Factory for `module.name()` that imports module only when first called.
+
+    Agent modules pull in agno, groq, scikit-learn and PyPDF2; registering
+    them this way keeps those imports off the start-up path.
+    """
+    def factory():
+        return getattr(importlib.import_module(module), name)()
+    return factory
+
+_team = None
+_team_lock = threading.Lock()
+
+def get_team():
+    global _team
+    if _team is None:
+        with _team_lock:
+            if _team is None:
+                from agents.coordinator_team import ReasoningStockTeam
+                _team = ReasoningStockTeam()
+    return _team
+
+def _warm_database():
+    from utils.db import init_db
+    init_db()
+
+def _warm_market_data():
+    # Loads the market data store and the symbol universe the router resolves against
+    from utils.symbols import get_resolver
+    get_resolver()
+
+def _warm_mcp_server():
+    # The server warms its own data in its process; a ping confirms it is reading requests
+    from utils.aio import run_sync
+    team = get_team()
+    client = run_sync(team.initialize_mcp_client())
+    reply = run_sync(client.send("ping", {}, timeout=30))
+    if reply != "pong":
+        raise RuntimeError(f"MCP server did not answer: {reply}")
+
+def _warm_agents():
+    team = get_team()
+    for name in ("memory", "knowledge", "rag", "groq_client", "team"):
+        team.agents.get(name)
+
+# In the order the first question needs them; the member agents (agno, groq,
+# scikit-learn) come last, as only the LLM-backed routes use them
+WARMUP_STAGES = [
+    ("database", _warm_database),
+    ("market_data", _warm_market_data),
+    ("team", get_team),
+    ("mcp_server", _warm_mcp_server),
+    ("agents", _warm_agents),
+]
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+def get_warmup():
+    """The app's background warm-up (not started until start() is called)."""
+    global _warmup
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                _warmup = WarmUp(WARMUP_STAGES, name="app-warmup")
+    return _warmup
@@ -0,0 +1,131 @@
+import re
+from collections import namedtuple
+from utils.symbols import SymbolResolver
+
+Intent = namedtuple("Intent", ["name", "confidence", "params"])
+
+MEMORY = "memory"
+OPEN_PRICE = "open_price"
+STOCK_PRICE = "stock_price"
+HISTORICAL = "historical"
+PREDICT = "predict"
+INDICATORS = "indicators"
+PDF = "pdf"
+GENERAL = "general"
+# Intents answered by an MCP tool once a symbol is known
+STOCK_INTENTS = (STOCK_PRICE, HISTORICAL, PREDICT, INDICATORS)
+
+# (intent, weight, pattern); patterns are matched against the lowercased query.
+# Earlier rules win where matches overlap, so multi-word phrases come first.
+RULES = [
+    (HISTORICAL, 3, r"\bhistorical\b|\bprice history\b|\bpast (?:month|week|year)\b|\bover the last\b"),
+    (HISTORICAL, 1, r"\b(?:trend|performance|data for)\b"),
+    (MEMORY, 3, r"\b(?:earlier|previous(?:ly)?|history|last time|what did i ask|did i ask|remind me)\b"),
+    (MEMORY, 3, r"\bmy (?:last|first) (?:\d+ )?(?:question|quer(?:y|ies))s?\b|\bwhich (?:stocks?|symbols?|tickers?|compan(?:y|ies)) did i\b"),
+    (INDICATORS, 4, r"\b(?:moving average|sma|ema|rsi|relative strength|vwap|volatility|standard deviation)\b"),
+    (OPEN_PRICE, 4, r"\b(?:market )?open(?:ing)? price\b|\bopened at\b"),
+    (STOCK_PRICE, 2, r"\b(?:price|trading at|quote|share value|worth)\b"),
+    (STOCK_PRICE, 1, r"\bhow much is\b"),
+    (PREDICT, 4, r"\b(?:predict(?:ed|ion)?|forecast|projected|will .{0,20}\bbe\b)"),
+    (PREDICT, 1, r"\bin \d+ (?:day|week)s?\b|\b(?:tomorrow|next week|next month)\b"),
+    (PDF, 3, r"\b(?:pdf|document|uploaded|attachment|the report|the filing|this file)\b"),
+    (PDF, 1, r"\baccording to\b|\bsummari[sz]e\b"),
+    (GENERAL, 3, r"\b(?:ceo|capital|president|news|founder|founded|headquarter(?:s|ed)?)\b"),
+    (GENERAL, 2, r"\b(?:who (?:is|was|are)|what is an?|explain|define|meaning of)\b"),
+]
+# Tie-break order when two intents score the same
+PRIORITY = [MEMORY, PDF, OPEN_PRICE, PREDICT, INDICATORS, HISTORICAL, STOCK_PRICE, GENERAL]
+
+# Indicator names as users write them, mapped to compute_indicators names; earlier entries win
+INDICATOR_TERMS = [
+    ("ema", r"exponential moving average|ema"),
+    ("sma", r"(?:simple )?moving average|sma"),
+    ("rsi", r"relative strength(?: index)?|rsi"),
+    ("vwap", r"volume[- ]weighted average price|vwap"),
+    ("std", r"volatility|standard deviation"),
+]
+
+class IntentRouter:
+    """Local, LLM-free query classifier.
+
+    All rules are compiled into a single alternation, so one scan of the query
+    scores every intent. The result is confident only if the winner clearly
+    beats the runner-up; anything else escalates to the LLM-backed chain.
+    """
+
+    def __init__(self, rules=RULES, threshold=0.6, resolver=None):
+        self.threshold = threshold
+        self.weights = {}
+        parts = []
+        for i, (intent, weight, pattern) in enumerate(rules):
+            group = f"r{i}"
+            self.weights[group] = (intent, weight)
+            parts.append(f"(?P<{group}>{pattern})")
+        self.pattern = re.compile("|".join(parts))
+        # A SymbolResolver, or a callable returning the current one (the universe can be reloaded)
+        self.resolver = resolver or SymbolResolver.from_names()
+        self.horizon_pattern = re.compile(r"\b(\d+)\s*(day|week|month)s?\b", re.IGNORECASE)
+        # "50-day moving average", "RSI(14)", "EMA 20"
+        names = "|".join(f"(?P<{name}>{pattern})" for name, pattern in INDICATOR_TERMS)
+        self.indicator_pattern = re.compile(
+            rf"(?:\b(?P<before>\d{{1,4}})[- ]?(?:day|d)\s+)?\b(?:{names})\b(?:\s*\(\s*(?P<paren>\d{{1,4}})\s*\)|\s+(?P<after>\d{{1,4}})\b)?",
+            re.IGNORECASE)
+
+    def extract_params(self, query):
+        # Dates are left to utils.dates.DateParser, which the tools' callers use
+        params = {}
+        symbol = self.extract_symbol(query)
+        if symbol:
+            params["symbol"] = symbol
+            symbols = self.extract_symbols(query)
+            if len(symbols) > 1:
+                params["symbols"] = symbols
+        horizon_match = self.horizon_pattern.search(query)
+        if horizon_match:
+            amount, unit = int(horizon_match.group(1)), horizon_match.group(2).lower()
+            params["days_ahead"] = amount * {"day": 1, "week": 7, "month": 30}[unit]
+        indicators = self.extract_indicators(query)
+        if indicators:
+            params["indicators"] = indicators
+        return params
+
+    def extract_symbol(self, query):
+        resolver = self.resolver() if callable(self.resolver) else self.resolver
+        return resolver.resolve(query)
+
+    def extract_symbols(self, query):
+        """Every symbol in the query, for questions about several at once."""
+        resolver = self.resolver() if callable(self.resolver) else self.resolver
+        return resolver.resolve_all(query)
+
+    def extract_indicators(self, query):
+        """compute_indicators specs ("sma:50", or "rsi" for the default window) named in the query."""
+        specs = []
+        for match in self.indicator_pattern.finditer(query):
+            name = next(name for name, _ in INDICATOR_TERMS if match.group(name))
+            window = match.group("before") or match.group("paren") or match.group("after")
+            spec = f"{name}:{int(window)}" if window else name
+            if spec not in specs:
+                specs.append(spec)
+        return specs
+
+    def route(self, query, has_file=False):
+        query_lower = query.lower()
+        scores = {}
+        for match in self.pattern.finditer(query_lower):
+            intent, weight = self.weights[match.lastgroup]
+            scores[intent] = scores.get(intent, 0) + weight
+        if not has_file:
+            scores.pop(PDF, None)
+        params = self.extract_params(query)
+        if not scores:
+            return Intent(GENERAL, 0.0, params)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], PRIORITY.index(item[0])))
+        best, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0
+        # Margin over the runner-up, damped until the winner has some real evidence
+        confidence = (best_score - runner_up) / best_score * min(1.0, best_score / 3.0)
+        return Intent(best, round(confidence, 3), params)
+
+    def is_confident(self, intent):
+        return intent.confidence >= self.threshold
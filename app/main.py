@@ -1,14 +1,31 @@
 import streamlit as st
 import os
+import uuid
 from dotenv import load_dotenv
-from agents.coordinator_team import ReasoningStockTeam
-from utils.db import init_db, save_chat, get_chat_history
+from agents.registry import get_team, get_warmup
+from utils.aio import iterate_sync, run_sync
+from utils.db import save_chat, get_chat_history
+from utils.metrics import get_metrics, serve_metrics, set_readiness
 
 # Load environment variables
 load_dotenv()
 
-# Initialize database
-init_db()
+# Optional Prometheus/JSON endpoint for the pipeline's stage latencies, one per process
+@st.cache_resource
+def metrics_server_once():
+    port = os.getenv("METRICS_PORT")
+    return serve_metrics(int(port)) if port else None
+
+metrics_server_once()
+
+# Database, market data, the MCP server and the agents load in the background, started
+# once per process after the first page has been sent (see the end of this script).
+# A question asked before then loads whatever it needs itself.
+@st.cache_resource
+def warmup_once():
+    warmup = get_warmup()
+    set_readiness(warmup.status)
+    return warmup.start()
 
 # Streamlit app
 st.title("Multi-Agent Stock Market Q&A System")
@@ -16,9 +33,19 @@ st.title("Multi-Agent Stock Market Q&A System")
 # Initialize session state for chat history
 if "messages" not in st.session_state:
     st.session_state.messages = []
+# Chat history is stored and read per browser session
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
-# Initialize Agno Team
-team = ReasoningStockTeam()
+# Latency per pipeline stage since the process started, and an opt-in profile of the next request
+with st.sidebar:
+    # One request only: the box is cleared on the run after a profiled request
+    if st.session_state.pop("profile_done", False):
+        st.session_state.profile_next = False
+    profile_request = st.checkbox("Profile next request", key="profile_next",
+                                  help="Writes a cProfile/pyinstrument report to tmp/profiles")
+    with st.expander("Stage latency"):
+        st.dataframe(get_metrics().to_json())
 
 # File uploader for PDFs
 uploaded_file = st.file_uploader("Upload a PDF for additional context", type=["pdf"])
@@ -39,13 +66,33 @@ if prompt := st.chat_input("Ask a question about the stock market, PDF content,
     with st.chat_message("user"):
         st.markdown(f"**User**: {prompt}")
 
-    # Process the query with the team
-    response, agent_name = team.process_query(prompt, uploaded_file)
+    # Shared Agno Team: built once per process, member agents are created on first use.
+    # Per-session state (messages, uploaded file) stays in st.session_state and widgets.
+    team = get_team()
+
+    # Route the query on the shared event loop, then render the answer as its tokens arrive
+    agent_name, chunks = run_sync(team.process_query_stream(prompt, uploaded_file, st.session_state.session_id, profile_request))
+    with st.chat_message("assistant"):
+        st.markdown(f"**{agent_name}**:")
+        response = st.write_stream(iterate_sync(chunks))
 
-    # Save to database
-    save_chat(prompt, response, agent_name)
+    # Save to database once the answer is complete (queued; written in batches by a background thread)
+    save_chat(prompt, response, agent_name, st.session_state.session_id)
 
     # Add response to session state
     st.session_state.messages.append({"role": "assistant", "agent": agent_name, "content": response})
-    with st.chat_message("assistant"):
-        st.markdown(f"**{agent_name}**: {response}")
\ No newline at end of file
+
+    if profile_request:
+        st.session_state.profile_done = True
+        st.rerun()
+
+# Readiness: warm-up runs after the page above is rendered
+warmup = warmup_once()
+with st.sidebar:
+    status = warmup.status()
+    if not status["ready"]:
+        running = next((name for name, stage in status["stages"].items() if stage["state"] == "running"), "starting")
+        st.caption(f"Warming up: {running}...")
+    else:
+        failed = [name for name, stage in status["stages"].items() if stage["state"] == "failed"]
+        st.caption(f"Ready; warm-up failed for {', '.join(failed)}" if failed else "Ready")
@@ -0,0 +1,150 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import profiled
+
+# Blocking work (Agno agent runs, psycopg2, PyPDF2, yfinance) is offloaded here so the
+# event loop stays free; the bound caps how many such calls run at once per process.
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "32"))
+
+_executor = None
+_loop = None
+_lock = threading.Lock()
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+    return _executor
+
+async def run_blocking(func, *args, timeout=None, **kwargs):
+    """Run a blocking callable on the bounded executor, optionally with a timeout.
+
+    When the current request is being profiled, so is the call (see utils.metrics.profiled).
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_executor(), profiled(functools.partial(func, *args, **kwargs)))
+    if timeout is None:
+        return await future
+    return await asyncio.wait_for(future, timeout)
+
+def get_loop():
+    """Process-wide event loop running in a daemon thread.
+
+    Streamlit runs each session's script on its own thread; submitting every
+    query to this one loop lets async clients (AsyncGroq, the MCP client) be
+    shared across sessions instead of being tied to a per-rerun loop.
+    """
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="app-event-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+def run_sync(coro, timeout=None):
+    """Run a coroutine on the shared loop and wait for its result from synchronous code."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result(timeout)
+
+_DONE = object()
+
+async def stream_blocking(func, *args, timeout=None, **kwargs):
+    """Iterate a blocking generator func(*args) on the bounded executor, yielding its items on the loop.
+
+    timeout bounds the wait for each item. Closing the stream early stops the
+    producer after its current item.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def put(item, error=None):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:
+            # The loop is gone; nobody is listening any more
+            stop.set()
+
+    def produce():
+        try:
+            for item in func(*args, **kwargs):
+                if stop.is_set():
+                    return
+                put(item)
+        except BaseException as e:
+            put(_DONE, e)
+            return
+        put(_DONE)
+
+    loop.run_in_executor(get_executor(), profiled(produce))
+    try:
+        while True:
+            item, error = await (queue.get() if timeout is None else asyncio.wait_for(queue.get(), timeout))
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+async def iterate_with_timeout(stream, timeout):
+    """Re-yield an async iterator, failing with asyncio.TimeoutError if any item takes longer than timeout."""
+    iterator = stream.__aiter__()
+    while True:
+        try:
+            item = await asyncio.wait_for(iterator.__anext__(), timeout)
+        except StopAsyncIteration:
+            return
+        yield item
+
+async def read_prefix(stream, min_chars):
+    """Buffer text chunks until at least min_chars have arrived (or the stream ends).
+
+    Returns (prefix, stream) where the returned stream replays the prefix first,
+    so a caller can inspect the start of an answer before committing to it.
+    """
+    iterator = stream.__aiter__()
+    chunks = []
+    size = 0
+    exhausted = False
+    while size < min_chars:
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            exhausted = True
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+
+    async def replay():
+        for chunk in chunks:
+            yield chunk
+        if not exhausted:
+            async for chunk in iterator:
+                yield chunk
+
+    return "".join(chunks), replay()
+
+def iterate_sync(stream, timeout=None):
+    """Iterate an async iterator from synchronous code, driving it on the shared loop."""
+    iterator = stream.__aiter__()
+    loop = get_loop()
+
+    async def step():
+        try:
+            return True, await iterator.__anext__()
+        except StopAsyncIteration:
+            return False, None
+
+    while True:
+        more, item = asyncio.run_coroutine_threadsafe(step(), loop).result(timeout)
+        if not more:
+            return
+        yield item
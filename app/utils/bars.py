@@ -0,0 +1,161 @@
+"""Price series for the wire: downsampling, summary statistics and a columnar encoding.
+
+A series is a dict of parallel NumPy arrays, {'Date': datetime64[D], 'Open':
+..., 'Close': ...}, as MarketDataStore.get_range returns. On the wire it is
+sent column by column rather than as one dict per day: either as JSON arrays
+("columns") or as base64 little-endian buffers ("packed"). Dates travel as
+integer days since 1970-01-01, so both decode straight into NumPy.
+"""
+import base64
+import math
+import numpy as np
+from utils.market_data import format_dates
+
+INTERVALS = ("1d", "1wk", "1mo")
+FORMATS = ("rows", "columns", "packed")
+DEFAULT_COLUMNS = ("Open", "Close")
+
+def frame_series(hist):
+    """A yfinance history DataFrame as a series dict."""
+    import pandas as pd
+    dates = pd.DatetimeIndex(hist.index)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    series = {'Date': dates.values.astype('datetime64[D]')}
+    for name in ('Open', 'High', 'Low', 'Close', 'Volume'):
+        if name in hist.columns:
+            series[name] = hist[name].to_numpy(dtype=np.float64)
+    return series
+
+def resample(series, interval):
+    """Weekly (Monday-labelled) or monthly OHLCV bars from daily ones; "1d" returns series as is."""
+    if interval == "1d" or not len(series['Date']):
+        return series
+    days = series['Date'].astype('datetime64[D]')
+    if interval == "1wk":
+        # 1970-01-01 was a Thursday; shift so buckets start on Mondays
+        keys = (days.astype(np.int64) + 3) // 7
+        labels = (keys * 7 - 3).astype('datetime64[D]')
+    else:
+        months = days.astype('datetime64[M]')
+        keys = months.astype(np.int64)
+        labels = months.astype('datetime64[D]')
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.append(starts[1:], len(keys)) - 1
+    result = {'Date': labels[starts]}
+    for name, column in series.items():
+        if name == 'Date':
+            continue
+        column = np.asarray(column, dtype=np.float64)
+        if name == 'Open':
+            result[name] = column[starts]
+        elif name == 'Close':
+            result[name] = column[ends]
+        elif name == 'High':
+            result[name] = np.fmax.reduceat(column, starts)
+        elif name == 'Low':
+            result[name] = np.fmin.reduceat(column, starts)
+        else:
+            result[name] = np.add.reduceat(np.nan_to_num(column), starts)
+    return result
+
+def json_number(value):
+    """A float for JSON: rounded, with NaN as None."""
+    value = float(value)
+    return None if math.isnan(value) else round(value, 6)
+
+def summarize(series):
+    """Summary statistics over the whole series: range, first/last close, change, high/low, mean and volatility."""
+    days = series['Date']
+    close = np.asarray(series.get('Close', []), dtype=np.float64)
+    if not len(days) or not len(close) or np.isnan(close).all():
+        return {"count": int(len(days))}
+    valid = close[~np.isnan(close)]
+    high = np.asarray(series.get('High', close), dtype=np.float64)
+    low = np.asarray(series.get('Low', close), dtype=np.float64)
+    returns = np.diff(valid) / valid[:-1] if len(valid) > 1 else valid[:0]
+    summary = {
+        "count": int(len(days)),
+        "start": format_dates(days[:1])[0],
+        "end": format_dates(days[-1:])[0],
+        "first_close": json_number(valid[0]),
+        "last_close": json_number(valid[-1]),
+        "change": json_number(valid[-1] - valid[0]),
+        "change_pct": json_number((valid[-1] / valid[0] - 1) * 100) if valid[0] else None,
+        "high": json_number(np.nanmax(high)),
+        "low": json_number(np.nanmin(low)),
+        "mean_close": json_number(valid.mean()),
+        # Standard deviation of daily (or per-bar) returns, in percent
+        "volatility_pct": json_number(returns.std() * 100) if len(returns) else None,
+    }
+    if 'Volume' in series:
+        summary["volume"] = json_number(np.nansum(series['Volume']))
+    return summary
+
+def page(series, limit=None, cursor=None, tail=False):
+    """Bars from the cursor (a day number) on, at most limit of them; returns (series, next cursor or None).
+
+    With tail, pages run backwards from the newest bar: a page holds the last
+    limit bars before the cursor (or the end), still in date order, and its
+    next cursor is the day of its first bar.
+    """
+    days = series['Date'].astype('datetime64[D]').astype(np.int64)
+    if tail:
+        j = len(days) if cursor is None else int(np.searchsorted(days, int(cursor), side='left'))
+        i = 0 if limit is None else max(0, j - limit)
+        next_cursor = int(days[i]) if i > 0 else None
+    else:
+        i = 0 if cursor is None else int(np.searchsorted(days, int(cursor), side='left'))
+        j = len(days) if limit is None else min(len(days), i + limit)
+        next_cursor = int(days[j]) if j < len(days) else None
+    return {name: column[i:j] for name, column in series.items()}, next_cursor
+
+def _pack(array, dtype):
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode('ascii')
+
+def encode(series, fmt="columns", columns=DEFAULT_COLUMNS):
+    """The series in a wire format: "rows" (one dict per bar), "columns" or "packed"."""
+    names = [name for name in columns if name in series]
+    if fmt == "rows":
+        dates = format_dates(series['Date'])
+        values = [series[name].tolist() for name in names]
+        return [dict(zip(['Date'] + names, row)) for row in zip(dates, *values)]
+    days = series['Date'].astype('datetime64[D]').astype(np.int64)
+    if fmt == "packed":
+        return {
+            "dates": _pack(days, '<i4'),
+            "columns": {name: _pack(series[name], '<f8') for name in names},
+        }
+    return {
+        "dates": days.tolist(),
+        # JSON has no NaN; missing values go out as null
+        "columns": {name: [None if v != v else v for v in series[name].tolist()] for name in names},
+    }
+
+def decode(payload, fmt="columns"):
+    """Inverse of encode for "columns" and "packed": a series dict of NumPy arrays."""
+    if fmt == "packed":
+        series = {'Date': np.frombuffer(base64.b64decode(payload["dates"]), dtype='<i4').astype('datetime64[D]')}
+        for name, data in payload["columns"].items():
+            series[name] = np.frombuffer(base64.b64decode(data), dtype='<f8')
+        return series
+    series = {'Date': np.asarray(payload["dates"], dtype=np.int64).astype('datetime64[D]')}
+    for name, values in payload["columns"].items():
+        series[name] = np.array(values, dtype=np.float64)
+    return series
+
+def history_payload(series, interval="1d", fmt="columns", columns=DEFAULT_COLUMNS, summary=False, limit=None, cursor=None,
+                    tail=False):
+    """Downsample, paginate and encode a daily series for fetch_historical_data.
+
+    The summary, when asked for, covers the whole requested range at daily
+    resolution, whichever page is being returned.
+    """
+    payload = {"format": fmt, "interval": interval}
+    if tail:
+        payload["tail"] = True
+    if summary:
+        payload["summary"] = summarize(series)
+    bars, payload["next_cursor"] = page(resample(series, interval), limit, cursor, tail)
+    payload["data"] = encode(bars, fmt, columns)
+    return payload
@@ -0,0 +1,155 @@
+"""Per-session conversation context kept inside a token budget.
+
+Each turn is compacted once when it is added: the agent footer is dropped,
+runs of table-like lines (price histories, CSV rows, markdown tables) become
+a one-line reference, and long queries and responses are truncated. When the
+budget is exceeded the oldest turns are folded into a short summary of the
+questions asked. Rendering is cached until the next turn arrives.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+
+TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+QUERY_TOKENS = 60
+RESPONSE_TOKENS = 200
+SUMMARY_TOKENS = 200
+SUMMARY_WORDS = 12
+MIN_TABLE_ROWS = 3
+MAX_SESSIONS = 10000
+
+FOOTER = re.compile(r"\s*\*Response by \w+\*\s*$")
+TABLE_ROW = re.compile(
+    r"^\s*(?:\|.*\||\d{1,4}[/-]\d{1,2}[/-]\d{1,4}\b.*[:,].*\d|[\w.$-]+(?:\s*,\s*[\w.$-]+){3,})\s*$")
+ROW_DATE = re.compile(r"\d{1,4}[/-]\d{1,2}[/-]\d{1,4}")
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token), deterministic and dependency-free."""
+    return (len(text) + 3) // 4
+
+def truncate(text, tokens):
+    limit = tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > limit // 2 else limit].rstrip() + " …"
+
+def collapse_tables(text, min_rows=MIN_TABLE_ROWS):
+    """Replace runs of at least min_rows table-like lines with a one-line reference."""
+    lines = text.splitlines()
+    out = []
+    i = 0
+    while i < len(lines):
+        j = i
+        while j < len(lines) and TABLE_ROW.match(lines[j]):
+            j += 1
+        if j - i >= min_rows:
+            dates = [m.group(0) for m in (ROW_DATE.search(line) for line in lines[i:j]) if m]
+            span = f", {dates[0]} to {dates[-1]}" if dates else ""
+            out.append(f"[table: {j - i} rows{span}]")
+            i = j
+        else:
+            out.append(lines[i])
+            i += 1
+    return "\n".join(out)
+
+def compact_turn(user_query, response, agent_name):
+    response = FOOTER.sub("", response or "")
+    response = " ".join(collapse_tables(response).split())
+    turn = {
+        "user_query": truncate(" ".join((user_query or "").split()), QUERY_TOKENS),
+        "agent_name": agent_name,
+        "response": truncate(response, RESPONSE_TOKENS),
+    }
+    turn["text"] = f"User: {turn['user_query']} | Agent: {agent_name} | Response: {turn['response']}"
+    turn["tokens"] = estimate_tokens(turn["text"]) + 1
+    return turn
+
+class ConversationContext:
+    """Rolling context for one session, oldest turn first."""
+
+    def __init__(self, budget=TOKEN_BUDGET, summary_tokens=SUMMARY_TOKENS):
+        self.budget = budget
+        self.summary_tokens = summary_tokens
+        self.turns = deque()
+        self.tokens = 0
+        self.summary = deque()
+        self.summary_size = 0
+        self._text = None
+        self._lock = threading.Lock()
+
+    def add(self, user_query, response, agent_name):
+        turn = compact_turn(user_query, response, agent_name)
+        with self._lock:
+            self.turns.append(turn)
+            self.tokens += turn["tokens"]
+            while self.turns and self.tokens + self.summary_size > self.budget and len(self.turns) > 1:
+                self._fold(self.turns.popleft())
+            self._text = None
+
+    def _fold(self, turn):
+        self.tokens -= turn["tokens"]
+        words = turn["user_query"].split()
+        line = " ".join(words[:SUMMARY_WORDS]) + (" …" if len(words) > SUMMARY_WORDS else "")
+        line = f"{line} ({turn['agent_name']})"
+        self.summary.append((line, estimate_tokens(line) + 1))
+        self.summary_size += self.summary[-1][1]
+        while self.summary_size > self.summary_tokens:
+            self.summary_size -= self.summary.popleft()[1]
+
+    def text(self):
+        with self._lock:
+            if self._text is None:
+                parts = []
+                if self.summary:
+                    parts.append("Earlier questions: " + "; ".join(line for line, _ in self.summary))
+                parts.extend(turn["text"] for turn in self.turns)
+                self._text = "\n".join(parts)
+            return self._text
+
+    def history(self):
+        """Recent turns newest first, shaped like get_chat_history rows."""
+        with self._lock:
+            return [{k: turn[k] for k in ("user_query", "agent_name", "response")} for turn in reversed(self.turns)]
+
+    def __len__(self):
+        return len(self.turns)
+
+class ContextManager:
+    """ConversationContext per session, least recently used sessions dropped first."""
+
+    def __init__(self, budget=TOKEN_BUDGET, max_sessions=MAX_SESSIONS):
+        self.budget = budget
+        self.max_sessions = max_sessions
+        self._contexts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            context = self._contexts.get(session_id)
+            if context is not None:
+                self._contexts.move_to_end(session_id)
+            return context
+
+    def seed(self, session_id, rows):
+        """Build a session's context from stored history rows (newest first), unless one exists."""
+        context = ConversationContext(self.budget)
+        for row in reversed(rows or []):
+            context.add(row["user_query"], row["response"], row["agent_name"])
+        with self._lock:
+            context = self._contexts.setdefault(session_id, context)
+            self._contexts.move_to_end(session_id)
+            while len(self._contexts) > self.max_sessions:
+                self._contexts.popitem(last=False)
+        return context
+
+    def add_turn(self, session_id, user_query, response, agent_name):
+        """Record a finished turn; sessions without a context are seeded from storage later."""
+        context = self.get(session_id)
+        if context is not None:
+            context.add(user_query, response, agent_name)
+
+    def drop(self, session_id):
+        with self._lock:
+            self._contexts.pop(session_id, None)
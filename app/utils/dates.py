@@ -0,0 +1,178 @@
+"""Date expressions in user queries: absolute, year-less, relative and ranges.
+
+Every form is compiled into one alternation, so a query is scanned once; the
+raw matches are memoized per text and resolved against "today" per call.
+"""
+import calendar
+import functools
+import re
+from collections import namedtuple
+from datetime import date, timedelta
+
+DateExpr = namedtuple("DateExpr", ["start", "end", "explicit_year", "text"])
+
+MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'jun': 6, 'jul': 7, 'aug': 8,
+    'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+WEEKDAYS = {name: i for i, name in enumerate(['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'])}
+NUMBER_WORDS = {'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'ten': 10}
+UNIT_DAYS = {'day': 1, 'week': 7}
+
+_MONTH = "(?:" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+_WEEKDAY = "(?:" + "|".join(WEEKDAYS) + ")"
+_COUNT = r"(?:\d+|" + "|".join(NUMBER_WORDS) + ")"
+_ORD = r"(?:st|nd|rd|th)?"
+
+DATE_PATTERN = re.compile("|".join([
+    rf"\b(?P<iso_y>\d{{4}})-(?P<iso_m>\d{{1,2}})-(?P<iso_d>\d{{1,2}})\b",
+    rf"\b(?P<num_m>\d{{1,2}})[/-](?P<num_d>\d{{1,2}})[/-](?P<num_y>\d{{4}})\b",
+    rf"\b(?P<dm_d>\d{{1,2}}){_ORD}(?:\s+of)?\s+(?P<dm_m>{_MONTH})(?![a-z])(?:,?\s+(?P<dm_y>\d{{4}})\b)?",
+    rf"\b(?P<md_m>{_MONTH})\s+(?P<md_d>\d{{1,2}}){_ORD}\b(?:,?\s+(?P<md_y>\d{{4}})\b)?",
+    r"\b(?P<rel>today|yesterday|tomorrow)\b",
+    rf"\b(?P<wd_dir>last|this|next|past|previous)\s+(?P<wd>{_WEEKDAY})\b",
+    rf"\b(?P<ago_n>{_COUNT})\s+(?P<ago_u>day|week|month|year)s?\s+ago\b",
+    rf"\b(?P<span_dir>last|past|previous)\s+(?:(?P<span_n>{_COUNT})\s+)?(?P<span_u>day|week|month|year)s?\b",
+    r"\b(?P<this_u>this)\s+(?P<this_p>week|month|year)\b",
+    r"\b(?P<ytd>year[- ]to[- ]date|ytd)\b",
+]), re.IGNORECASE)
+# Text allowed between two dates for them to form a range ("June 1 to June 5")
+RANGE_JOINER = re.compile(r"\s*(?:to|through|thru|until|till|and|-|–)\s*", re.IGNORECASE)
+
+def format_day(day):
+    return day.strftime('%m/%d/%Y')
+
+def _count(text):
+    return int(text) if text.isdigit() else NUMBER_WORDS[text.lower()]
+
+def add_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    return date(year, month + 1, min(day.day, calendar.monthrange(year, month + 1)[1]))
+
+@functools.lru_cache(maxsize=4096)
+def scan(text):
+    """Raw date matches in text as (start, end, groupdict) tuples; memoized per text."""
+    return tuple((m.start(), m.end(), m.groupdict()) for m in DATE_PATTERN.finditer(text))
+
+class DateParser:
+    """Turns the date expressions in a query into DateExpr ranges (start == end for single days).
+
+    year_resolver(month, day) picks the date for expressions without a year,
+    e.g. the latest matching date in the market data; when it returns None,
+    the most recent such date up to today is used.
+    """
+
+    def __init__(self, today=date.today, year_resolver=None):
+        self.today = today
+        self.year_resolver = year_resolver
+
+    def _resolve_yearless(self, month, day, today):
+        if self.year_resolver is not None:
+            resolved = self.year_resolver(month, day)
+            if resolved is not None:
+                return resolved
+        for year in (today.year, today.year - 1, today.year - 4):
+            try:
+                candidate = date(year, month, day)
+            except ValueError:
+                continue
+            if candidate <= today:
+                return candidate
+        return None
+
+    def _expression(self, groups, text, today):
+        """DateExpr for one raw match, or None if it does not name a valid date."""
+        try:
+            if groups['iso_y']:
+                day = date(int(groups['iso_y']), int(groups['iso_m']), int(groups['iso_d']))
+                return DateExpr(day, day, True, text)
+            if groups['num_y']:
+                day = date(int(groups['num_y']), int(groups['num_m']), int(groups['num_d']))
+                return DateExpr(day, day, True, text)
+            for prefix in ('dm', 'md'):
+                if groups[f'{prefix}_m']:
+                    month = MONTHS[groups[f'{prefix}_m'].lower().rstrip('.')]
+                    day_of_month = int(groups[f'{prefix}_d'])
+                    year = groups[f'{prefix}_y']
+                    if year:
+                        day = date(int(year), month, day_of_month)
+                        return DateExpr(day, day, True, text)
+                    day = self._resolve_yearless(month, day_of_month, today)
+                    return DateExpr(day, day, False, text) if day else None
+        except ValueError:
+            return None
+        if groups['rel']:
+            day = today + timedelta(days={'today': 0, 'yesterday': -1, 'tomorrow': 1}[groups['rel'].lower()])
+            return DateExpr(day, day, True, text)
+        if groups['wd']:
+            target = WEEKDAYS[groups['wd'].lower()]
+            direction = groups['wd_dir'].lower()
+            if direction == 'this':
+                day = today + timedelta(days=target - today.weekday())
+            elif direction == 'next':
+                day = today + timedelta(days=(target - today.weekday() - 1) % 7 + 1)
+            else:
+                day = today - timedelta(days=(today.weekday() - target - 1) % 7 + 1)
+            return DateExpr(day, day, True, text)
+        if groups['ago_u']:
+            n, unit = _count(groups['ago_n']), groups['ago_u'].lower()
+            day = add_months(today, -n * (12 if unit == 'year' else 1)) if unit in ('month', 'year') else today - timedelta(days=n * UNIT_DAYS[unit])
+            return DateExpr(day, day, True, text)
+        if groups['span_u']:
+            n, unit = _count(groups['span_n']) if groups['span_n'] else 1, groups['span_u'].lower()
+            start = add_months(today, -n * (12 if unit == 'year' else 1)) if unit in ('month', 'year') else today - timedelta(days=n * UNIT_DAYS[unit])
+            return DateExpr(start, today, True, text)
+        if groups['this_p']:
+            period = groups['this_p'].lower()
+            if period == 'week':
+                start = today - timedelta(days=today.weekday())
+            elif period == 'month':
+                start = today.replace(day=1)
+            else:
+                start = today.replace(month=1, day=1)
+            return DateExpr(start, today, True, text)
+        if groups['ytd']:
+            return DateExpr(today.replace(month=1, day=1), today, True, text)
+        return None
+
+    def parse_all(self, query, today=None):
+        """Every date expression in the query, in order; "X to Y" pairs are merged into one range.
+
+        today overrides the reference date for relative expressions, e.g. for a past message.
+        """
+        today = today or self.today()
+        found = []
+        for start, end, groups in scan(query):
+            expr = self._expression(groups, query[start:end], today)
+            if expr is None:
+                continue
+            if found:
+                prev_start, prev_end, prev = found[-1]
+                if prev.start == prev.end and expr.start == expr.end and RANGE_JOINER.fullmatch(query[prev_end:start]):
+                    first, last = prev, expr
+                    if not first.explicit_year and last.explicit_year:
+                        # "June 1 to June 5, 2025": the year carries over to the first date
+                        try:
+                            first = first._replace(start=first.start.replace(year=last.start.year), explicit_year=True)
+                        except ValueError:
+                            pass
+                    lo, hi = sorted((first.start, last.end))
+                    found[-1] = (prev_start, end, DateExpr(lo, hi, first.explicit_year and last.explicit_year, query[prev_start:end]))
+                    continue
+            found.append((start, end, expr))
+        return [expr for _, _, expr in found]
+
+    def parse(self, query):
+        """First date expression in the query, or None."""
+        exprs = self.parse_all(query)
+        return exprs[0] if exprs else None
+
+    def parse_day(self, query):
+        """First single-day expression in the query as a date, or None."""
+        for expr in self.parse_all(query):
+            if expr.start == expr.end:
+                return expr.start
+        return None
@@ -1,21 +1,63 @@
-import psycopg2
-from psycopg2 import pool
+import atexit
 import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from utils.metrics import span
 
 load_dotenv()
 
-# Initialize connection pool
-connection_pool = psycopg2.pool.SimpleConnectionPool(
-    1, 20,
-    dbname=os.getenv("DB_NAME"),
-    user=os.getenv("DB_USER"),
-    password=os.getenv("DB_PASSWORD"),
-    host=os.getenv("DB_HOST"),
-    port=os.getenv("DB_PORT")
-)
+DEFAULT_SESSION = "default"
+HISTORY_LIMIT = 10
+# Recent turns kept in process per session; every agent in a request reads from here
+RECENT_HISTORY_SIZE = 50
+MAX_SESSIONS = 10000
+WRITE_BATCH_SIZE = 100
+WRITE_FLUSH_INTERVAL = 0.5
+
+POOL_MIN = 1
+POOL_MAX = 20
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """The connection pool (threaded: requests and the chat writer share it).
+
+    Created on first use rather than at import, so importing the app needs no
+    database; the chat_history schema is created along with it.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from psycopg2.pool import ThreadedConnectionPool
+                with span("db_connect"):
+                    connection_pool = ThreadedConnectionPool(
+                        POOL_MIN, POOL_MAX,
+                        dbname=os.getenv("DB_NAME"),
+                        user=os.getenv("DB_USER"),
+                        password=os.getenv("DB_PASSWORD"),
+                        host=os.getenv("DB_HOST"),
+                        port=os.getenv("DB_PORT")
+                    )
+                    try:
+                        _create_schema(connection_pool)
+                    except Exception:
+                        connection_pool.closeall()
+                        raise
+                _pool = connection_pool
+    return _pool
 
 def init_db():
+    """Connect and create the schema now instead of on the first query."""
+    get_pool()
+
+def _create_schema(connection_pool):
     conn = connection_pool.getconn()
     try:
         with conn.cursor() as cur:
@@ -28,27 +70,220 @@ def init_db():
                     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
             """)
+            cur.execute(f"ALTER TABLE chat_history ADD COLUMN IF NOT EXISTS session_id VARCHAR(64) NOT NULL DEFAULT '{DEFAULT_SESSION}';")
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS chat_history_session_ts_idx
+                ON chat_history (session_id, timestamp DESC, id DESC);
+            """)
             conn.commit()
     finally:
         connection_pool.putconn(conn)
 
-def save_chat(user_query, response, agent_name):
-    conn = connection_pool.getconn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "INSERT INTO chat_history (user_query, response, agent_name) VALUES (%s, %s, %s)",
-                (user_query, response, agent_name)
-            )
+def _row(row):
+    return {"id": row[0], "timestamp": row[1], "user_query": row[2], "response": row[3], "agent_name": row[4]}
+
+def fetch_chat_history(session_id=DEFAULT_SESSION, limit=HISTORY_LIMIT, before=None):
+    """Newest-first page of a session's history, read from Postgres.
+
+    `before` is the (timestamp, id) of the last row of the previous page
+    (keyset pagination on the (session_id, timestamp, id) index).
+    """
+    with span("db_read", op="chat_history"):
+        connection_pool = get_pool()
+        conn = connection_pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                if before is None:
+                    cur.execute(
+                        "SELECT id, timestamp, user_query, response, agent_name FROM chat_history "
+                        "WHERE session_id = %s ORDER BY timestamp DESC, id DESC LIMIT %s",
+                        (session_id, limit)
+                    )
+                else:
+                    cur.execute(
+                        "SELECT id, timestamp, user_query, response, agent_name FROM chat_history "
+                        "WHERE session_id = %s AND (timestamp, id) < (%s, %s) "
+                        "ORDER BY timestamp DESC, id DESC LIMIT %s",
+                        (session_id, before[0], before[1], limit)
+                    )
+                return [_row(row) for row in cur.fetchall()]
+        finally:
+            connection_pool.putconn(conn)
+
+class RecentHistoryCache:
+    """Last few turns per session, newest last, shared by every agent in the process.
+
+    Loaded from Postgres on first use and kept current by save_chat, so reads
+    within a request (and across reruns) do not touch the database. Least
+    recently used sessions are dropped first; they reload from Postgres.
+    """
+
+    def __init__(self, size=RECENT_HISTORY_SIZE, max_sessions=MAX_SESSIONS):
+        self.size = size
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id, limit):
+        with self._lock:
+            turns = self._sessions.get(session_id)
+            if turns is not None:
+                self._sessions.move_to_end(session_id)
+                return list(turns)[-limit:][::-1]
+        rows = fetch_chat_history(session_id, limit=self.size)
+        with self._lock:
+            # A save may have raced the load; it is already in the cache if so
+            turns = self._sessions.setdefault(session_id, deque(reversed(rows), maxlen=self.size))
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return list(turns)[-limit:][::-1]
+
+    def page(self, session_id, limit, before):
+        """Up to limit turns older than the cached turn `before` names, or None to read Postgres instead.
+
+        Turns saved since the last flush have no id yet, so the cache pages by
+        position rather than by (timestamp, id).
+        """
+        with self._lock:
+            turns = self._sessions.get(session_id)
+            if turns is None:
+                return None
+            turns = list(turns)
+        for i in range(len(turns) - 1, -1, -1):
+            if (turns[i]["timestamp"], turns[i]["id"]) == tuple(before):
+                older = turns[max(0, i - limit):i][::-1]
+                # Short of a full page, older turns may only be in Postgres
+                return older if len(older) == limit else None
+        return None
+
+    def append(self, session_id, row):
+        with self._lock:
+            turns = self._sessions.get(session_id)
+            if turns is not None:
+                turns.append(row)
+                self._sessions.move_to_end(session_id)
+
+    def drop(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+class ChatWriter:
+    """Write-behind queue: save_chat enqueues, a background thread inserts in batches."""
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE, flush_interval=WRITE_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, row):
+        self._ensure_started()
+        self._queue.put(row)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="chat-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, rows):
+        values = [(r["session_id"], r["user_query"], r["response"], r["agent_name"], r["timestamp"]) for r in rows]
+        for attempt in range(2):
+            try:
+                with span("db_write", op="chat_history"):
+                    self._insert(values)
+                return
+            except Exception as e:
+                if attempt:
+                    print(f"Dropped {len(rows)} chat rows after write failure: {e}", file=sys.stderr)
+
+    def _insert(self, values):
+        from psycopg2.extras import execute_values
+        connection_pool = get_pool()
+        conn = connection_pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    "INSERT INTO chat_history (session_id, user_query, response, agent_name, timestamp) VALUES %s",
+                    values
+                )
             conn.commit()
-    finally:
-        connection_pool.putconn(conn)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            connection_pool.putconn(conn)
 
-def get_chat_history():
-    conn = connection_pool.getconn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT user_query, response, agent_name FROM chat_history ORDER BY timestamp DESC LIMIT 10")
-            return [{"user_query": row[0], "response": row[1], "agent_name": row[2]} for row in cur.fetchall()]
-    finally:
-        connection_pool.putconn(conn)
\ No newline at end of file
+    def flush(self):
+        """Block until everything submitted so far is written."""
+        if self._thread is not None:
+            self._queue.join()
+
+_stamp_lock = threading.Lock()
+_last_stamp = None
+
+def _stamp():
+    """Timestamp for a new chat row: the app's clock, strictly increasing.
+
+    The insert passes it explicitly, so cached and stored rows share one clock,
+    and a row is identified by its timestamp before Postgres gives it an id.
+    """
+    global _last_stamp
+    with _stamp_lock:
+        now = datetime.now()
+        if _last_stamp is not None and now <= _last_stamp:
+            now = _last_stamp + timedelta(microseconds=1)
+        _last_stamp = now
+        return now
+
+recent_history = RecentHistoryCache()
+chat_writer = ChatWriter()
+atexit.register(chat_writer.flush)
+
+def save_chat(user_query, response, agent_name, session_id=DEFAULT_SESSION):
+    row = {
+        "session_id": session_id,
+        "user_query": user_query,
+        "response": response,
+        "agent_name": agent_name,
+        "timestamp": _stamp(),
+    }
+    recent_history.append(session_id, {"id": None, **{k: row[k] for k in ("timestamp", "user_query", "response", "agent_name")}})
+    chat_writer.submit(row)
+
+def get_chat_history(session_id=DEFAULT_SESSION, limit=HISTORY_LIMIT, before=None):
+    """Newest-first history for a session; recent pages come from the in-process cache.
+
+    `before` is the (timestamp, id) of the last row of the previous page; the
+    id is None for a row saved since the last flush.
+    """
+    if limit <= recent_history.size:
+        if before is None:
+            return recent_history.get(session_id, limit)
+        rows = recent_history.page(session_id, limit, before)
+        if rows is not None:
+            return rows
+    if before is not None and before[1] is None:
+        # Not written yet: write it, then page from its timestamp, which no other row shares
+        chat_writer.flush()
+        before = (before[0], 0)
+    return fetch_chat_history(session_id, limit, before)
@@ -0,0 +1,193 @@
+import threading
+import numpy as np
+
+class TrendModel:
+    """Ordinary least-squares line close = a + b * day, kept as running sums.
+
+    Days are offsets from the first bar, as in the original per-request fit.
+    Appending a bar is O(1) and a prediction is a few float operations.
+    """
+
+    __slots__ = ("origin", "last_day", "n", "sx", "sy", "sxy", "sxx", "version")
+
+    def __init__(self, origin):
+        self.origin = int(origin)
+        self.last_day = None
+        self.n = 0
+        self.sx = self.sy = self.sxy = self.sxx = 0.0
+        self.version = None
+
+    def copy(self):
+        other = TrendModel(self.origin)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def update(self, day, close):
+        x = float(int(day) - self.origin)
+        close = float(close)
+        self.n += 1
+        self.sx += x
+        self.sy += close
+        self.sxy += x * close
+        self.sxx += x * x
+        self.last_day = int(day)
+
+    def extend(self, days, closes):
+        days = np.asarray(days, dtype=np.int64)
+        closes = np.asarray(closes, dtype=np.float64)
+        keep = ~np.isnan(closes)
+        days, closes = days[keep], closes[keep]
+        if not len(days):
+            return self
+        x = (days - self.origin).astype(np.float64)
+        self.n += len(x)
+        self.sx += x.sum()
+        self.sy += closes.sum()
+        self.sxy += x @ closes
+        self.sxx += x @ x
+        self.last_day = int(days[-1]) if self.last_day is None else max(self.last_day, int(days[-1]))
+        return self
+
+    def coefficients(self):
+        if self.n == 0:
+            return float("nan"), 0.0
+        denom = self.n * self.sxx - self.sx * self.sx
+        slope = 0.0 if denom == 0 else (self.n * self.sxy - self.sx * self.sy) / denom
+        intercept = (self.sy - slope * self.sx) / self.n
+        return intercept, slope
+
+    def predict_ahead(self, days_ahead=1):
+        """The fitted close days_ahead days after the last bar; NaN for a model without bars."""
+        if self.n == 0:
+            return float("nan")
+        intercept, slope = self.coefficients()
+        return intercept + slope * (self.last_day - self.origin + days_ahead)
+
+def fit_segments(days, closes, bounds):
+    """TrendModels for several (start, stop) slices of day/close columns, summed in one vectorized pass.
+
+    Each slice must be sorted by day; the result matches building each model
+    with TrendModel(first day).extend(days, closes).
+    """
+    lengths = np.array([stop - start for start, stop in bounds], dtype=np.int64)
+    starts = np.array([start for start, _ in bounds], dtype=np.int64)
+    models = [TrendModel(days[start] if length else 0) for start, length in zip(starts, lengths)]
+    filled = np.flatnonzero(lengths)
+    if not len(filled):
+        return models
+    lengths, starts = lengths[filled], starts[filled]
+    offsets = np.cumsum(lengths) - lengths
+    rows = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+    day = np.asarray(days)[rows].astype(np.int64)
+    close = np.asarray(closes)[rows].astype(np.float64)
+    valid = ~np.isnan(close)
+    x = np.where(valid, day - np.repeat(np.asarray(days)[starts].astype(np.int64), lengths), 0).astype(np.float64)
+    y = np.where(valid, close, 0.0)
+    n = np.add.reduceat(valid.astype(np.int64), offsets)
+    sums = [np.add.reduceat(values, offsets) for values in (x, y, x * y, x * x)]
+    last = np.maximum.reduceat(np.where(valid, day, np.iinfo(np.int64).min), offsets)
+    for k, i in enumerate(filled):
+        if n[k]:
+            model = models[i]
+            model.n = int(n[k])
+            model.sx, model.sy, model.sxy, model.sxx = (float(total[k]) for total in sums)
+            model.last_day = int(last[k])
+    return models
+
+class ForecastCache:
+    """Per-series TrendModels that fold in new bars instead of refitting."""
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def sync(self, key, days, closes, version=None):
+        """Bring the model for key up to date with (days, closes), sorted by day.
+
+        With a version token (e.g. the loaded MarketData object) an unchanged
+        source is an O(1) check. Bars after the model's last day are appended;
+        if the series no longer starts at the model's origin it is rebuilt.
+        """
+        model = self._models.get(key)
+        if model is not None and version is not None and model.version is version:
+            return model
+        days = np.asarray(days)
+        days = days.astype('datetime64[D]').astype(np.int64) if days.dtype.kind == 'M' else days.astype(np.int64)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None or not len(days) or int(days[0]) != model.origin or model.last_day is None or int(days[-1]) < model.last_day:
+                model = TrendModel(days[0] if len(days) else 0).extend(days, closes)
+            elif int(days[-1]) > model.last_day:
+                # Extend a copy so concurrent readers never see half-updated sums
+                start = int(np.searchsorted(days, model.last_day, side='right'))
+                model = model.copy().extend(days[start:], np.asarray(closes)[start:])
+            model.version = version
+            self._models[key] = model
+        return model
+
+    def from_store(self, store, symbol):
+        key = ("store", store.path, symbol.upper())
+        data = store.data()
+        model = self._models.get(key)
+        if model is not None and model.version is data:
+            return model
+        series = store.get_range(symbol)
+        return self.sync(key, series['Date'], series['Close'], version=data)
+
+    def from_store_many(self, store, symbols):
+        """{symbol: TrendModel, or None if the store has no such series}.
+
+        Models that were never built are fitted together in one vectorized
+        pass; existing ones are brought up to date incrementally.
+        """
+        data = store.data()
+        models, cold = {}, []
+        for symbol in symbols:
+            bounds = None if data is None else data.series_bounds(symbol)
+            model = self._models.get(("store", store.path, symbol.upper()))
+            if bounds is None:
+                models[symbol] = None
+            elif model is None:
+                cold.append((symbol, bounds))
+            else:
+                models[symbol] = model if model.version is data else self.from_store(store, symbol)
+        if cold:
+            fitted = fit_segments(data.days, data.columns['Close'], [bounds for _, bounds in cold])
+            with self._lock:
+                for (symbol, _), model in zip(cold, fitted):
+                    model.version = data
+                    self._models[("store", store.path, symbol.upper())] = model
+                    models[symbol] = model
+        return {symbol: models[symbol] for symbol in symbols}
+
+    def predict_many(self, models, horizons):
+        """Vectorized predictions: returns an array of shape (len(models), len(horizons)), NaN rows for models without bars."""
+        sums = np.array([
+            (m.n, m.sx, m.sy, m.sxy, m.sxx, 0 if m.last_day is None else m.last_day - m.origin) for m in models
+        ], dtype=np.float64).reshape(-1, 6)
+        n, sx, sy, sxy, sxx, last_x = sums.T
+        denom = n * sxx - sx * sx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(denom == 0, 0.0, (n * sxy - sx * sy) / np.where(denom == 0, 1.0, denom))
+            intercept = (sy - slope * sx) / n
+        horizons = np.asarray(horizons, dtype=np.float64)
+        return intercept[:, None] + slope[:, None] * (last_x[:, None] + horizons[None, :])
+
+_forecasts = None
+_forecasts_lock = threading.Lock()
+
+def get_forecast_cache():
+    global _forecasts
+    if _forecasts is None:
+        with _forecasts_lock:
+            if _forecasts is None:
+                _forecasts = ForecastCache()
+    return _forecasts
+
+def set_forecast_cache(cache):
+    """Swap the shared cache, e.g. for a cold one in a benchmark."""
+    global _forecasts
+    with _forecasts_lock:
+        _forecasts = cache
+    return cache
@@ -0,0 +1,271 @@
+"""Technical indicators over price series, computed once and then extended bar by bar.
+
+Every indicator is a small running state (window sums, the last average)
+plus its output so far. The first computation over a series is vectorized
+with cumulative sums; when the series grows, only the new bars are folded
+into the state, at O(1) work per bar, instead of recomputing the whole
+history. IndicatorCache keeps one such state per (series, indicator, window).
+
+Conventions, matching pandas: SMA, rolling std (ddof=1) and VWAP are NaN
+until a full window is available, and a window holding a missing value is
+NaN. EMA is ewm(span=window, adjust=False), seeded with the first close. RSI
+uses Wilder's smoothing, ewm(alpha=1/window, adjust=False) of gains and
+losses, and is NaN for the first `window` bars. Missing closes are carried
+forward for EMA and RSI.
+"""
+import math
+import threading
+import numpy as np
+
+INDICATORS = ("sma", "ema", "std", "rsi", "vwap")
+DEFAULT_WINDOWS = {"sma": 20, "ema": 20, "std": 20, "rsi": 14, "vwap": 20}
+MAX_WINDOW = 5000
+# Largest factor (1 - alpha) ** -k allowed inside one closed-form EMA block
+EMA_BLOCK_RANGE = 1e100
+
+def label(name, window):
+    return f"{name.upper()}({window})"
+
+def _window_sums(values, dropped, total, missing):
+    """Running window sums and missing-value counts after each new value.
+
+    dropped holds the value leaving the window as each new one enters (0
+    while the window is still filling).
+    """
+    entering = np.isnan(values)
+    leaving = np.isnan(dropped)
+    sums = total + np.cumsum(np.where(entering, 0.0, values) - np.where(leaving, 0.0, dropped))
+    counts = missing + np.cumsum(entering.astype(np.int64) - leaving.astype(np.int64))
+    return sums, counts
+
+def _carry_forward(values, last):
+    """Replace NaNs with the previous value (last for leading ones)."""
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+    index = np.where(missing, -1, np.arange(len(values)))
+    np.maximum.accumulate(index, out=index)
+    return np.where(index >= 0, values[np.maximum(index, 0)], last)
+
+def ewm(values, alpha, previous):
+    """y[t] = (1 - alpha) * y[t-1] + alpha * x[t] from y[-1] = previous, in closed-form blocks.
+
+    Within a block y[t] = d**(t+1) * (previous + alpha * sum(x[j] * d**-(j+1))),
+    with d = 1 - alpha; blocks are short enough for d**-k to stay finite.
+    """
+    if alpha >= 1.0:
+        return values.astype(np.float64, copy=True)
+    decay = 1.0 - alpha
+    block = max(1, int(math.log(EMA_BLOCK_RANGE) / -math.log(decay)))
+    out = np.empty(len(values), dtype=np.float64)
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        growth = decay ** -np.arange(1, len(chunk) + 1, dtype=np.float64)
+        out[start:start + len(chunk)] = (previous + alpha * np.cumsum(chunk * growth)) / growth
+        previous = out[start + len(chunk) - 1]
+    return out
+
+def _day(value):
+    """Days since 1970-01-01 for a datetime64 or an integer day number."""
+    if isinstance(value, np.datetime64):
+        return int(value.astype('datetime64[D]').astype(np.int64))
+    return int(value)
+
+class Indicator:
+    """Output and running state of one indicator over one series."""
+
+    __slots__ = ("name", "window", "size", "values", "state", "anchor", "first_day", "last_day", "version")
+
+    def __init__(self, name, window):
+        self.name = name
+        self.window = window
+        self.size = 0
+        self.values = np.empty(0, dtype=np.float64)
+        self.state = None
+        self.anchor = None
+        self.first_day = None
+        self.last_day = None
+        self.version = None
+
+    def copy(self):
+        other = Indicator(self.name, self.window)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def output(self):
+        return self.values[:self.size]
+
+    def _append(self, values):
+        needed = self.size + len(values)
+        if needed > len(self.values):
+            # Capacity grows by a quarter, so appending is amortized O(1) per bar
+            grown = np.empty(max(needed + needed // 4, 64), dtype=np.float64)
+            grown[:self.size] = self.values[:self.size]
+            self.values = grown
+        self.values[self.size:needed] = values
+        self.size = needed
+
+    def extend(self, series, start):
+        """Fold bars series[start:] in, given that bars before start are already in the state."""
+        close = np.asarray(series['Close'], dtype=np.float64)
+        new = close[start:]
+        if not len(new):
+            return self
+        positions = np.arange(start, len(close))
+        w = self.window
+        if self.name in ("sma", "std", "vwap"):
+            # Only the bars entering and leaving the window are read, so the work is O(new bars)
+            leaving_at = positions - w
+            has_leaving = leaving_at >= 0
+            leaving_at = np.maximum(leaving_at, 0)
+            full = positions + 1 >= w
+            if self.name == "vwap":
+                if 'Volume' not in series:
+                    raise ValueError("VWAP needs volume data")
+                hlc = 'High' in series and 'Low' in series
+
+                def flows(index):
+                    price = close[index]
+                    if hlc:
+                        price = (np.asarray(series['High'], dtype=np.float64)[index] + np.asarray(series['Low'], dtype=np.float64)[index] + price) / 3
+                    volume = np.asarray(series['Volume'], dtype=np.float64)[index]
+                    return price * volume, volume
+
+                flow_in, volume_in = flows(positions)
+                flow_out, volume_out = flows(leaving_at)
+                pv, v, missing = self.state or (0.0, 0.0, 0)
+                pv_sums, counts = _window_sums(flow_in, np.where(has_leaving, flow_out, 0.0), pv, missing)
+                v_sums, _ = _window_sums(volume_in, np.where(has_leaving, volume_out, 0.0), v, 0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    out = np.where(full & (counts == 0) & (v_sums != 0), pv_sums / v_sums, np.nan)
+                self.state = (float(pv_sums[-1]), float(v_sums[-1]), int(counts[-1]))
+            else:
+                # Sums are taken around the first close to keep the variance numerically stable
+                if self.anchor is None:
+                    valid = new[~np.isnan(new)]
+                    self.anchor = float(valid[0]) if len(valid) else 0.0
+                entering = new - self.anchor
+                leaving = np.where(has_leaving, close[leaving_at] - self.anchor, 0.0)
+                s1, s2, missing = self.state or (0.0, 0.0, 0)
+                sums, counts = _window_sums(entering, leaving, s1, missing)
+                squares, _ = _window_sums(entering * entering, leaving * leaving, s2, 0)
+                ok = full & (counts == 0)
+                if self.name == "sma":
+                    out = np.where(ok, sums / w + self.anchor, np.nan)
+                elif w > 1:
+                    variance = np.maximum((squares - sums * sums / w) / (w - 1), 0.0)
+                    out = np.where(ok, np.sqrt(variance), np.nan)
+                else:
+                    out = np.full(len(new), np.nan)
+                self.state = (float(sums[-1]), float(squares[-1]), int(counts[-1]))
+        elif self.name == "ema":
+            previous = self.state
+            new = _carry_forward(new, previous if previous is not None else np.nan)
+            if previous is None or np.isnan(previous):
+                # Seeded with the first close
+                previous = new[0]
+            out = ewm(new, 2.0 / (w + 1), previous)
+            self.state = float(out[-1])
+        else:
+            last_close, gain, loss = self.state or (np.nan, np.nan, np.nan)
+            new = _carry_forward(new, last_close)
+            changes = np.diff(np.concatenate(([last_close], new)))
+            gains, losses = np.maximum(changes, 0.0), np.maximum(-changes, 0.0)
+            out = np.full(len(new), np.nan)
+            valid = ~np.isnan(changes)
+            if valid.any():
+                first = int(np.argmax(valid))
+                if np.isnan(gain):
+                    # The first change seeds both averages
+                    gain, loss = gains[first], losses[first]
+                    avg_gain = ewm(gains[first + 1:], 1.0 / w, gain)
+                    avg_loss = ewm(losses[first + 1:], 1.0 / w, loss)
+                    avg_gain = np.concatenate(([gain], avg_gain))
+                    avg_loss = np.concatenate(([loss], avg_loss))
+                else:
+                    avg_gain = ewm(gains[first:], 1.0 / w, gain)
+                    avg_loss = ewm(losses[first:], 1.0 / w, loss)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+                out[first:] = rsi
+                # NaN until `window` changes have been seen (the first bar has none)
+                out[positions < w] = np.nan
+                gain, loss = float(avg_gain[-1]), float(avg_loss[-1])
+            self.state = (float(new[-1]), gain, loss)
+        self._append(out)
+        return self
+
+class IndicatorCache:
+    """Per-(series, indicator, window) Indicators that fold in new bars instead of recomputing."""
+
+    def __init__(self):
+        self._indicators = {}
+        self._lock = threading.Lock()
+
+    def sync(self, key, series, name, window, version=None):
+        """Bring the indicator for (key, name, window) up to date with series, sorted by date.
+
+        With a version token (e.g. the loaded MarketData object) an unchanged
+        source is an O(1) check. Bars after the last one seen are appended;
+        if the series no longer starts where it did, it is recomputed.
+        """
+        full_key = (key, name, window)
+        indicator = self._indicators.get(full_key)
+        if indicator is not None and version is not None and indicator.version is version:
+            return indicator
+        dates = series['Date']
+        count = len(dates)
+        with self._lock:
+            indicator = self._indicators.get(full_key)
+            first = _day(dates[0]) if count else None
+            last = _day(dates[-1]) if count else None
+            # Only the ends of the series and the last bar seen are checked, so an append costs O(new bars)
+            stale = (
+                indicator is None or first is None or indicator.last_day is None
+                or indicator.first_day != first or last < indicator.last_day
+                or indicator.size > count or _day(dates[indicator.size - 1]) != indicator.last_day
+            )
+            if stale:
+                indicator = Indicator(name, window).extend(series, 0)
+            elif count > indicator.size:
+                # Extend a copy so concurrent readers never see a half-updated state
+                indicator = indicator.copy().extend(series, indicator.size)
+            indicator.first_day = first
+            indicator.last_day = last
+            indicator.version = version
+            self._indicators[full_key] = indicator
+        return indicator
+
+    def from_store(self, store, symbol, name, window):
+        data = store.data()
+        key = ("store", store.path, symbol.upper())
+        indicator = self._indicators.get((key, name, window))
+        if indicator is not None and indicator.version is data:
+            return indicator
+        return self.sync(key, store.get_range(symbol), name, window, version=data)
+
+    def clear(self):
+        with self._lock:
+            self._indicators.clear()
+
+    def __len__(self):
+        return len(self._indicators)
+
+_indicators = None
+_indicators_lock = threading.Lock()
+
+def get_indicator_cache():
+    global _indicators
+    if _indicators is None:
+        with _indicators_lock:
+            if _indicators is None:
+                _indicators = IndicatorCache()
+    return _indicators
+
+def set_indicator_cache(cache):
+    """Swap the shared cache, e.g. for a cold one in a benchmark."""
+    global _indicators
+    with _indicators_lock:
+        _indicators = cache
+    return cache
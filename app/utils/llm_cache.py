@@ -0,0 +1,273 @@
+"""Response cache for LLM calls, shared by the team, KnowledgeAgent and RAGAgent.
+
+Entries are keyed by route, model, normalized prompt and a hash of whatever
+context the answer depends on. They live in an in-memory LRU tier and,
+optionally, an on-disk SQLite tier that survives restarts.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds an answer stays valid per route; routes not listed are never cached.
+# MemoryAgent answers depend on its memory store, so that route is left out.
+ROUTE_TTLS = {
+    "fallback": 6 * 60 * 60,
+    "rag": 24 * 60 * 60,
+    "knowledge": 5 * 60,
+}
+# Queries about the present moment bypass the cache entirely
+TIME_SENSITIVE = re.compile(
+    r"\b(?:now|today|tonight|yesterday|tomorrow|current(?:ly)?|latest|live|real[- ]time|"
+    r"right now|this (?:morning|afternoon|week)|news|breaking)\b",
+    re.IGNORECASE)
+MAX_ENTRIES = 1024
+# In the repository's tmp/, whatever the working directory
+DEFAULT_SQLITE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'tmp', 'llm_cache.db'))
+
+def normalize_prompt(prompt):
+    """Case, whitespace and trailing punctuation do not change the answer."""
+    return " ".join(prompt.split()).casefold().rstrip(" ?.!")
+
+def context_hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class MemoryTier:
+    """LRU of (value, expires_at, latency) tuples."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteTier:
+    """Persistent tier; expired rows are ignored on read and pruned on write."""
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, latency REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key, now):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, latency FROM llm_cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now)
+            ).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1], row[2])
+
+    def put(self, key, entry):
+        value, expires_at, latency = entry
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, latency) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, latency)
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+class LLMResponseCache:
+    """Read-through cache in front of LLM calls.
+
+    Tiers are checked in order; a hit in a later tier is copied into the
+    earlier ones. Only non-empty string answers are stored, so errors and
+    refusals to answer (None) are always retried.
+    """
+
+    def __init__(self, tiers=None, ttls=ROUTE_TTLS, clock=time.time, enabled=True):
+        self.tiers = tiers if tiers is not None else [MemoryTier()]
+        self.ttls = dict(ttls)
+        self.clock = clock
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.saved_seconds = 0.0
+
+    def make_key(self, route, model, prompt, context=None):
+        return context_hash(route, model, normalize_prompt(prompt), context or "")
+
+    def cacheable(self, route, prompt):
+        return self.enabled and route in self.ttls and not TIME_SENSITIVE.search(prompt)
+
+    def lookup(self, key):
+        now = self.clock()
+        for i, tier in enumerate(self.tiers):
+            entry = tier.get(key, now)
+            if entry is not None:
+                for earlier in self.tiers[:i]:
+                    earlier.put(key, entry)
+                return entry
+        return None
+
+    def store(self, route, key, value, latency):
+        if not isinstance(value, str) or not value.strip():
+            return
+        ttl = self.ttls[route]
+        entry = (value, None if ttl is None else self.clock() + ttl, latency)
+        for tier in self.tiers:
+            tier.put(key, entry)
+
+    def _begin(self, route, model, prompt, context, use_cache):
+        """Returns (key, cached entry); key is None when the call must bypass the cache."""
+        if not use_cache or not self.cacheable(route, prompt):
+            with self._lock:
+                self.bypassed += 1
+            return None, None
+        key = self.make_key(route, model, prompt, context)
+        entry = self.lookup(key)
+        with self._lock:
+            if entry is not None:
+                self.hits += 1
+                self.saved_seconds += entry[2]
+            else:
+                self.misses += 1
+        return key, entry
+
+    def get_or_call(self, route, model, prompt, call, context=None, use_cache=True):
+        key, entry = self._begin(route, model, prompt, context, use_cache)
+        if entry is not None:
+            return entry[0]
+        start = time.perf_counter()
+        value = call()
+        if key is not None:
+            self.store(route, key, value, time.perf_counter() - start)
+        return value
+
+    async def aget_or_call(self, route, model, prompt, call, context=None, use_cache=True):
+        """As get_or_call, for a coroutine function `call`."""
+        key, entry = self._begin(route, model, prompt, context, use_cache)
+        if entry is not None:
+            return entry[0]
+        start = time.perf_counter()
+        value = await call()
+        if key is not None:
+            self.store(route, key, value, time.perf_counter() - start)
+        return value
+
+    def stream(self, route, model, prompt, call, context=None, use_cache=True):
+        """As get_or_call for a generator of text chunks: a hit is yielded whole, a miss
+        is passed through and stored once the stream has been fully read."""
+        key, entry = self._begin(route, model, prompt, context, use_cache)
+        if entry is not None:
+            yield entry[0]
+            return
+        start = time.perf_counter()
+        chunks = []
+        for chunk in call():
+            chunks.append(chunk)
+            yield chunk
+        if key is not None:
+            self.store(route, key, "".join(chunks), time.perf_counter() - start)
+
+    async def astream(self, route, model, prompt, call, context=None, use_cache=True):
+        """As stream, for an async generator function `call`."""
+        key, entry = self._begin(route, model, prompt, context, use_cache)
+        if entry is not None:
+            yield entry[0]
+            return
+        start = time.perf_counter()
+        chunks = []
+        async for chunk in call():
+            chunks.append(chunk)
+            yield chunk
+        if key is not None:
+            self.store(route, key, "".join(chunks), time.perf_counter() - start)
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "entries": len(self.tiers[0]) if self.tiers else 0,
+            }
+
+def cache_from_env():
+    """LLM_CACHE=off|memory|sqlite (default memory); LLM_CACHE_PATH sets the SQLite file."""
+    mode = os.getenv("LLM_CACHE", "memory").lower()
+    if mode == "off":
+        return LLMResponseCache(enabled=False)
+    tiers = [MemoryTier(int(os.getenv("LLM_CACHE_ENTRIES", str(MAX_ENTRIES))))]
+    if mode == "sqlite":
+        tiers.append(SQLiteTier(os.getenv("LLM_CACHE_PATH", DEFAULT_SQLITE_PATH)))
+    return LLMResponseCache(tiers)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    """Process-wide LLM response cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = cache_from_env()
+    return _cache
+
+def set_llm_cache(cache):
+    """Swap the shared cache, e.g. for a fresh one in a benchmark."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+    return cache
@@ -0,0 +1,271 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import date, datetime
+from utils.metrics import span
+
+# Latest-quote style requests change every tick; longer ranges that still include
+# today only gain a bar per day; ranges that end before today never change.
+QUOTE_TTL = 60
+RECENT_TTL = 15 * 60
+CLOSED_TTL = None
+QUOTE_PERIODS = {"1d", "5d"}
+INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
+
+class YFinanceProvider:
+    """Upstream data provider backed by yfinance.
+
+    Providers implement history(symbol, **kwargs) -> DataFrame and may implement
+    download(symbols, **kwargs) -> {symbol: DataFrame} for one bulk request.
+    """
+
+    def warm_up(self):
+        """Import yfinance (and pandas) ahead of the first request that needs it."""
+        import yfinance
+
+    def history(self, symbol, **kwargs):
+        import yfinance as yf
+        with span("upstream_fetch", source="yfinance"):
+            return yf.Ticker(symbol).history(**kwargs)
+
+    def download(self, symbols, **kwargs):
+        import yfinance as yf
+        with span("upstream_fetch", source="yfinance_download"):
+            frame = yf.download(list(symbols), group_by="ticker", auto_adjust=True, progress=False, threads=True, **kwargs)
+        # pandas is imported where frames are handled, so importing this module stays cheap
+        import pandas as pd
+        frames = {}
+        for symbol in symbols:
+            if isinstance(frame.columns, pd.MultiIndex):
+                sub = frame[symbol] if symbol in frame.columns.get_level_values(0) else frame.iloc[:0, :0]
+            else:
+                sub = frame
+            frames[symbol] = sub.dropna(how="all")
+        return frames
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value, expires_at, size):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+def _as_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    import pandas as pd
+    return pd.Timestamp(value).date()
+
+def estimate_size(value):
+    import pandas as pd
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    return sys.getsizeof(value)
+
+class MarketDataCache:
+    """Read-through cache for upstream market data.
+
+    Entries are keyed by (symbol, interval, range), expire by a TTL chosen from
+    the requested range, and are evicted least-recently-used once the total
+    estimated size exceeds max_bytes. Concurrent misses for the same key share
+    a single upstream fetch.
+    """
+
+    def __init__(self, provider=None, max_bytes=64 * 1024 * 1024, clock=time.monotonic, today=date.today):
+        self.provider = provider or YFinanceProvider()
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.today = today
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def ttl_for(self, interval="1d", period=None, start=None, end=None):
+        if interval in INTRADAY_INTERVALS:
+            return QUOTE_TTL
+        if end is not None:
+            # yfinance treats end as exclusive, so end <= today covers closed days only
+            return CLOSED_TTL if _as_date(end) <= self.today() else RECENT_TTL
+        if period in QUOTE_PERIODS:
+            return QUOTE_TTL
+        return RECENT_TTL
+
+    @staticmethod
+    def _request(period, interval, start, end):
+        """(range key, provider kwargs) for one history request."""
+        if start is not None or end is not None:
+            range_key = (str(_as_date(start)), str(_as_date(end)))
+        else:
+            range_key = period or "1mo"
+        kwargs = {"interval": interval}
+        if period is not None:
+            kwargs["period"] = period
+        if start is not None:
+            kwargs["start"] = start
+        if end is not None:
+            kwargs["end"] = end
+        return range_key, kwargs
+
+    def history(self, symbol, period=None, interval="1d", start=None, end=None):
+        symbol = symbol.strip().upper()
+        range_key, kwargs = self._request(period, interval, start, end)
+        ttl = self.ttl_for(interval, period, start, end)
+        return self.get_or_fetch((symbol, interval, range_key), lambda: self.provider.history(symbol, **kwargs), ttl)
+
+    def history_many(self, symbols, period=None, interval="1d", start=None, end=None):
+        """{symbol: DataFrame} for several symbols over one range.
+
+        Cached symbols are served from the cache; the rest are fetched in one
+        bulk request when the provider supports download(), else one by one.
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols))
+        range_key, kwargs = self._request(period, interval, start, end)
+        ttl = self.ttl_for(interval, period, start, end)
+        results, waiting, leading = {}, {}, {}
+        for symbol in symbols:
+            state, value = self._claim((symbol, interval, range_key))
+            if state == "hit":
+                results[symbol] = value
+            elif state == "wait":
+                waiting[symbol] = value
+            else:
+                leading[symbol] = value
+        if leading:
+            try:
+                if hasattr(self.provider, "download"):
+                    fetched = self.provider.download(list(leading), **kwargs)
+                else:
+                    fetched = {symbol: self.provider.history(symbol, **kwargs) for symbol in leading}
+            except BaseException as e:
+                for symbol, future in leading.items():
+                    self._abandon((symbol, interval, range_key), future, e)
+                raise
+            import pandas as pd
+            settling = list(leading.items())
+            for i, (symbol, future) in enumerate(settling):
+                try:
+                    results[symbol] = self._settle((symbol, interval, range_key), future, fetched.get(symbol, pd.DataFrame()), ttl)
+                except BaseException as e:
+                    for other, other_future in settling[i + 1:]:
+                        self._abandon((other, interval, range_key), other_future, e)
+                    raise
+        for symbol, future in waiting.items():
+            results[symbol] = future.result()
+        return {symbol: results[symbol] for symbol in symbols}
+
+    def _claim(self, key):
+        """("hit", value), ("wait", future) for a fetch already in flight, or ("lead", future) to fetch it."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.expires_at is None or entry.expires_at > now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return "hit", entry.value
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return "wait", future
+            future = self._inflight[key] = Future()
+            self.misses += 1
+            return "lead", future
+
+    def _abandon(self, key, future, error):
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_exception(error)
+
+    def _settle(self, key, future, value, ttl):
+        import pandas as pd
+        if isinstance(value, pd.DataFrame) and value.empty and (ttl is None or ttl > QUOTE_TTL):
+            # Unknown symbols and gaps should be retried soon, not cached forever
+            ttl = QUOTE_TTL
+        try:
+            self._store(key, value, ttl)
+        except BaseException as e:
+            # Waiters would otherwise block on a future nobody resolves
+            self._abandon(key, future, e)
+            raise
+        future.set_result(value)
+        return value
+
+    def get_or_fetch(self, key, fetch, ttl):
+        state, value = self._claim(key)
+        if state == "hit":
+            return value
+        if state == "wait":
+            return value.result()
+        try:
+            fetched = fetch()
+        except BaseException as e:
+            self._abandon(key, value, e)
+            raise
+        return self._settle(key, value, fetched, ttl)
+
+    def _store(self, key, value, ttl):
+        size = estimate_size(value)
+        expires_at = None if ttl is None else self.clock() + ttl
+        with self._lock:
+            self._inflight.pop(key, None)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(value, expires_at, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            for key in [k for k in self._entries if symbol is None or k[0] == symbol.upper()]:
+                self._bytes -= self._entries.pop(key).size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_market_cache():
+    """Process-wide cache shared by the MCP tools and KnowledgeAgent."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = MarketDataCache()
+    return _cache
+
+def set_market_cache(cache):
+    """Swap the shared cache, e.g. for one backed by a local fake provider."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+    return cache
@@ -0,0 +1,257 @@
+import os
+import threading
+from datetime import date, datetime
+import numpy as np
+from utils import snapshot
+from utils.metrics import span
+
+DEFAULT_CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'stock_market_data.csv')
+# Key used for files without a Symbol column (a single unnamed series)
+DEFAULT_SYMBOL = "*"
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Calendar buckets: month * 32 + day of month, so every (month, day) pair gets its own slot
+CALENDAR_SLOTS = 13 * 32
+
+def calendar_keys(days):
+    """month * 32 + day-of-month for an array of day offsets."""
+    dates = np.asarray(days).astype('datetime64[D]')
+    month_starts = dates.astype('datetime64[M]')
+    months = month_starts.astype(np.int64) % 12 + 1
+    return months * 32 + (dates - month_starts.astype('datetime64[D]')).astype(np.int64) + 1
+
+def to_day(value):
+    """Convert a 'MM/DD/YYYY' string, date, datetime or Timestamp to numpy datetime64[D]."""
+    if isinstance(value, np.datetime64):
+        return value.astype('datetime64[D]')
+    if isinstance(value, str):
+        try:
+            value = datetime.strptime(value.strip(), '%m/%d/%Y')
+        except ValueError:
+            import pandas as pd
+            value = pd.Timestamp(value)
+    if isinstance(value, (datetime, date)):
+        return np.datetime64(value.strftime('%Y-%m-%d'), 'D')
+    return np.datetime64(value, 'D')
+
+def format_dates(dates, fmt='%m/%d/%Y'):
+    if fmt == '%m/%d/%Y':
+        # Rearranged from NumPy's YYYY-MM-DD strings; no pandas needed for the common case
+        iso = np.datetime_as_string(np.asarray(dates).astype('datetime64[D]'))
+        return [f"{d[5:7]}/{d[8:10]}/{d[:4]}" for d in iso.tolist()]
+    import pandas as pd
+    return pd.DatetimeIndex(dates).strftime(fmt).tolist()
+
+class MarketData:
+    """One loaded copy of the price data, sorted by (Symbol, Date) with NumPy columns.
+
+    Dates are kept as integer day offsets from 1970-01-01 (int64 when parsed
+    from CSV, int32 when memory-mapped from a snapshot).
+    """
+
+    def __init__(self, symbols, days, columns, symbolized):
+        self.symbols = symbols          # symbol -> (start, stop) into the column arrays
+        self.days = days                # day offsets, sorted within each symbol's slice
+        self.columns = columns          # name -> float array
+        self.symbolized = symbolized
+        self._calendar = None
+        self._calendar_lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df):
+        import pandas as pd
+        symbolized = 'Symbol' in df.columns
+        frame = pd.DataFrame({'Date': pd.to_datetime(df['Date']).values.astype('datetime64[D]')})
+        frame['Symbol'] = df['Symbol'].astype(str).str.upper().values if symbolized else DEFAULT_SYMBOL
+        for name in PRICE_COLUMNS:
+            if name in df.columns:
+                frame[name] = pd.to_numeric(df[name], errors='coerce').astype('float64').values
+        frame = frame.sort_values(['Symbol', 'Date'], kind='stable')
+        names, starts = np.unique(frame['Symbol'].values, return_index=True)
+        columns = {name: np.ascontiguousarray(frame[name].values) for name in PRICE_COLUMNS if name in frame.columns}
+        days = np.ascontiguousarray(frame['Date'].values.astype('datetime64[D]').astype(np.int64))
+        return cls(cls.bounds(names, starts, len(frame)), days, columns, symbolized)
+
+    @classmethod
+    def from_snapshot(cls, parts):
+        return cls(cls.bounds(parts['symbols'], parts['starts'], parts['rows']), parts['days'], parts['columns'], parts['symbolized'])
+
+    @staticmethod
+    def bounds(names, starts, rows):
+        stops = list(starts[1:]) + [rows]
+        return {str(n): (int(a), int(b)) for n, a, b in zip(names, starts, stops)}
+
+    def series_bounds(self, symbol=None):
+        if symbol is None:
+            if DEFAULT_SYMBOL in self.symbols:
+                return self.symbols[DEFAULT_SYMBOL]
+            return next(iter(self.symbols.values()), (0, 0))
+        return self.symbols.get(symbol.upper())
+
+    def calendar_index(self):
+        """(month, day) -> sorted dates index over every series, built once per loaded copy.
+
+        Returns (series, offsets, days): series maps a symbol to its number, and
+        with slot = number * CALENDAR_SLOTS + month * 32 + day, that series'
+        dates on (month, day) are days[offsets[slot]:offsets[slot + 1]], ascending.
+        """
+        if self._calendar is None:
+            with self._calendar_lock:
+                if self._calendar is None:
+                    series = {name: row for row, name in enumerate(self.symbols)}
+                    lengths = [stop - start for start, stop in self.symbols.values()]
+                    rows = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+                    keys = rows * CALENDAR_SLOTS + calendar_keys(self.days)
+                    # Rows are already in date order within each series, so a stable sort keeps dates ascending
+                    order = np.argsort(keys, kind='stable')
+                    offsets = np.searchsorted(keys[order], np.arange(len(lengths) * CALENDAR_SLOTS + 1))
+                    self._calendar = (series, offsets, np.asarray(self.days)[order])
+        return self._calendar
+
+    def dates_on(self, month, day, symbol=None):
+        """Day offsets of a series falling on (month, day), ascending."""
+        series, offsets, days = self.calendar_index()
+        if symbol is None:
+            row = series.get(DEFAULT_SYMBOL, 0 if series else None)
+        else:
+            row = series.get(symbol.upper())
+        if row is None or not 1 <= month <= 12 or not 1 <= day <= 31:
+            return days[:0]
+        slot = row * CALENDAR_SLOTS + month * 32 + day
+        return days[offsets[slot]:offsets[slot + 1]]
+
+class MarketDataStore:
+    """Loads market data once and reloads it when the source file's mtime changes.
+
+    A binary snapshot next to the CSV (see utils.snapshot) is memory-mapped when
+    it is current; otherwise the CSV is parsed. Lookups binary-search the
+    per-symbol date slice, so point and range queries are O(log n).
+    """
+
+    def __init__(self, path=DEFAULT_CSV_PATH, snapshot_dir=None):
+        self.path = os.path.abspath(path)
+        self.snapshot_dir = snapshot_dir or snapshot.default_snapshot_dir(self.path)
+        self._data = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _source_version(self):
+        version = []
+        for path in (self.path, snapshot.meta_path(self.snapshot_dir)):
+            try:
+                version.append(os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+
+    def _load(self, csv_mtime):
+        parts = snapshot.read_snapshot(self.snapshot_dir, source_mtime_ns=csv_mtime)
+        if parts is not None:
+            with span("market_data_load", source="snapshot"):
+                return MarketData.from_snapshot(parts)
+        with span("market_data_load", source="csv"):
+            # pandas is only needed to parse the CSV; snapshot loads are NumPy only
+            import pandas as pd
+            return MarketData.from_frame(pd.read_csv(self.path))
+
+    def data(self):
+        version = self._source_version()
+        if version == (None, None):
+            return None
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._data = self._load(version[0])
+                    self._version = version
+        return self._data
+
+    def symbols(self):
+        data = self.data()
+        return [] if data is None or not data.symbolized else list(data.symbols)
+
+    def has_symbol(self, symbol):
+        data = self.data()
+        return data is not None and data.symbolized and symbol.upper() in data.symbols
+
+    def get_range(self, symbol=None, start=None, end=None):
+        """Return {'Date': ..., 'Open': ..., ...} arrays for start <= Date <= end."""
+        data = self.data()
+        if data is None:
+            return None
+        bounds = data.series_bounds(symbol)
+        if bounds is None:
+            return None
+        return _slice(data, bounds, _bound(start), _bound(end))
+
+    def get_ranges(self, symbols, start=None, end=None):
+        """get_range for several symbols against one loaded copy; unknown symbols map to None."""
+        data = self.data()
+        lo_day, hi_day = _bound(start), _bound(end)
+        ranges = {}
+        for symbol in symbols:
+            bounds = None if data is None else data.series_bounds(symbol)
+            ranges[symbol] = None if bounds is None else _slice(data, bounds, lo_day, hi_day)
+        return ranges
+
+    def get_row(self, symbol, day):
+        """Return the bar for one symbol on one day as a dict, or None if there is none."""
+        data = self.data()
+        if data is None:
+            return None
+        bounds = data.series_bounds(symbol)
+        if bounds is None:
+            return None
+        lo, hi = bounds
+        target = to_day(day).astype(np.int64)
+        i = lo + int(np.searchsorted(data.days[lo:hi], target, side='left'))
+        if i >= hi or data.days[i] != target:
+            return None
+        row = {'Date': np.datetime64(int(data.days[i]), 'D')}
+        for name, column in data.columns.items():
+            row[name] = float(column[i])
+        return row
+
+    def latest_date_on(self, month, day, symbol=None):
+        """Latest available date falling on the given month and day, or None.
+
+        An O(1) lookup in the calendar index built on first use after each load.
+        """
+        data = self.data()
+        if data is None:
+            return None
+        matches = data.dates_on(month, day, symbol)
+        return np.datetime64(int(matches[-1]), 'D') if len(matches) else None
+
+def _bound(value):
+    return None if value is None else to_day(value).astype(np.int64)
+
+def _slice(data, bounds, start, end):
+    """Columns of the bars in bounds with start <= day <= end (day offsets, None for open ends)."""
+    lo, hi = bounds
+    days = data.days[lo:hi]
+    i = 0 if start is None else int(np.searchsorted(days, start, side='left'))
+    j = len(days) if end is None else int(np.searchsorted(days, end, side='right'))
+    result = {'Date': days[i:j].astype('datetime64[D]')}
+    for name, column in data.columns.items():
+        result[name] = column[lo + i:lo + j]
+    return result
+
+def compile_snapshot(csv_path=DEFAULT_CSV_PATH, snapshot_dir=None, price_dtype='float64'):
+    """Parse the CSV once and write it as a memory-mappable snapshot; returns the snapshot dir."""
+    import pandas as pd
+    csv_path = os.path.abspath(csv_path)
+    data = MarketData.from_frame(pd.read_csv(csv_path))
+    out_dir = snapshot_dir or snapshot.default_snapshot_dir(csv_path)
+    snapshot.write_snapshot(out_dir, data, os.stat(csv_path).st_mtime_ns, price_dtype=price_dtype)
+    return out_dir
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(path=DEFAULT_CSV_PATH):
+    """Process-wide store per file, shared by the agents and the MCP tools."""
+    key = os.path.abspath(path)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(key, MarketDataStore(key))
+    return store
@@ -0,0 +1,333 @@
+"""Latency instrumentation for the query pipeline and the MCP server.
+
+Code wraps each stage in `span(name, **tags)`. Spans feed fixed-bucket
+histograms, one per (name, tags) pair, which export as Prometheus text or
+JSON, either over HTTP (serve_metrics, which also answers /ready for
+health checks) or on demand. With METRICS=off,
+span() returns a shared no-op object, so a disabled span costs one call.
+
+Per-request profiling is separate: a RequestProfiler wraps one request with
+cProfile, or pyinstrument when it is installed, and writes the result to
+PROFILE_DIR. Blocking work the request hands to the executor (utils.aio) is
+profiled on its worker thread and merged into the same cProfile report.
+"""
+import contextvars
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_ENABLED = os.getenv("METRICS", "on").lower() != "off"
+# Upper bounds in seconds, from sub-millisecond cache hits to slow LLM calls
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIX = "stockbot"
+PROFILE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'tmp', 'profiles'))
+PROFILER = os.getenv("PROFILER", "cprofile").lower()
+
+class Histogram:
+    """Counts per latency bucket plus sum, count and errors; not thread-safe on its own."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Estimate by linear interpolation within the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "sum_s": self.sum,
+            "mean_ms": self.sum * 1000 / self.count if self.count else 0.0,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "p99_ms": self.quantile(0.99) * 1000,
+        }
+
+class _Span:
+    __slots__ = ("metrics", "name", "tags", "start")
+
+    def __init__(self, metrics, name, tags):
+        self.metrics = metrics
+        self.name = name
+        self.tags = tags
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A consumer closing a stream early (GeneratorExit) or a cancellation is not a failure
+        error = exc_type is not None and issubclass(exc_type, Exception)
+        self.metrics.observe(self.name, time.perf_counter() - self.start, error, **self.tags)
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+class Metrics:
+    """Histogram per (name, tags), safe to update from any thread."""
+
+    def __init__(self, enabled=METRICS_ENABLED, buckets=BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def span(self, name, **tags):
+        """Context manager timing its block into the (name, tags) histogram."""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, tags)
+
+    def observe(self, name, seconds, error=False, **tags):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(tags.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds, error)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def to_json(self):
+        """[{"name", "tags", "count", "errors", "sum_s", "mean_ms", "p50_ms", ...}] sorted by name and tags."""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            return [{"name": name, "tags": dict(tags), **histogram.snapshot()} for (name, tags), histogram in items]
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            items = sorted(self._histograms.items())
+            declared = set()
+            for (name, tags), histogram in items:
+                metric = f"{PREFIX}_{name}_seconds"
+                if metric not in declared:
+                    declared.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                labels = ",".join(f'{k}="{_label(v)}"' for k, v in tags)
+                sep = "," if labels else ""
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), histogram.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{labels}{sep}le="{le}"}} {cumulative}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{metric}_sum{suffix} {histogram.sum!r}")
+                lines.append(f"{metric}_count{suffix} {histogram.count}")
+                lines.append(f"{PREFIX}_{name}_errors_total{suffix} {histogram.errors}")
+        return "\n".join(lines) + "\n"
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """Process-wide metrics registry."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+    return _metrics
+
+def set_metrics(metrics):
+    """Swap the shared registry, e.g. a disabled one to measure instrumentation overhead."""
+    global _metrics
+    with _metrics_lock:
+        _metrics = metrics
+    return metrics
+
+def span(name, **tags):
+    """Time a block into the shared registry; a no-op when metrics are disabled."""
+    metrics = _metrics or get_metrics()
+    return _Span(metrics, name, tags) if metrics.enabled else _NOOP
+
+_readiness = None
+
+def set_readiness(status):
+    """Register a callable returning {"ready": bool, ...} (e.g. WarmUp.status) for /ready."""
+    global _readiness
+    _readiness = status
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        code = 200
+        if path == "/metrics":
+            body, content_type = get_metrics().to_prometheus(), "text/plain; version=0.0.4"
+        elif path == "/metrics.json":
+            body, content_type = json.dumps(get_metrics().to_json()), "application/json"
+        elif path == "/ready":
+            status = _readiness() if _readiness is not None else {"ready": True}
+            # 503 until warm-up has finished, so a load balancer can hold traffic back
+            body, content_type, code = json.dumps(status), "application/json", 200 if status["ready"] else 503
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serve /metrics (Prometheus text), /metrics.json and /ready from a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"Serving metrics on http://{host}:{server.server_port}/metrics", file=sys.stderr)
+    return server
+
+# The profiler of the request being handled, if any; utils.aio carries it into executor work
+_request_profiler = contextvars.ContextVar("request_profiler", default=None)
+
+def profiled(func):
+    """func, profiled on the current request's profiler when it runs (on any thread)."""
+    profiler = _request_profiler.get()
+    if profiler is None:
+        return func
+    return functools.partial(profiler.run, func)
+
+class RequestProfiler:
+    """Profiles one request: start() and stop() must run on the same thread (the event loop).
+
+    The event loop is shared, so its part of the profile also holds whatever
+    other sessions' coroutines ran meanwhile; only one request per process can
+    be profiled at a time, and one that starts while another is being profiled
+    runs unprofiled. Executor work is attributed to its own request: functions
+    wrapped by profiled() get a cProfile of their own on the worker thread,
+    merged into the report at stop(). With pyinstrument, executor work is not
+    captured.
+    """
+
+    _active = threading.Lock()
+
+    def __init__(self, label, session_id=None, mode=PROFILER, directory=PROFILE_DIR):
+        label = f"{session_id[:8]}-{label}" if session_id else label
+        self.label = "".join(c if c.isalnum() else "_" for c in label)[:40]
+        self.mode = mode
+        self.directory = directory
+        self._profiler = None
+        self._threads = []
+        self._threads_lock = threading.Lock()
+
+    def activate(self):
+        """Make this the current request's profiler in the calling context (see profiled())."""
+        _request_profiler.set(self)
+        return self
+
+    def run(self, func, *args, **kwargs):
+        """Call func under a cProfile of its own, kept for the report if this profiler is still running."""
+        if self._profiler is None or self.mode != "cprofile":
+            return func(*args, **kwargs)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Interpreters with one process-wide profiler (sys.monitoring) cannot nest one per thread
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._threads_lock:
+                if self._profiler is not None:
+                    self._threads.append(profile)
+
+    def start(self):
+        if not RequestProfiler._active.acquire(blocking=False):
+            print("Profiler busy; request not profiled", file=sys.stderr)
+            return self
+        try:
+            if self.mode == "pyinstrument":
+                try:
+                    from pyinstrument import Profiler
+                    self._profiler = Profiler(async_mode="enabled")
+                except ImportError:
+                    print("pyinstrument is not installed; using cProfile", file=sys.stderr)
+                    self.mode = "cprofile"
+            if self._profiler is None:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            else:
+                self._profiler.start()
+        except Exception:
+            self._profiler = None
+            RequestProfiler._active.release()
+            raise
+        return self.activate()
+
+    def stop(self):
+        """Write the profile and return its path, or None if nothing was profiled."""
+        if self._profiler is None:
+            return None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stem = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.label}")
+            if self.mode == "pyinstrument":
+                self._profiler.stop()
+                path = stem + ".html"
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(self._profiler.output_html())
+            else:
+                self._profiler.disable()
+                path = stem + ".prof"
+                with self._threads_lock:
+                    threads, self._threads = self._threads, []
+                stats = pstats.Stats(self._profiler)
+                for profile in threads:
+                    stats.add(profile)
+                stats.dump_stats(path)
+            print(f"Request profile written to {path}", file=sys.stderr)
+            return path
+        finally:
+            with self._threads_lock:
+                self._profiler = None
+            RequestProfiler._active.release()
@@ -0,0 +1,82 @@
+"""PDF page text extraction, parallelised across processes and cached on disk.
+
+Kept free of heavy imports: worker processes import only this module and PyPDF2.
+"""
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+import PyPDF2
+
+# The repository's tmp/, whatever the working directory
+PAGE_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'tmp', 'pdf_pages'))
+# Below this many pages, process startup and pickling cost more than they save
+PARALLEL_MIN_PAGES = 24
+MAX_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: the app process is multi-threaded, so forking it is unsafe
+                _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def extract_page_range(data, start, stop):
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [(reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+def extract_pages(data, workers=None):
+    """Text of every page, in page order."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    n_pages = len(reader.pages)
+    workers = workers or MAX_WORKERS
+    if n_pages < PARALLEL_MIN_PAGES or workers < 2:
+        return [(page.extract_text() or "") for page in reader.pages]
+    # A few contiguous ranges per worker balances uneven pages without pickling the PDF per page
+    n_tasks = min(n_pages, workers * 4)
+    bounds = [round(i * n_pages / n_tasks) for i in range(n_tasks + 1)]
+    pool = _get_pool()
+    futures = [pool.submit(extract_page_range, data, bounds[i], bounds[i + 1]) for i in range(n_tasks)]
+    pages = []
+    for future in futures:
+        pages.extend(future.result())
+    return pages
+
+def _cache_path(digest, cache_dir):
+    return os.path.join(cache_dir or PAGE_CACHE_DIR, f"{digest}.json")
+
+def load_cached_pages(digest, cache_dir=None):
+    try:
+        with open(_cache_path(digest, cache_dir), encoding="utf-8") as f:
+            return json.load(f)["pages"]
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+def store_cached_pages(digest, pages, cache_dir=None):
+    path = _cache_path(digest, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"pages": pages}, f)
+    os.replace(tmp_path, path)
+
+def get_pages(data, digest=None, cache_dir=None, workers=None):
+    """Page texts for a PDF, from the on-disk cache keyed by SHA-256 when available."""
+    digest = digest or hashlib.sha256(data).hexdigest()
+    pages = load_cached_pages(digest, cache_dir)
+    if pages is None:
+        pages = extract_pages(data, workers=workers)
+        try:
+            store_cached_pages(digest, pages, cache_dir)
+        except OSError:
+            pass
+    return pages
@@ -1,12 +1,112 @@
-import PyPDF2
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from utils.pdf_extract import get_pages
+
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 40
+TOP_K = 4
+MAX_CACHED_DOCUMENTS = 16
+
+def read_file_bytes(uploaded_file):
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        return bytes(uploaded_file)
+    if isinstance(uploaded_file, str):
+        with open(uploaded_file, 'rb') as f:
+            return f.read()
+    if hasattr(uploaded_file, 'getvalue'):
+        return uploaded_file.getvalue()
+    uploaded_file.seek(0)
+    return uploaded_file.read()
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def chunk_pages(pages, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """Split a page stream into overlapping word windows; yields (page_number, text)."""
+    step = max(1, chunk_words - overlap)
+    window, window_pages = [], []
+    emitted = False
+    for page_number, text in enumerate(pages, start=1):
+        words = text.split()
+        window.extend(words)
+        window_pages.extend([page_number] * len(words))
+        while len(window) >= chunk_words:
+            yield window_pages[0], " ".join(window[:chunk_words])
+            emitted = True
+            del window[:step]
+            del window_pages[:step]
+    # The words left after the last full window, unless they are only its overlap
+    if window and (len(window) > overlap or not emitted):
+        yield window_pages[0], " ".join(window)
+
+class DocumentIndex:
+    """BM25 index over a document's chunks, stored as a sparse term-weight matrix."""
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.pages = [page for page, _ in chunks]
+        self.chunks = [text for _, text in chunks]
+        self.vectorizer = CountVectorizer(stop_words='english', token_pattern=r"(?u)\b\w[\w.$%-]*\b")
+        if not self.chunks:
+            return
+        counts = self.vectorizer.fit_transform(self.chunks).tocsr().astype(np.float64)
+        n_docs = counts.shape[0]
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        lengths = np.asarray(counts.sum(axis=1)).ravel()
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+        # Precompute idf * tf * (k1 + 1) / (tf + norm) for every stored (chunk, term)
+        row_norm = np.repeat(norm, np.diff(counts.indptr))
+        tf = counts.data
+        counts.data = idf[counts.indices] * tf * (k1 + 1) / (tf + row_norm)
+        self.weights = counts.tocsc()
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def search(self, query, k=TOP_K):
+        """Return up to k (page, text, score) tuples, best first."""
+        if not self.chunks:
+            return []
+        terms = self.vectorizer.transform([query]).indices
+        if not len(terms):
+            return []
+        scores = np.asarray(self.weights[:, terms].sum(axis=1)).ravel()
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.pages[i], self.chunks[i], float(scores[i])) for i in top if scores[i] > 0]
+
+def build_index(data, digest=None):
+    chunks = list(chunk_pages(get_pages(data, digest=digest)))
+    return DocumentIndex(chunks)
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+def get_document_index(uploaded_file):
+    """Index for an uploaded PDF, cached by the SHA-256 of its contents. None if it cannot be read."""
+    try:
+        data = read_file_bytes(uploaded_file)
+        key = content_hash(data)
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is not None:
+                _indexes.move_to_end(key)
+                return index
+        index = build_index(data, digest=key)
+        with _indexes_lock:
+            _indexes[key] = index
+            while len(_indexes) > MAX_CACHED_DOCUMENTS:
+                _indexes.popitem(last=False)
+        return index
+    except Exception as e:
+        return None
 
 def process_pdf(uploaded_file):
     try:
-        # Read PDF content
-        pdf_reader = PyPDF2.PdfReader(uploaded_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() or ""
-        return text
+        return "".join(get_pages(read_file_bytes(uploaded_file)))
     except Exception as e:
-        return None
\ No newline at end of file
+        return None
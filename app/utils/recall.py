@@ -0,0 +1,242 @@
+"""Retrieval-first answers to questions about a session's earlier turns.
+
+Each turn is indexed once, when it is added: its words go into a per-session
+BM25 index, and the symbols and dates the user asked about are extracted with
+the SymbolResolver and DateParser. Common recall questions ("which stocks did
+I ask about?", "what was my last question?", "did I ask about Tesla?") are
+answered from that index without a model call. Anything else goes to
+MemoryAgent, with the best matching turns as its prompt.
+"""
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, namedtuple
+from datetime import datetime
+from utils.context import FOOTER, collapse_tables, truncate
+from utils.dates import format_day
+
+# Turns loaded from storage when a session is first recalled
+RECALL_HISTORY = 500
+MAX_SESSIONS = 10000
+RESPONSE_TOKENS = 120
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+Turn = namedtuple("Turn", ["number", "user_query", "response", "agent_name", "timestamp", "symbols", "dates"])
+
+TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from how i in is it me my of on or "
+    "the this to was what when which who will with you your about ask asked earlier "
+    "previous previously before history remind tell said say".split())
+ACTIONS = r"(?:ask|asked|mention|mentioned|look|looked|discuss|discussed|talk|talked|check|checked|search|searched|query|queried)"
+SYMBOLS_QUESTION = re.compile(rf"\b(?:which|what)\s+(?:stocks?|symbols?|tickers?|compan(?:y|ies)|shares)\b.*\b{ACTIONS}\b")
+DATES_QUESTION = re.compile(rf"\b(?:which|what)\s+(?:dates?|days?)\b.*\b{ACTIONS}\b")
+LAST_QUESTION = re.compile(
+    r"\bwhat\s+(?:was|were)\s+my\s+(?P<which>last|previous|earlier|first)\s+(?:(?P<n>\d+)\s+)?(?:question|quer(?:y|ies)|questions)\b"
+    r"|\bwhat\s+did\s+i\s+(?:just\s+|last\s+)?ask\b(?!.*\babout\b)")
+DID_I_ASK = re.compile(rf"\bdid\s+i\s+(?:(?:ever|already|previously|before)\s+)?{ACTIONS}\b")
+WHAT_DID_YOU_SAY = re.compile(
+    r"\bwhat\s+(?:did\s+you\s+(?:say|tell\s+me|answer|reply)|was\s+(?:the|your)\s+(?:answer|response|reply))\b")
+MAX_LISTED = 10
+RECALL_AGENT = "MemoryAgent"
+
+def tokenize(text):
+    return [term for term in TOKEN.findall(text.lower()) if term not in STOPWORDS]
+
+def _quote(text):
+    return f'"{truncate(text, 40)}"'
+
+def _when(turn):
+    return f" ({turn.timestamp.strftime('%m/%d/%Y %H:%M')})" if isinstance(turn.timestamp, datetime) else ""
+
+class SessionRecall:
+    """BM25 index and extracted facts for one session's turns, oldest first."""
+
+    def __init__(self, resolver, date_parser):
+        self.resolver = resolver
+        self.date_parser = date_parser
+        self.turns = []
+        self._postings = {}      # term -> {turn number: term frequency}
+        self._lengths = []
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def _resolver(self):
+        return self.resolver() if callable(self.resolver) else self.resolver
+
+    def add(self, user_query, response, agent_name, timestamp=None):
+        user_query = " ".join((user_query or "").split())
+        response = truncate(" ".join(collapse_tables(FOOTER.sub("", response or "")).split()), RESPONSE_TOKENS)
+        if agent_name == RECALL_AGENT:
+            # Questions about the conversation are not questions about stocks or dates,
+            # and their answers only repeat earlier turns, so they are left out of search
+            symbols, dates, terms = [], [], Counter()
+        else:
+            symbols = self._resolver().resolve_all(user_query)
+            # Relative dates ("last 3 months") are relative to when the question was asked
+            day = timestamp.date() if isinstance(timestamp, datetime) else None
+            dates = self.date_parser.parse_all(user_query, today=day)
+            terms = Counter(tokenize(f"{user_query} {response}") + [symbol.lower() for symbol in symbols])
+        with self._lock:
+            number = len(self.turns)
+            self.turns.append(Turn(number, user_query, response, agent_name, timestamp, symbols, dates))
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[number] = count
+            length = sum(terms.values())
+            self._lengths.append(length)
+            self._total_length += length
+
+    def search(self, text, k=3):
+        """Best matching turns for text as [(score, turn)], best first."""
+        terms = set(tokenize(text)) | {symbol.lower() for symbol in self._resolver().resolve_all(text)}
+        with self._lock:
+            n = len(self.turns)
+            if not n:
+                return []
+            average = self._total_length / n
+            scores = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for number, tf in postings.items():
+                    norm = tf + K1 * (1 - B + B * self._lengths[number] / average)
+                    scores[number] = scores.get(number, 0.0) + idf * tf * (K1 + 1) / norm
+            # Ties go to the more recent turn
+            best = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:k]
+            return [(score, self.turns[number]) for number, score in best]
+
+    def answer(self, query):
+        """Answer a recall question from the index, or None when it needs the model."""
+        text = query.lower()
+        with self._lock:
+            turns = list(self.turns)
+        if SYMBOLS_QUESTION.search(text):
+            return self._answer_symbols(turns)
+        if DATES_QUESTION.search(text):
+            return self._answer_dates(turns)
+        match = LAST_QUESTION.search(text)
+        if match:
+            return self._answer_questions(turns, match.group("which"), match.group("n"))
+        if DID_I_ASK.search(text):
+            return self._answer_did_i_ask(query, turns)
+        if WHAT_DID_YOU_SAY.search(text):
+            return self._answer_what_was_said(query)
+        return None
+
+    def _answer_symbols(self, turns):
+        counts = Counter()
+        latest = OrderedDict()
+        for turn in reversed(turns):
+            for symbol in turn.symbols:
+                counts[symbol] += 1
+                latest.setdefault(symbol, turn)
+        if not latest:
+            return "You haven't asked about any stocks in this conversation yet."
+        lines = [f"You asked about {len(latest)} stock{'s' if len(latest) > 1 else ''}, most recent first:"]
+        for symbol, turn in list(latest.items())[:MAX_LISTED]:
+            times = f"{counts[symbol]} times, " if counts[symbol] > 1 else ""
+            lines.append(f"- {symbol} ({times}last: {_quote(turn.user_query)}{_when(turn)})")
+        return "\n".join(lines)
+
+    def _answer_dates(self, turns):
+        seen = OrderedDict()
+        for turn in reversed(turns):
+            for expr in turn.dates:
+                label = format_day(expr.start) if expr.start == expr.end else f"{format_day(expr.start)} to {format_day(expr.end)}"
+                seen.setdefault(label, turn)
+        if not seen:
+            return "You haven't asked about any specific dates in this conversation yet."
+        lines = ["Dates you asked about, most recent first:"]
+        for label, turn in list(seen.items())[:MAX_LISTED]:
+            lines.append(f"- {label}: {_quote(turn.user_query)}")
+        return "\n".join(lines)
+
+    def _answer_questions(self, turns, which, n):
+        if not turns:
+            return "You haven't asked anything earlier in this conversation."
+        count = min(int(n) if n else 1, MAX_LISTED)
+        picked = turns[:count] if which == "first" else turns[-count:][::-1]
+        if count == 1:
+            turn = picked[0]
+            return f"Your {'first' if which == 'first' else 'last'} question was {_quote(turn.user_query)}{_when(turn)}, answered by {turn.agent_name}."
+        lines = [f"Your {'first' if which == 'first' else 'last'} {len(picked)} questions:"]
+        lines.extend(f"- {_quote(turn.user_query)}{_when(turn)}" for turn in picked)
+        return "\n".join(lines)
+
+    def _answer_did_i_ask(self, query, turns):
+        symbols = self._resolver().resolve_all(query)
+        if symbols:
+            lines = []
+            for symbol in symbols:
+                found = [turn for turn in turns if symbol in turn.symbols]
+                if found:
+                    times = f"{len(found)} times, most recently" if len(found) > 1 else "once"
+                    lines.append(f"Yes, you asked about {symbol} {times}: {_quote(found[-1].user_query)}{_when(found[-1])}.")
+                else:
+                    lines.append(f"No, you haven't asked about {symbol} in this conversation.")
+            return "\n".join(lines)
+        hits = self.search(query, k=1)
+        if not hits:
+            return "I couldn't find an earlier question about that in this conversation."
+        turn = hits[0][1]
+        return f"The closest earlier question is {_quote(turn.user_query)}{_when(turn)}, answered by {turn.agent_name}."
+
+    def _answer_what_was_said(self, query):
+        hits = self.search(query, k=1)
+        if not hits:
+            return None
+        turn = hits[0][1]
+        return f"You asked {_quote(turn.user_query)}{_when(turn)}. {turn.agent_name} answered:\n\n{turn.response}"
+
+    def prompt(self, query, k=3):
+        """The best matching turns as prompt context for MemoryAgent, or "" when none match."""
+        hits = self.search(query, k)
+        return "\n".join(
+            f"User: {turn.user_query} | Agent: {turn.agent_name} | Response: {turn.response}"
+            for _, turn in sorted(hits, key=lambda hit: hit[1].number))
+
+    def __len__(self):
+        return len(self.turns)
+
+class RecallManager:
+    """SessionRecall per session, least recently used sessions dropped first."""
+
+    def __init__(self, resolver, date_parser, max_sessions=MAX_SESSIONS):
+        self.resolver = resolver
+        self.date_parser = date_parser
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            recall = self._sessions.get(session_id)
+            if recall is not None:
+                self._sessions.move_to_end(session_id)
+            return recall
+
+    def seed(self, session_id, rows):
+        """Index a session's stored history rows (newest first), unless it is already indexed."""
+        recall = SessionRecall(self.resolver, self.date_parser)
+        for row in reversed(rows or []):
+            recall.add(row["user_query"], row["response"], row["agent_name"], row.get("timestamp"))
+        with self._lock:
+            recall = self._sessions.setdefault(session_id, recall)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return recall
+
+    def add_turn(self, session_id, user_query, response, agent_name):
+        """Index a finished turn; sessions not yet indexed are seeded from storage later."""
+        recall = self.get(session_id)
+        if recall is not None:
+            recall.add(user_query, response, agent_name, datetime.now())
+
+    def drop(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
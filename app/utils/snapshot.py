@@ -0,0 +1,107 @@
+"""Binary columnar snapshot of the market data CSV.
+
+A snapshot is a directory holding one raw little-endian file per column plus
+meta.json:
+
+    days      int32   day offsets from 1970-01-01, sorted within each symbol
+    Open..    float64 (or float32) OHLCV columns, same row order
+    meta.json symbols and their start offsets, row count, dtypes, file names
+
+Columns are opened with numpy.memmap, so loading copies nothing and every
+process mapping the same snapshot shares the OS page cache.
+
+    cd app && python -m utils.snapshot data/stock_market_data.csv
+"""
+import json
+import os
+import sys
+import uuid
+import numpy as np
+
+FORMAT_VERSION = 1
+DAY_DTYPE = '<i4'
+
+def default_snapshot_dir(csv_path):
+    return os.path.splitext(os.path.abspath(csv_path))[0] + '.snapshot'
+
+def meta_path(snapshot_dir):
+    return os.path.join(snapshot_dir, 'meta.json')
+
+def write_snapshot(snapshot_dir, data, source_mtime_ns, price_dtype='float64'):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    # Fresh file names per build: a reader may still have the previous generation mapped
+    generation = uuid.uuid4().hex[:12]
+    price_dtype = np.dtype(price_dtype).newbyteorder('<').str
+    arrays = {'days': np.asarray(data.days).astype(DAY_DTYPE)}
+    for name, column in data.columns.items():
+        arrays[name] = np.asarray(column).astype(price_dtype)
+    files, dtypes = {}, {}
+    for name, array in arrays.items():
+        filename = f"{generation}.{name}.bin"
+        array.tofile(os.path.join(snapshot_dir, filename))
+        files[name] = filename
+        dtypes[name] = array.dtype.str
+    names = sorted(data.symbols, key=lambda s: data.symbols[s][0])
+    meta = {
+        'version': FORMAT_VERSION,
+        'rows': int(len(arrays['days'])),
+        'symbolized': bool(data.symbolized),
+        'symbols': names,
+        'starts': [data.symbols[s][0] for s in names],
+        'source_mtime_ns': source_mtime_ns,
+        'files': files,
+        'dtypes': dtypes,
+    }
+    previous = _read_meta(snapshot_dir)
+    tmp_path = meta_path(snapshot_dir) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path(snapshot_dir))
+    if previous:
+        for filename in previous.get('files', {}).values():
+            try:
+                os.remove(os.path.join(snapshot_dir, filename))
+            except OSError:
+                pass
+    return meta
+
+def _read_meta(snapshot_dir):
+    try:
+        with open(meta_path(snapshot_dir)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def read_snapshot(snapshot_dir, source_mtime_ns=None):
+    """Memory-map a snapshot. Returns None if it is missing, unreadable or older than the CSV."""
+    meta = _read_meta(snapshot_dir)
+    if meta is None or meta.get('version') != FORMAT_VERSION:
+        return None
+    if source_mtime_ns is not None and meta.get('source_mtime_ns') != source_mtime_ns:
+        return None
+    rows = meta['rows']
+    arrays = {}
+    try:
+        for name, filename in meta['files'].items():
+            path = os.path.join(snapshot_dir, filename)
+            if rows:
+                arrays[name] = np.memmap(path, dtype=meta['dtypes'][name], mode='r', shape=(rows,))
+            else:
+                arrays[name] = np.empty(0, dtype=meta['dtypes'][name])
+    except (FileNotFoundError, ValueError):
+        return None
+    days = arrays.pop('days')
+    return {
+        'rows': rows,
+        'symbolized': meta['symbolized'],
+        'symbols': meta['symbols'],
+        'starts': meta['starts'],
+        'days': days,
+        'columns': arrays,
+    }
+
+if __name__ == "__main__":
+    from utils.market_data import DEFAULT_CSV_PATH, compile_snapshot
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV_PATH
+    price_dtype = sys.argv[2] if len(sys.argv) > 2 else 'float64'
+    print(f"Wrote snapshot to {compile_snapshot(csv_path, price_dtype=price_dtype)}")
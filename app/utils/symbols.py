@@ -0,0 +1,223 @@
+"""Ticker and company-name resolution over a local symbol universe.
+
+Every name, alias and ticker is compiled into one Aho-Corasick automaton, so a
+query (or a history entry) is resolved in a single pass over its characters
+no matter how many names the universe holds.
+"""
+import csv
+import os
+import re
+import threading
+from collections import OrderedDict
+from utils.market_data import DEFAULT_CSV_PATH, DEFAULT_SYMBOL, get_store
+
+SYMBOLS_CSV_PATH = os.path.join(os.path.dirname(DEFAULT_CSV_PATH), "symbols.csv")
+# Seed names, kept even when symbols.csv is missing
+COMPANY_NAMES = {
+    'nvidia': 'NVDA', 'amazon': 'AMZN', 'tesla': 'TSLA', 'apple': 'AAPL',
+    'microsoft': 'MSFT', 'google': 'GOOGL', 'intel': 'INTC'
+}
+# Uppercase words that are rarely meant as tickers; they only count with a $ prefix
+NOT_TICKERS = {"I", "A", "CEO", "CFO", "PDF", "USD", "EPS", "AI", "IPO", "ETF", "US", "USA", "OK", "MCP", "CSV", "PE",
+               "SMA", "EMA", "RSI", "VWAP", "STD", "MA"}
+TICKER_PATTERN = re.compile(r"(?<![\w$])\$?([A-Z]{1,5})\b")
+MAX_SESSIONS = 10000
+
+def _lower(text):
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few non-ASCII characters lowercase to two; keep offsets aligned with the original
+    return "".join(c.lower()[0] for c in text)
+
+def _ticker_words(text, dollar_only=False):
+    """(start, end, ticker) for every word that looks like a ticker, known or not.
+
+    In all-caps text every word looks like one, so there only $-prefixed
+    words count.
+    """
+    dollar_only = dollar_only or text.isupper()
+    for match in TICKER_PATTERN.finditer(text):
+        ticker = match.group(1)
+        dollar = match.group(0).startswith("$")
+        if dollar or (not dollar_only and len(ticker) > 1 and ticker not in NOT_TICKERS):
+            yield match.start(), match.end(), ticker
+
+def load_universe(path=SYMBOLS_CSV_PATH, store=None):
+    """{symbol: set of names and aliases} from symbols.csv, the seed names and the market data symbols."""
+    universe = {}
+    for name, symbol in COMPANY_NAMES.items():
+        universe.setdefault(symbol, set()).add(name)
+    if path and os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                symbol = row["Symbol"].strip().upper()
+                names = universe.setdefault(symbol, set())
+                for name in [row.get("Name") or ""] + (row.get("Aliases") or "").split("|"):
+                    if name.strip():
+                        names.add(name.strip())
+    if store is not None:
+        for symbol in store.symbols():
+            if symbol != DEFAULT_SYMBOL:
+                universe.setdefault(symbol.upper(), set())
+    return universe
+
+class SymbolResolver:
+    """Resolves company names, aliases and tickers in text to ticker symbols.
+
+    Names match case-insensitively on word boundaries. Tickers must be written
+    in capitals (or with a $ prefix), so ordinary words do not resolve. Where
+    matches overlap the longest wins, e.g. "bank of america" over "america".
+    """
+
+    def __init__(self, universe):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self.size = 0
+        for symbol, names in universe.items():
+            self._add(symbol.lower(), symbol, True)
+            for name in names:
+                self._add(name.lower(), symbol, False)
+        self._link()
+
+    @classmethod
+    def from_names(cls, names=COMPANY_NAMES):
+        universe = {}
+        for name, symbol in names.items():
+            universe.setdefault(symbol, set()).add(name)
+        return cls(universe)
+
+    def _add(self, pattern, symbol, is_ticker):
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] += ((len(pattern), symbol, is_ticker),)
+        self.size += 1
+
+    def _link(self):
+        # Breadth-first: a node's failure link is the longest proper suffix that is also a prefix
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+                queue.append(child)
+
+    def find(self, text):
+        """Non-overlapping (start, end, symbol) matches, in order of appearance."""
+        lowered = _lower(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(lowered)
+        hits = []
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            if end < n and lowered[end].isalnum():
+                continue
+            for length, symbol, is_ticker in out[node]:
+                start = end - length
+                if start and lowered[start - 1].isalnum():
+                    continue
+                if is_ticker:
+                    written = text[start:end]
+                    dollar = start and text[start - 1] == "$"
+                    if not dollar and not (written.isupper() and len(written) > 1 and written not in NOT_TICKERS):
+                        continue
+                hits.append((start, end, symbol))
+        # Leftmost-longest selection among overlapping matches
+        hits.sort(key=lambda hit: (hit[0], hit[0] - hit[1]))
+        selected = []
+        last_end = 0
+        for hit in hits:
+            if hit[0] >= last_end:
+                selected.append(hit)
+                last_end = hit[1]
+        return selected
+
+    def resolve(self, text, unknown_tickers=True):
+        """First symbol mentioned in text, or None.
+
+        With unknown_tickers, a capitalised word that looks like a ticker but is
+        outside the universe is still returned when nothing known matched,
+        unless the whole text is in capitals.
+        """
+        hits = self.find(text)
+        if hits:
+            return hits[0][2]
+        if unknown_tickers:
+            for _, _, ticker in _ticker_words(text):
+                return ticker
+        return None
+
+    def resolve_all(self, text, unknown_tickers=True):
+        """Every distinct symbol mentioned in text, in order of appearance.
+
+        With unknown_tickers, ticker-like words outside the universe are
+        included too, unless they overlap a known match; once anything known
+        matched, only $-prefixed ones are added.
+        """
+        hits = self.find(text)
+        if unknown_tickers:
+            known = list(hits)
+            for start, end, ticker in _ticker_words(text, dollar_only=bool(known)):
+                if not any(start < hit_end and hit_start < end for hit_start, hit_end, _ in known):
+                    hits.append((start, end, ticker))
+            hits.sort()
+        return list(dict.fromkeys(symbol for _, _, symbol in hits))
+
+class SessionSymbolCache:
+    """Last symbol each session talked about, so follow-ups skip the history scan."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._symbols = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            symbol = self._symbols.get(session_id)
+            if symbol is not None:
+                self._symbols.move_to_end(session_id)
+            return symbol
+
+    def remember(self, session_id, symbol):
+        with self._lock:
+            self._symbols[session_id] = symbol
+            self._symbols.move_to_end(session_id)
+            while len(self._symbols) > self.max_sessions:
+                self._symbols.popitem(last=False)
+
+_resolver = None
+_resolver_source = None
+_resolver_lock = threading.Lock()
+
+def get_resolver(path=SYMBOLS_CSV_PATH, csv_path=DEFAULT_CSV_PATH):
+    """Process-wide resolver, rebuilt when the market data store reloads."""
+    global _resolver, _resolver_source
+    store = get_store(csv_path)
+    source = store.data()
+    if _resolver is None or source is not _resolver_source:
+        with _resolver_lock:
+            if _resolver is None or source is not _resolver_source:
+                _resolver = SymbolResolver(load_universe(path, store))
+                _resolver_source = source
+    return _resolver
@@ -0,0 +1,82 @@
+"""Background warm-up: start-up work that runs once the process is already serving.
+
+An entry point lists its stages as (name, callable). WarmUp runs them in order
+on a daemon thread, times each one into the metrics registry, and sets a
+readiness event when the last one has finished. A failing stage is recorded
+and skipped. Nothing waits on warm-up to be correct: whatever it has not
+loaded yet is loaded by the first request that needs it, so warm-up only
+moves that cost off the first request.
+
+With WARMUP=off, start() does nothing and the process reports ready at once.
+"""
+import os
+import sys
+import threading
+import time
+from utils.metrics import span
+
+WARMUP_ENABLED = os.getenv("WARMUP", "on").lower() not in ("off", "0", "false")
+
+class WarmUp:
+    """Named start-up stages run in order on a background thread, with a readiness signal."""
+
+    def __init__(self, stages, name="warmup", enabled=None):
+        self.stages = list(stages)
+        self.name = name
+        self.enabled = WARMUP_ENABLED if enabled is None else enabled
+        self._status = {stage: {"state": "pending"} for stage, _ in self.stages}
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._elapsed = None
+
+    def start(self):
+        """Start the stages on a daemon thread; later calls are no-ops."""
+        with self._lock:
+            if self._thread is None and not self._ready.is_set():
+                if not self.enabled:
+                    for stage in self._status:
+                        self._status[stage] = {"state": "skipped"}
+                    self._ready.set()
+                    return self
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            for stage, func in self.stages:
+                self._status[stage] = {"state": "running"}
+                start = time.perf_counter()
+                try:
+                    with span("warmup", stage=stage):
+                        func()
+                    state = {"state": "done"}
+                except Exception as e:
+                    print(f"Warm-up stage {stage} failed: {e}", file=sys.stderr)
+                    state = {"state": "failed", "error": str(e)}
+                state["ms"] = round((time.perf_counter() - start) * 1000, 3)
+                self._status[stage] = state
+        finally:
+            self._elapsed = time.perf_counter() - started
+            self._ready.set()
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        """Block until every stage has finished (or failed); False on timeout."""
+        return self._ready.wait(timeout)
+
+    def status(self):
+        """{"ready", "ok", "stages": {name: {"state", "ms", "error"?}}, "ms"?} for health checks and the UI."""
+        stages = {stage: dict(state) for stage, state in self._status.items()}
+        status = {
+            "ready": self.is_ready(),
+            "ok": all(state["state"] in ("done", "skipped") for state in stages.values()),
+            "stages": stages,
+        }
+        if self._elapsed is not None:
+            status["ms"] = round(self._elapsed * 1000, 3)
+        return status
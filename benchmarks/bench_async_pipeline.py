@@ -0,0 +1,79 @@
+"""Concurrent sessions through ReasoningStockTeam.process_query with stubbed LLM and DB backends.
+
+The baseline runs sessions one after another, which is what the previous
+implementation amounted to: every stage blocked the event loop.
+
+    python benchmarks/bench_async_pipeline.py --sessions 50 --llm-ms 300 --db-ms 20
+"""
+import argparse
+import asyncio
+import os
+import time
+from common import report, summarize
+from fakes import FakeAsyncGroq, install_fake_db
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+# Every session asks a distinct question; keep the LLM cache out of the measurement
+os.environ.setdefault("LLM_CACHE", "off")
+fake_db = install_fake_db()
+
+from agents.coordinator_team import ReasoningStockTeam
+from agents.registry import AgentRegistry
+from utils.aio import run_sync
+
+class StubKnowledgeAgent:
+    """KnowledgeAgent stand-in: a blocking LLM call that declines general questions."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def query_knowledge(self, query, session_id=None, stream=False, csv_lookup=False):
+        time.sleep(self.latency)
+        return None
+
+def make_team(llm_latency, db_latency):
+    fake_db.latency = db_latency
+    fake_db.save_chat("hello", "hi", "GeneralAgent")
+    team = ReasoningStockTeam()
+    team.agents = AgentRegistry({
+        "knowledge": lambda: StubKnowledgeAgent(llm_latency),
+        "groq_client": lambda: FakeAsyncGroq(llm_latency),
+    })
+    return team
+
+async def session(team, i, latencies):
+    start = time.perf_counter()
+    await team.process_query(f"Who is the president of country {i}?", None)
+    latencies.append(time.perf_counter() - start)
+
+async def run_concurrent(team, sessions):
+    latencies = []
+    await asyncio.gather(*(session(team, i, latencies) for i in range(sessions)))
+    return latencies
+
+async def run_sequential(team, sessions):
+    latencies = []
+    for i in range(sessions):
+        await session(team, i, latencies)
+    return latencies
+
+def measure(team, runner, sessions):
+    start = time.perf_counter()
+    latencies = run_sync(runner(team, sessions))
+    stats = summarize(latencies)
+    stats["sessions_per_s"] = sessions / (time.perf_counter() - start)
+    return stats
+
+def main(args):
+    team = make_team(args.llm_ms / 1000.0, args.db_ms / 1000.0)
+    report(f"async_pipeline[{args.sessions} sessions]", {
+        "serialized_baseline": measure(team, run_sequential, args.sessions),
+        "concurrent": measure(team, run_concurrent, args.sessions),
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--llm-ms", type=float, default=300.0)
+    parser.add_argument("--db-ms", type=float, default=20.0)
+    main(parser.parse_args())
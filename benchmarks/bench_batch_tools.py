@@ -0,0 +1,70 @@
+"""Multi-symbol questions: one MCP tool call per symbol vs. the batch tools.
+
+Both paths call the server's tool functions in-process on a cold market data
+cache and forecast cache, with yfinance replaced by FakeMarketProvider. Half
+of each symbol list is in the local price CSV and half is fetched upstream
+(current prices always are). Upstream counts the provider requests; the MCP round trip per call is not
+included, so the per-symbol path is if anything flattered.
+
+    python benchmarks/bench_batch_tools.py --sizes 1 10 100 --provider-ms 50
+"""
+import argparse
+import os
+import tempfile
+import time
+from common import report
+from datagen import write_price_csv
+from fakes import FakeMarketProvider
+
+from agents import mcp_server
+from utils.aio import run_sync
+from utils.forecast import ForecastCache, set_forecast_cache
+from utils.market_cache import MarketDataCache, set_market_cache
+from utils.market_data import MarketDataStore
+
+def per_symbol(tool, symbols, params):
+    async def run():
+        return [await getattr(mcp_server, tool)({"symbol": s, "market": s, **params}) for s in symbols]
+    return run
+
+def batch(tool, symbols, params):
+    async def run():
+        return await getattr(mcp_server, tool)({"symbols": symbols, **params})
+    return run
+
+def measure(make, provider):
+    # Cold caches, so every symbol really is fetched or fitted
+    set_market_cache(MarketDataCache(provider=provider))
+    set_forecast_cache(ForecastCache())
+    provider.calls = 0
+    start = time.perf_counter()
+    run_sync(make())
+    return {"ms": (time.perf_counter() - start) * 1000, "upstream": provider.calls}
+
+def main(args):
+    provider = FakeMarketProvider(args.provider_ms / 1000.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        mcp_server.store = MarketDataStore(write_price_csv(os.path.join(tmp, "prices.csv"), max(args.sizes), args.days))
+        local = mcp_server.store.symbols()
+        cases = [
+            ("price", "fetch_stock_price", "fetch_stock_price_batch", {}),
+            ("historical", "fetch_historical_data", "fetch_historical_data_batch", {"period": "1mo"}),
+            ("predict", "predict_stock_price", "predict_stock_price_batch", {"days_ahead": 5}),
+        ]
+        for n in args.sizes:
+            remote = [f"R{i:03d}" for i in range(n - n // 2)]
+            symbols = local[: n // 2] + remote
+            results = {}
+            for label, single, batched, params in cases:
+                results[label] = {
+                    "per_symbol": measure(per_symbol(single, symbols, params), provider),
+                    "batch": measure(batch(batched, symbols, params), provider),
+                }
+            report(f"batch_tools[{n} symbols, provider {args.provider_ms}ms]", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--provider-ms", type=float, default=50.0)
+    main(parser.parse_args())
@@ -0,0 +1,135 @@
+"""Chat history reads and writes against a local Postgres with millions of rows.
+
+Uses the DB_* variables from .env and a scratch table (dropped afterwards) with the
+same schema and index as chat_history, so the app's own table is never touched.
+
+    python benchmarks/bench_chat_history.py --rows 5000000 --sessions 50000
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime
+from common import report, summarize, timeit
+
+import psycopg2
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+TABLE = "chat_history_bench"
+
+def connect():
+    load_dotenv()
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"), user=os.getenv("DB_USER"), password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"), port=os.getenv("DB_PORT")
+    )
+
+def seed(conn, rows, sessions):
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cur.execute(f"""
+            CREATE TABLE {TABLE} (
+                id SERIAL PRIMARY KEY,
+                user_query TEXT NOT NULL,
+                response TEXT NOT NULL,
+                agent_name VARCHAR(50) NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                session_id VARCHAR(64) NOT NULL DEFAULT 'default'
+            )
+        """)
+        cur.execute(f"""
+            INSERT INTO {TABLE} (session_id, user_query, response, agent_name, timestamp)
+            SELECT 's' || (g %% %s), 'What was the open price on ' || g || '?',
+                   'The market open price was ' || (g %% 1000) || '.', 'KnowledgeAgent',
+                   TIMESTAMP '2024-01-01' + g * INTERVAL '1 second'
+            FROM generate_series(1, %s) AS g
+        """, (sessions, rows))
+        conn.commit()
+        cur.execute(f"ANALYZE {TABLE}")
+        conn.commit()
+
+def add_index(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE INDEX {TABLE}_session_ts_idx ON {TABLE} (session_id, timestamp DESC, id DESC)")
+        cur.execute(f"ANALYZE {TABLE}")
+    conn.commit()
+
+def query(conn, sql, params):
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.fetchall()
+
+def read_benchmarks(conn, sessions, repeat):
+    results = {}
+    global_sql = f"SELECT user_query, response, agent_name FROM {TABLE} ORDER BY timestamp DESC LIMIT 10"
+    session_sql = (f"SELECT id, timestamp, user_query, response, agent_name FROM {TABLE} "
+                   f"WHERE session_id = %s ORDER BY timestamp DESC, id DESC LIMIT 10")
+    keyset_sql = (f"SELECT id, timestamp, user_query, response, agent_name FROM {TABLE} "
+                  f"WHERE session_id = %s AND (timestamp, id) < (%s, %s) ORDER BY timestamp DESC, id DESC LIMIT 10")
+    picks = [f"s{random.randrange(sessions)}" for _ in range(repeat)]
+
+    results["global_latest_no_index"] = summarize(timeit(lambda: query(conn, global_sql, ()), repeat))
+    results["session_latest_no_index"] = summarize(timeit(lambda: query(conn, session_sql, (random.choice(picks),)), repeat))
+    add_index(conn)
+    results["session_latest_indexed"] = summarize(timeit(lambda: query(conn, session_sql, (random.choice(picks),)), repeat))
+
+    def next_page():
+        session = random.choice(picks)
+        first = query(conn, session_sql, (session,))
+        if first:
+            query(conn, keyset_sql, (session, first[-1][1], first[-1][0]))
+
+    results["session_two_pages_keyset"] = summarize(timeit(next_page, repeat))
+    return results
+
+def write_benchmarks(conn, messages, batch_size):
+    results = {}
+    rows = [(f"w{i % 100}", f"question {i}", f"answer {i}", "KnowledgeAgent", datetime.now()) for i in range(messages)]
+
+    def per_message():
+        # The old save_chat: one INSERT and one commit on the request path
+        with conn.cursor() as cur:
+            for row in rows:
+                cur.execute(f"INSERT INTO {TABLE} (session_id, user_query, response, agent_name, timestamp) VALUES (%s, %s, %s, %s, %s)", row)
+                conn.commit()
+
+    def batched():
+        with conn.cursor() as cur:
+            for i in range(0, len(rows), batch_size):
+                execute_values(cur, f"INSERT INTO {TABLE} (session_id, user_query, response, agent_name, timestamp) VALUES %s", rows[i:i + batch_size])
+                conn.commit()
+
+    for label, func in (("save_per_message_commit", per_message), ("save_batched_write_behind", batched)):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        results[label] = {"messages": messages, "total_ms": elapsed * 1000, "per_message_ms": elapsed * 1000 / messages}
+    return results
+
+def main(args):
+    random.seed(0)
+    conn = connect()
+    try:
+        start = time.perf_counter()
+        seed(conn, args.rows, args.sessions)
+        results = {"seed_s": round(time.perf_counter() - start, 2), "rows": args.rows, "sessions": args.sessions}
+        results.update(read_benchmarks(conn, args.sessions, args.repeat))
+        results.update(write_benchmarks(conn, args.messages, args.batch_size))
+        report("chat_history", results)
+    finally:
+        if not args.keep:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            conn.commit()
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--sessions", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table")
+    main(parser.parse_args())
@@ -0,0 +1,144 @@
+"""Cold start of both entry points, each run in a fresh interpreter.
+
+MCP server (benchmarks/offline_mcp_server.py over a generated CSV): time from
+spawn to the first ping answer, then, after a pause standing in for the user,
+the latency of the first tool call (a local fetch_historical_data), and how
+long the server's warm-up took.
+
+Streamlit app (app/main.py under streamlit.testing's AppTest, chat history on
+SQLite): time to the first rendered page, to warm-up finishing, and the
+latency of the first question after the same pause. The question is a
+market-open-price lookup, answered from the CSV without an LLM.
+
+Modes:
+    eager        the previous start-up, emulated: heavy modules (pandas, and
+                 for the app groq, agno and the agent modules, plus the team)
+                 imported before serving; no warm-up
+    lazy         imports on first use; no warm-up (WARMUP=off)
+    lazy_warmup  imports on first use; background warm-up after serving
+
+    python benchmarks/bench_cold_start.py --repeat 3 --think-ms 3000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from common import APP_DIR, report
+from datagen import write_price_csv
+
+from agents.mcp_client import MCPClient
+from utils.aio import run_sync
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+OFFLINE_SERVER = os.path.join(BENCH_DIR, "offline_mcp_server.py")
+MAIN = os.path.join(APP_DIR, "main.py")
+MODES = ("eager", "lazy", "lazy_warmup")
+SERVER_PRELOAD = ("pandas",)
+APP_PRELOAD = ("pandas", "psycopg2.pool", "groq", "agno.team.team", "agno.models.groq", "agno.tools.reasoning",
+               "agents.memory_agent", "agents.knowledge_agent", "agents.rag_agent")
+QUESTION = "What was the market open price on 4/2/2025?"
+
+APP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {bench_dir!r})
+import common
+from fakes import SQLiteChatDB, install_fake_db
+install_fake_db(SQLiteChatDB())
+for module in {preload!r}:
+    __import__(module)
+if {preload!r}:
+    from agents.registry import get_team
+    get_team()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({main!r}, default_timeout=120)
+app.run()
+rendered = time.perf_counter()
+from agents.registry import get_warmup
+warmup = get_warmup()
+warmup.wait(120)
+ready = time.perf_counter()
+time.sleep(max(0.0, {think} - (ready - rendered)))
+asked = time.perf_counter()
+app.chat_input[0].set_value({question!r}).run()
+answered = time.perf_counter()
+print(json.dumps({{
+    "first_render_ms": (rendered - start) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "first_question_ms": (answered - asked) * 1000,
+    "stages": {{name: stage.get("ms") for name, stage in warmup.status()["stages"].items()}},
+}}))
+"""
+
+def server_command(csv_path, preload):
+    if not preload:
+        return [sys.executable, OFFLINE_SERVER, csv_path, "0"]
+    code = (f"import sys, runpy, {', '.join(preload)}; sys.path.insert(0, {BENCH_DIR!r}); "
+            f"sys.argv = [{OFFLINE_SERVER!r}, {csv_path!r}, '0']; runpy.run_path({OFFLINE_SERVER!r}, run_name='__main__')")
+    return [sys.executable, "-c", code]
+
+def server_cold_start(csv_path, symbol, mode, think):
+    os.environ["WARMUP"] = "on" if mode == "lazy_warmup" else "off"
+    client = MCPClient(command=server_command(csv_path, SERVER_PRELOAD if mode == "eager" else ()))
+    try:
+        start = time.perf_counter()
+        client.start()
+        if run_sync(client.send("ping", {})) != "pong":
+            raise RuntimeError("MCP server did not answer ping")
+        pinged = time.perf_counter()
+        time.sleep(think)
+        asked = time.perf_counter()
+        result = run_sync(client.send("fetch_historical_data", {"market": symbol, "start": "01/02/2006", "end": "03/31/2006"}))
+        answered = time.perf_counter()
+        if not isinstance(result, list) or not result:
+            raise RuntimeError(f"Unexpected answer: {result}")
+        status = run_sync(client.send("ready", {}))
+        return {
+            "ping_ms": (pinged - start) * 1000,
+            "first_tool_ms": (answered - asked) * 1000,
+            "server_warmup_ms": status.get("ms", 0.0),
+        }
+    finally:
+        client.close()
+
+def app_cold_start(mode, think):
+    code = APP_PROBE.format(bench_dir=BENCH_DIR, main=MAIN, preload=APP_PRELOAD if mode == "eager" else (),
+                            think=think, question=QUESTION)
+    env = dict(os.environ, WARMUP="on" if mode == "lazy_warmup" else "off", LLM_CACHE="off")
+    out = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, env=env, capture_output=True, text=True)
+    if out.returncode:
+        raise RuntimeError(out.stderr.strip()[-2000:])
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def median_runs(runs):
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0] if key != "stages"}
+
+def main(args):
+    think = args.think_ms / 1000.0
+    results = {}
+    if "mcp_server" in args.entry_points:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = write_price_csv(os.path.join(tmp, "prices.csv"), args.symbols, args.days)
+            symbol = "AAA"
+            for mode in MODES:
+                results[f"mcp_server_{mode}"] = median_runs([server_cold_start(csv_path, symbol, mode, think) for _ in range(args.repeat)])
+    if "main" in args.entry_points:
+        for mode in MODES:
+            runs = [app_cold_start(mode, think) for _ in range(args.repeat)]
+            results[f"main_{mode}"] = median_runs(runs)
+            if mode == "lazy_warmup":
+                results["main_warmup_stages_ms"] = runs[-1]["stages"]
+    report(f"cold_start[{args.symbols} symbols x {args.days} days, {args.think_ms:.0f} ms before the first request]", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entry-points", nargs="+", default=["mcp_server", "main"], choices=["mcp_server", "main"])
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--think-ms", type=float, default=3000.0, help="pause between start-up and the first request")
+    main(parser.parse_args())
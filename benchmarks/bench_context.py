@@ -0,0 +1,72 @@
+"""Fallback prompt context as a conversation grows: last ten raw turns vs. the token-budgeted context.
+
+Responses mix one-month price tables, long RAG answers and short replies, as the
+agents produce them. Tokens are estimated at four characters per token.
+
+    python benchmarks/bench_context.py --turns 200
+"""
+import argparse
+import random
+import time
+from common import report, summarize
+from datagen import WORDS
+
+from utils.context import ContextManager, estimate_tokens
+
+def make_turn(i, rng):
+    kind = i % 3
+    if kind == 0:
+        rows = "\n".join(f"{(i + d) % 12 + 1:02d}/{d + 1:02d}/2025: Open=${rng.uniform(100, 200):.2f}, Close=${rng.uniform(100, 200):.2f}"
+                         for d in range(21))
+        return f"Show historical data for NVDA, turn {i}", f"{rows}\n\n*Response by GeneralAgent*", "GeneralAgent"
+    if kind == 1:
+        answer = " ".join(rng.choice(WORDS) for _ in range(300))
+        return f"What does the uploaded report say about {rng.choice(WORDS)}?", f"{answer}\n\n*Response by RAGAgent*", "RAGAgent"
+    return f"What is the price of TSLA? ({i})", "The current price of TSLA is $245.10.\n\n*Response by GeneralAgent*", "GeneralAgent"
+
+def legacy_history_text(rows):
+    """What process_query built before: the last ten full turns, newest first."""
+    chat_history = rows[-10:][::-1]
+    return "\n".join([f"User: {h['user_query']} | Agent: {h['agent_name']} | Response: {h['response']}" for h in chat_history])
+
+def main(args):
+    rng = random.Random(0)
+    manager = ContextManager(budget=args.budget)
+    context = manager.seed("bench", [])
+    rows = []
+    checkpoints = {n for n in (10, 50, 100, args.turns) if n <= args.turns}
+    legacy_times, add_times, read_times = [], [], []
+    results = {}
+    for i in range(1, args.turns + 1):
+        query, response, agent = make_turn(i, rng)
+        rows.append({"user_query": query, "response": response, "agent_name": agent})
+
+        start = time.perf_counter()
+        legacy = legacy_history_text(rows)
+        legacy_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        manager.add_turn("bench", query, response, agent)
+        add_times.append(time.perf_counter() - start)
+        # Several stages read it per request; only the first renders
+        start = time.perf_counter()
+        text = context.text()
+        context.text()
+        read_times.append(time.perf_counter() - start)
+
+        if i in checkpoints:
+            results[f"turns_{i}"] = {
+                "legacy_tokens": estimate_tokens(legacy),
+                "context_tokens": estimate_tokens(text),
+                "legacy_build_us_p50": summarize(legacy_times)["p50_ms"] * 1000,
+                "context_add_us_p50": summarize(add_times)["p50_ms"] * 1000,
+                "context_read_us_p50": summarize(read_times)["p50_ms"] * 1000,
+            }
+    results["budget_tokens"] = args.budget
+    report("conversation_context", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=1500)
+    main(parser.parse_args())
@@ -0,0 +1,116 @@
+"""Date parsing for KnowledgeAgent on a multi-decade dataset: the original regex chain with a
+Date-column scan vs. the compiled DateParser with the (month, day) calendar index.
+
+    python benchmarks/bench_dates.py --years 40 --symbols 20
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+from datetime import date
+from common import report, summarize
+from datagen import write_price_csv
+
+import pandas as pd
+from utils.dates import DateParser, format_day
+from utils.market_data import MarketDataStore
+
+QUERIES = [
+    "What was the market open price on 4th June 2025?", "market open price on June 4, 2025",
+    "open price 4/10/2025", "market open price on 4th June", "what was the open on 15th march",
+    "market open price on 2nd jan", "how did it open yesterday", "open price last Friday",
+    "market open price", "what is an ETF?",
+]
+
+MONTH_MAP = {
+    'january': '01', 'february': '02', 'march': '03', 'april': '04', 'may': '05', 'june': '06',
+    'july': '07', 'august': '08', 'september': '09', 'october': '10', 'november': '11', 'december': '12',
+    'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04', 'jun': '06', 'jul': '07',
+    'aug': '08', 'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
+}
+
+def legacy_parse_date(query, dates):
+    """KnowledgeAgent.parse_date as it was: four regex searches, then a string scan of the Date column."""
+    patterns = [
+        r'(\d{1,2})(?:st|nd|rd|th)?\s+(\w+)\s+(\d{4})',
+        r'(\w+)\s+(\d{1,2}),?\s+(\d{4})',
+        r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})'
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, query, re.IGNORECASE)
+        if match:
+            try:
+                if pattern == patterns[2]:
+                    month, day, year = match.groups()
+                    return f"{int(month):02d}/{int(day):02d}/{year}"
+                day, month, year = match.groups()
+                month = MONTH_MAP.get(month.lower(), month)
+                return f"{month}/{int(day):02d}/{year}"
+            except (ValueError, KeyError):
+                continue
+    match = re.search(r'(\d{1,2})(?:st|nd|rd|th)?\s+(\w+)(?!\s+\d{4})', query, re.IGNORECASE)
+    if match:
+        day, month = match.groups()
+        month = MONTH_MAP.get(month.lower(), month)
+        date_prefix = f"{month}/{int(day):02d}/"
+        matching_dates = [d for d in dates if d.startswith(date_prefix)]
+        if matching_dates:
+            return max(matching_dates)
+    return None
+
+def per_call(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            func(query)
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_price_csv(os.path.join(tmp, "prices.csv"), n_symbols=args.symbols, n_days=252 * args.years)
+        frame = pd.read_csv(path)
+        # The original code read Date as zero-padded MM/DD/YYYY strings
+        dates = pd.to_datetime(frame['Date']).dt.strftime('%m/%d/%Y').tolist()
+        store = MarketDataStore(path, snapshot_dir=os.path.join(tmp, "none.snapshot"))
+        store.data()
+
+        start = time.perf_counter()
+        store.data().calendar_index()
+        index_ms = (time.perf_counter() - start) * 1000
+
+        def resolver(month, day):
+            latest = store.latest_date_on(month, day)
+            return None if latest is None else latest.astype(object)
+
+        parser = DateParser(today=lambda: date(2025, 6, 13), year_resolver=resolver)
+
+        def new_parse_date(query):
+            day = parser.parse_day(query)
+            return format_day(day) if day else None
+
+        history = [{"user_query": q} for q in QUERIES]
+        results = {
+            "rows": len(frame),
+            "calendar_index_build_ms": index_ms,
+            "legacy_parse_date": per_call(lambda q: legacy_parse_date(q, dates), args.repeat),
+            "parser_parse_date": per_call(new_parse_date, args.repeat),
+            "legacy_history_scan": summarize([_timed(lambda: [legacy_parse_date(h["user_query"], dates) for h in history]) for _ in range(args.repeat)]),
+            "parser_history_scan": summarize([_timed(lambda: [new_parse_date(h["user_query"]) for h in history]) for _ in range(args.repeat)]),
+            "year_less_lookup_us": _timed(lambda: [store.latest_date_on(6, 4) for _ in range(10000)]) / 10000 * 1e6,
+        }
+    report(f"dates[{args.years} years x {args.symbols} symbols]", results)
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=40)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,62 @@
+"""Prediction throughput: sklearn refit per request vs. cached incremental TrendModels.
+
+    python benchmarks/bench_forecast.py --symbols 100 --days 2520
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from common import report
+from datagen import write_price_csv
+
+from utils.market_data import MarketDataStore
+from utils.forecast import ForecastCache
+
+def refit_predict(store, symbol, days_ahead):
+    # The per-request path predict_stock_price used before (minus the CSV re-read)
+    series = store.get_range(symbol)
+    df = pd.DataFrame({'Date': series['Date'], 'Close': series['Close']})
+    df['Days'] = (pd.to_datetime(df['Date']) - pd.to_datetime(df['Date']).min()).dt.days
+    model = LinearRegression().fit(df[['Days']].values, df['Close'].values)
+    return model.predict([[df['Days'].max() + days_ahead]])[0]
+
+def throughput(func, calls):
+    start = time.perf_counter()
+    for args in calls:
+        func(*args)
+    return len(calls) / (time.perf_counter() - start)
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MarketDataStore(write_price_csv(os.path.join(tmp, "prices.csv"), args.symbols, args.days))
+        symbols = store.symbols()
+        random.seed(0)
+        calls = [(random.choice(symbols), random.randint(1, 30)) for _ in range(args.requests)]
+        forecasts = ForecastCache()
+        for symbol in symbols:
+            forecasts.from_store(store, symbol)
+
+        results = {
+            "refit_per_request_per_s": throughput(lambda s, h: refit_predict(store, s, h), calls[: max(50, args.requests // 20)]),
+            "cached_per_s": throughput(lambda s, h: forecasts.from_store(store, s).predict_ahead(h), calls),
+        }
+        models = [forecasts.from_store(store, s) for s in symbols]
+        horizons = np.arange(1, 31)
+        start = time.perf_counter()
+        for _ in range(100):
+            forecasts.predict_many(models, horizons)
+        batch_elapsed = (time.perf_counter() - start) / 100
+        results["batch_predictions_per_s"] = len(models) * len(horizons) / batch_elapsed
+        results["batch_pass_ms"] = batch_elapsed * 1000
+        report(f"forecast[{args.symbols} symbols x {args.days} days]", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--requests", type=int, default=20000)
+    main(parser.parse_args())
@@ -0,0 +1,116 @@
+"""Technical indicators: pandas rolling recomputation per request vs. the incremental IndicatorCache.
+
+Each request asks for the latest values of several indicators (SMA, EMA,
+rolling std, RSI, VWAP) for one symbol. The baseline recomputes every
+indicator over the symbol's whole history with pandas, as a per-request
+implementation would. The cache computes each series once (vectorized), then
+answers repeats from memory and folds in one new bar per symbol at O(1) work.
+Latest values are checked against pandas.
+
+    python benchmarks/bench_indicators.py --symbols 1000 --days 5040
+"""
+import argparse
+import random
+import time
+import numpy as np
+import pandas as pd
+from common import report, summarize
+from datagen import make_price_frame
+
+from utils.indicators import IndicatorCache, label
+
+SPECS = (("sma", 20), ("sma", 50), ("ema", 20), ("std", 20), ("rsi", 14), ("vwap", 20))
+
+def pandas_indicator(frame, name, window):
+    close = frame["Close"]
+    if name == "sma":
+        return close.rolling(window).mean()
+    if name == "std":
+        return close.rolling(window).std()
+    if name == "ema":
+        return close.ffill().ewm(span=window, adjust=False).mean()
+    if name == "vwap":
+        price = (frame["High"] + frame["Low"] + close) / 3
+        return (price * frame["Volume"]).rolling(window).sum() / frame["Volume"].rolling(window).sum()
+    change = close.ffill().diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    loss = (-change.clip(upper=0)).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+def naive_request(series, specs):
+    frame = pd.DataFrame({name: column for name, column in series.items() if name != 'Date'})
+    return {label(name, window): pandas_indicator(frame, name, window).iloc[-1] for name, window in specs}
+
+def cached_request(cache, symbol, series, specs, version):
+    return {label(name, window): cache.sync(symbol, series, name, window, version).output()[-1] for name, window in specs}
+
+def make_series(n_symbols, n_days):
+    frame = make_price_frame(n_symbols, n_days)
+    dates = pd.to_datetime(frame["Date"][:n_days], format="%m/%d/%Y").values.astype('datetime64[D]')
+    columns = {name: frame[name].to_numpy(dtype=np.float64) for name in ("Open", "High", "Low", "Close", "Volume")}
+    symbols = frame["Symbol"][::n_days].tolist()
+    return {
+        symbol: {'Date': dates, **{name: column[i * n_days:(i + 1) * n_days] for name, column in columns.items()}}
+        for i, symbol in enumerate(symbols)
+    }
+
+def timed(func, calls):
+    latencies = []
+    for args in calls:
+        start = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def main(args):
+    # One bar more than the cache starts with: the "new day" appended later
+    data = make_series(args.symbols, args.days + 1)
+    before = {symbol: {name: column[:-1] for name, column in series.items()} for symbol, series in data.items()}
+    symbols = list(data)
+    random.seed(0)
+    requests = [random.choice(symbols) for _ in range(args.requests)]
+    specs = SPECS
+    cache = IndicatorCache()
+    day0, day1 = object(), object()
+
+    naive = timed(lambda s: naive_request(before[s], specs), [(s,) for s in requests])
+    start = time.perf_counter()
+    for symbol in symbols:
+        cached_request(cache, symbol, before[symbol], specs, day0)
+    cold_s = time.perf_counter() - start
+    hits = timed(lambda s: cached_request(cache, s, before[s], specs, day0), [(s,) for s in requests])
+
+    # A new bar arrives for every symbol: recompute everything vs. fold one bar into each state
+    start = time.perf_counter()
+    for symbol in symbols:
+        naive_request(data[symbol], specs)
+    naive_append_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for symbol in symbols:
+        cached_request(cache, symbol, data[symbol], specs, day1)
+    append_s = time.perf_counter() - start
+
+    error = 0.0
+    for symbol in symbols[:: max(1, len(symbols) // 50)]:
+        expected = naive_request(data[symbol], specs)
+        got = cached_request(cache, symbol, data[symbol], specs, day1)
+        error = max(error, max(abs(got[name] - value) for name, value in expected.items()))
+
+    bars = args.symbols * args.days
+    report(f"indicators[{args.symbols} symbols x {args.days} days, {len(specs)} indicators per request]", {
+        "pandas_recompute_per_request": summarize(naive),
+        "cached_per_request": summarize(hits),
+        "cold_vectorized_s": cold_s,
+        "cold_bars_per_s": bars * len(specs) / cold_s,
+        "new_bar_pandas_recompute_s": naive_append_s,
+        "new_bar_incremental_s": append_s,
+        "new_bar_incremental_us_per_symbol": append_s / args.symbols * 1e6,
+        "max_abs_error": error,
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=5040, help="20 years of trading days")
+    parser.add_argument("--requests", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,76 @@
+"""LLM response cache: upstream calls, hit rate and latency saved, with a stubbed Groq client.
+
+Replays a skewed stream of general questions through ReasoningStockTeam.fallback_groq_query
+(some time-sensitive, which must bypass the cache), then replays it again in a
+"restarted" process whose memory tier is empty but whose SQLite tier is warm.
+
+    python benchmarks/bench_llm_cache.py --queries 500 --distinct 60 --llm-ms 50
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from common import report
+from fakes import FakeAsyncGroq, install_fake_db
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+install_fake_db()
+
+from agents.coordinator_team import ReasoningStockTeam
+from agents.registry import AgentRegistry
+from utils.aio import run_sync
+from utils.llm_cache import LLMResponseCache, MemoryTier, SQLiteTier, set_llm_cache
+
+TOPICS = ["inflation", "a stock split", "market capitalization", "an ETF", "short selling", "the P/E ratio",
+          "a bear market", "dividend yield", "an IPO", "a limit order", "options", "bond yields"]
+TEMPLATES = ["What is {}?", "Explain {} simply", "Who regulates {}?", "Why does {} matter to investors?", "How does {} work?"]
+
+def make_workload(n, distinct, time_sensitive_share, seed=0):
+    rng = random.Random(seed)
+    pool = [TEMPLATES[i % len(TEMPLATES)].format(TOPICS[i % len(TOPICS)]) + ("" if i < len(TOPICS) * len(TEMPLATES) else f" #{i}")
+            for i in range(distinct)]
+    weights = [1.0 / (rank + 1) for rank in range(distinct)]
+    workload = []
+    for _ in range(n):
+        query = rng.choices(pool, weights)[0]
+        if rng.random() < time_sensitive_share:
+            query = f"What is the latest news on {rng.choice(TOPICS)}?"
+        elif rng.random() < 0.3:
+            # Same question, typed differently
+            query = query.lower().rstrip("?") + "  ?"
+        workload.append(query)
+    return workload
+
+def replay(workload, cache, latency):
+    set_llm_cache(cache)
+    groq = FakeAsyncGroq(latency)
+    team = ReasoningStockTeam()
+    team.agents = AgentRegistry({"groq_client": lambda: groq})
+    start = time.perf_counter()
+    for query in workload:
+        run_sync(team.fallback_groq_query(query, "User: hello | Agent: GeneralAgent | Response: hi"))
+    elapsed = time.perf_counter() - start
+    stats = cache.stats()
+    stats.update({"upstream_calls": groq.calls, "total_s": elapsed, "mean_ms": elapsed * 1000 / len(workload)})
+    return stats
+
+def main(args):
+    latency = args.llm_ms / 1000.0
+    workload = make_workload(args.queries, args.distinct, args.time_sensitive)
+    results = {"uncached": replay(workload, LLMResponseCache(enabled=False), latency)}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm_cache.db")
+        results["memory_tier"] = replay(workload, LLMResponseCache([MemoryTier()]), latency)
+        results["memory_sqlite"] = replay(workload, LLMResponseCache([MemoryTier(), SQLiteTier(path)]), latency)
+        # A new process: empty memory tier, same SQLite file
+        results["restart_sqlite_warm"] = replay(workload, LLMResponseCache([MemoryTier(), SQLiteTier(path)]), latency)
+    report(f"llm_cache[{args.queries} queries, {args.distinct} distinct]", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=60)
+    parser.add_argument("--time-sensitive", type=float, default=0.1)
+    parser.add_argument("--llm-ms", type=float, default=50)
+    main(parser.parse_args())
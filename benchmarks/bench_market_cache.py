@@ -0,0 +1,61 @@
+"""Upstream calls and latency with the read-through market data cache, using a fake provider.
+
+    python benchmarks/bench_market_cache.py --users 50 --latency-ms 200
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from common import report, summarize
+from fakes import FakeMarketProvider
+
+from utils.market_cache import MarketDataCache
+
+SYMBOLS = ["NVDA", "AAPL", "MSFT", "AMZN", "TSLA", "GOOGL", "INTC", "AMD"]
+REQUESTS = [{"period": "1d"}, {"period": "1mo"}, {"period": "1y"}, {"start": "2025-06-09", "end": "2025-06-11"}]
+
+def run(fetch, calls, workers):
+    latencies = []
+
+    def one(args):
+        start = time.perf_counter()
+        fetch(*args)
+        latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, calls))
+    return summarize(latencies)
+
+def main(args):
+    latency = args.latency_ms / 1000.0
+    results = {}
+
+    # Burst: many users ask for the same quote at once
+    burst = [("NVDA", {"period": "1d"})] * args.users
+    uncached = FakeMarketProvider(latency)
+    results["burst_uncached"] = run(lambda s, kw: uncached.history(s, **kw), burst, args.users)
+    results["burst_uncached_upstream_calls"] = uncached.calls
+    provider = FakeMarketProvider(latency)
+    cache = MarketDataCache(provider)
+    results["burst_cached"] = run(lambda s, kw: cache.history(s, **kw), burst, args.users)
+    results["burst_cached_upstream_calls"] = provider.calls
+    results["burst_cached_stats"] = cache.stats()
+
+    # Mixed workload over a minute's worth of traffic
+    random.seed(0)
+    mixed = [(random.choice(SYMBOLS), random.choice(REQUESTS)) for _ in range(args.requests)]
+    provider = FakeMarketProvider(latency)
+    cache = MarketDataCache(provider, max_bytes=args.budget_kb * 1024)
+    results["mixed_cached"] = run(lambda s, kw: cache.history(s, **kw), mixed, args.workers)
+    results["mixed_upstream_calls"] = provider.calls
+    results["mixed_stats"] = cache.stats()
+    report("market_cache", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--budget-kb", type=int, default=256)
+    main(parser.parse_args())
@@ -0,0 +1,60 @@
+"""Per-query latency and RSS: re-reading the CSV per call vs. the shared MarketDataStore.
+
+    python benchmarks/bench_market_data.py --symbols 200 --days 2520
+"""
+import argparse
+import os
+import random
+import resource
+import tempfile
+import pandas as pd
+from common import report, summarize, timeit
+from datagen import write_price_csv
+
+from utils.market_data import MarketDataStore
+
+def rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def reread_lookup(path, symbol, date_str):
+    # The pre-store path used by fetch_historical_data / KnowledgeAgent
+    df = pd.read_csv(path)
+    df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%m/%d/%Y')
+    rows = df[(df['Symbol'] == symbol) & (df['Date'] == date_str)]
+    return rows['Open'].iloc[0] if not rows.empty else None
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_price_csv(os.path.join(tmp, "prices.csv"), args.symbols, args.days)
+        frame = pd.read_csv(path, usecols=['Date', 'Symbol'])
+        probes = frame.sample(args.queries, random_state=1, replace=True)[['Symbol', 'Date']].values.tolist()
+        random.seed(1)
+
+        rss_before = rss_mb()
+        store = MarketDataStore(path)
+        load = timeit(store.data, repeat=1)
+        rss_store = rss_mb() - rss_before
+
+        point = timeit(lambda: store.get_row(*random.choice(probes)), repeat=args.queries)
+        window = timeit(lambda: store.get_range(random.choice(probes)[0], "01/01/2006", "12/31/2006"), repeat=args.queries)
+
+        rss_before = rss_mb()
+        reread = timeit(lambda: reread_lookup(path, *random.choice(probes)), repeat=max(3, args.queries // 100))
+        rss_reread = rss_mb() - rss_before
+
+        report(f"market_data[{args.symbols} symbols x {args.days} days]", {
+            "store_initial_load": summarize(load),
+            "store_point_lookup": summarize(point),
+            "store_range_lookup": summarize(window),
+            "reread_per_call": summarize(reread),
+            "rss_growth_store_mb": rss_store,
+            "rss_growth_reread_mb": rss_reread,
+        })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--queries", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,70 @@
+"""Load generator for the MCP stdio transport.
+
+Compares the old one-request-at-a-time round-trip ("stdio baseline") with
+pipelined requests multiplexed over the same persistent connection.
+
+    python benchmarks/bench_mcp_transport.py --requests 500 --latency-ms 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from common import APP_DIR, report, summarize
+
+from agents.mcp_client import MCPClient
+
+# Serves the real tool registry plus a tool with a fixed blocking latency, standing in for yfinance
+SERVER_SNIPPET = """
+import asyncio, sys, time
+sys.path.insert(0, {agents_dir!r})
+from mcp_server import app
+async def bench_sleep(params):
+    time.sleep(params.get("latency_ms", 0) / 1000.0)
+    return {{"result": "ok"}}
+app.register_tool("bench_sleep", "Simulated blocking tool", bench_sleep)
+asyncio.run(app.run())
+"""
+
+async def run_load(client, method, params, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await client.send(method, params)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    stats = summarize(latencies)
+    stats["req_per_s"] = total / elapsed
+    return stats
+
+async def main(args):
+    command = [sys.executable, "-c", SERVER_SNIPPET.format(agents_dir=os.path.join(APP_DIR, "agents"))]
+    env_workers = str(args.workers)
+    os.environ["MCP_MAX_WORKERS"] = env_workers
+    client = MCPClient(command=command)
+    client.start()
+    await client.send("ping", {})
+    method, params = args.method, {"latency_ms": args.latency_ms}
+    if method != "bench_sleep":
+        params = {"market": args.symbol, "symbol": args.symbol}
+    results = {"stdio_baseline_sequential": await run_load(client, method, params, args.requests, 1)}
+    for concurrency in args.concurrency:
+        results[f"pipelined_c{concurrency}"] = await run_load(client, method, params, args.requests, concurrency)
+    client.close()
+    report(f"mcp_transport[{method}, workers={env_workers}]", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--method", default="bench_sleep")
+    parser.add_argument("--symbol", default="NVDA")
+    asyncio.run(main(parser.parse_args()))
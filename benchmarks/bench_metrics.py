@@ -0,0 +1,80 @@
+"""Instrumentation overhead, and the per-stage breakdown it produces for a stubbed pipeline run.
+
+Times an empty block bare, inside a disabled span and inside an enabled span,
+then sends a batch of queries through ReasoningStockTeam with stubbed Groq and
+DB backends and prints the resulting histograms.
+
+    python benchmarks/bench_metrics.py --iterations 1000000 --queries 50 --llm-ms 50
+"""
+import argparse
+import os
+import time
+from common import report
+from fakes import FakeAsyncGroq, install_fake_db
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+os.environ.setdefault("LLM_CACHE", "off")
+fake_db = install_fake_db()
+
+from agents.coordinator_team import ReasoningStockTeam
+from agents.registry import AgentRegistry
+from utils.aio import run_sync
+from utils.metrics import Metrics, set_metrics, span
+
+class StubKnowledgeAgent:
+    """KnowledgeAgent stand-in that declines general questions after a blocking delay."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def query_knowledge(self, query, session_id=None, stream=False, csv_lookup=False):
+        time.sleep(self.latency)
+        return None
+
+def per_call_ns(func, iterations):
+    start = time.perf_counter()
+    func(iterations)
+    return (time.perf_counter() - start) * 1e9 / iterations
+
+def bare(n):
+    for _ in range(n):
+        pass
+
+def spanned(n):
+    for _ in range(n):
+        with span("bench", stage="noop"):
+            pass
+
+def overhead(iterations):
+    results = {"bare_ns": per_call_ns(bare, iterations)}
+    set_metrics(Metrics(enabled=False))
+    results["span_disabled_ns"] = per_call_ns(spanned, iterations)
+    set_metrics(Metrics(enabled=True))
+    results["span_enabled_ns"] = per_call_ns(spanned, iterations)
+    return results
+
+def pipeline(queries, llm_latency):
+    metrics = set_metrics(Metrics(enabled=True))
+    team = ReasoningStockTeam()
+    team.agents = AgentRegistry({
+        "knowledge": lambda: StubKnowledgeAgent(llm_latency / 2),
+        "groq_client": lambda: FakeAsyncGroq(llm_latency, llm_latency / 50, tokens=50),
+    })
+    for i in range(queries):
+        run_sync(team.process_query(f"Who founded company {i}?", None, f"s{i % 5}"))
+    results = {}
+    for row in metrics.to_json():
+        label = row["name"] + "".join(f"[{k}={v}]" for k, v in row["tags"].items())
+        results[label] = {k: row[k] for k in ("count", "errors", "p50_ms", "p99_ms")}
+    return results
+
+def main(args):
+    report(f"metrics_overhead[{args.iterations} spans]", overhead(args.iterations))
+    report(f"metrics_pipeline[{args.queries} queries]", pipeline(args.queries, args.llm_ms / 1000.0))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--llm-ms", type=float, default=50.0)
+    main(parser.parse_args())
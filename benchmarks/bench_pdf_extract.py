@@ -0,0 +1,46 @@
+"""PDF page extraction: sequential vs. process pool (cold) vs. on-disk page cache (warm).
+
+    python benchmarks/bench_pdf_extract.py --pages 300
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from common import report
+from datagen import write_text_pdf
+
+from utils import pdf_extract
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        data = open(write_text_pdf(os.path.join(tmp, "report.pdf"), args.pages), "rb").read()
+        cache_dir = os.path.join(tmp, "pages")
+        digest = hashlib.sha256(data).hexdigest()
+
+        sequential, sequential_ms = timed(lambda: pdf_extract.extract_pages(data, workers=1))
+        # Start the pool outside the measurement; in the app it lives for the whole process
+        pdf_extract.extract_pages(data, workers=args.workers)
+        parallel, parallel_ms = timed(lambda: pdf_extract.extract_pages(data, workers=args.workers))
+        assert parallel == sequential, "page order must be preserved"
+        _, cold_ms = timed(lambda: pdf_extract.get_pages(data, cache_dir=cache_dir, workers=args.workers))
+        warm, warm_ms = timed(lambda: pdf_extract.get_pages(data, digest=digest, cache_dir=cache_dir))
+        assert warm == sequential
+
+        report(f"pdf_extract[{args.pages} pages, {args.workers} workers]", {
+            "sequential_ms": sequential_ms,
+            "parallel_ms": parallel_ms,
+            "cold_get_pages_ms": cold_ms,
+            "warm_get_pages_ms": warm_ms,
+        })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=pdf_extract.MAX_WORKERS)
+    main(parser.parse_args())
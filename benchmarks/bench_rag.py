@@ -0,0 +1,55 @@
+"""RAG prompt construction: whole-document stuffing vs. chunked BM25 retrieval.
+
+Reports ingest time, per-query latency and prompt size (tokens estimated as
+characters / 4) on generated PDFs.
+
+    python benchmarks/bench_rag.py --pages 10 50 100 500
+"""
+import argparse
+import os
+import tempfile
+import time
+from common import report, summarize, timeit
+from datagen import write_text_pdf
+
+from utils import rag, pdf_extract
+
+QUERIES = ["What is the revenue guidance?", "dividend and cash flow", "datacenter segment growth",
+           "risk factor for supply", "board director acquisition"]
+
+def estimate_tokens(text):
+    return len(text) // 4
+
+def main(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the on-disk page cache out of the way so ingest is measured cold
+        pdf_extract.PAGE_CACHE_DIR = os.path.join(tmp, "pages")
+        for pages in args.pages:
+            path = write_text_pdf(os.path.join(tmp, f"doc_{pages}.pdf"), pages)
+            data = open(path, "rb").read()
+
+            start = time.perf_counter()
+            full_text = "".join(pdf_extract.extract_pages(data, workers=1))
+            extract = time.perf_counter() - start
+            stuffed_prompt = f"Based on the following PDF content, answer the query:\n\n{full_text}\n\nQuery: {QUERIES[0]}"
+
+            start = time.perf_counter()
+            index = rag.build_index(data)
+            ingest = time.perf_counter() - start
+
+            queries = iter(QUERIES * 40)
+            search = timeit(lambda: index.search(next(queries)), repeat=len(QUERIES) * 40)
+            excerpts = "\n\n".join(f"[Page {p}] {t}" for p, t, _ in index.search(QUERIES[0]))
+            chunked_prompt = f"Based on the following excerpts from the PDF, answer the query:\n\n{excerpts}\n\nQuery: {QUERIES[0]}"
+
+            results[f"{pages}p_stuffed"] = {"extract_per_query_ms": extract * 1000, "prompt_tokens": estimate_tokens(stuffed_prompt)}
+            results[f"{pages}p_chunked"] = {"ingest_once_ms": ingest * 1000, "chunks": len(index),
+                                            "prompt_tokens": estimate_tokens(chunked_prompt)}
+            results[f"{pages}p_search"] = summarize(search)
+    report("rag_retrieval", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 100, 500])
+    main(parser.parse_args())
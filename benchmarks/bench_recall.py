@@ -0,0 +1,105 @@
+"""Recall questions through ReasoningStockTeam: MemoryAgent on every question vs. the retrieval-first path.
+
+Each session is seeded with a scripted conversation about a few stocks and
+dates, then asked a fixed set of recall questions. Most of them ("which stocks
+did I ask about earlier?") can be answered from the recall index; the
+summarising ones still need the model. The baseline disables the index, so
+every question goes to MemoryAgent as before. MemoryAgent is a FakeAgent with
+a first-token delay and a token rate; chat history is SQLite.
+
+    python benchmarks/bench_recall.py --sessions 20 --turns 30 --llm-ms 400
+"""
+import argparse
+import os
+import random
+import time
+from common import report, summarize
+from fakes import FakeAgent, FakeAsyncGroq, SQLiteChatDB, install_fake_db
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+os.environ.setdefault("LLM_CACHE", "off")
+db = install_fake_db(SQLiteChatDB())
+
+from agents.coordinator_team import ReasoningStockTeam
+from agents.memory_agent import MemoryAgent
+from agents.registry import AgentRegistry
+from utils.aio import run_sync
+
+COMPANIES = ["NVDA", "Tesla", "AAPL", "Microsoft", "AMZN", "Google", "Intel"]
+TEMPLATES = [
+    "What is the price of {c}?",
+    "Show historical data for {c} over the last 3 months",
+    "Predict {c} stock price in 5 days",
+    "What was the opening price of {c} on March 15, 2024?",
+    "Who is the CEO of {c}?",
+]
+RECALL_QUESTIONS = [
+    "Which stocks did I ask about earlier?",
+    "What was my last question?",
+    "What were my last 3 questions?",
+    "Did I ask about Tesla earlier?",
+    "Did I previously ask about Intel?",
+    "What dates did I ask about earlier?",
+    "What did you say about the NVDA price earlier?",
+    "Summarize everything we discussed earlier",
+    "Based on my previous questions, which stock looks most volatile?",
+]
+
+class StubKnowledgeAgent:
+    def query_knowledge(self, query, session_id=None, stream=False, csv_lookup=False):
+        return None
+
+def seed(sessions, turns, seed=0):
+    rng = random.Random(seed)
+    for s in range(sessions):
+        for _ in range(turns):
+            query = rng.choice(TEMPLATES).format(c=rng.choice(COMPANIES))
+            db.save_chat(query, f"Answer to: {query}\n\n*Response by GeneralAgent*", "GeneralAgent", f"session-{s}")
+
+def make_team(llm):
+    team = ReasoningStockTeam()
+    memory = MemoryAgent()
+    memory.agent = FakeAgent("MemoryAgent", *llm)
+    team.agents = AgentRegistry({
+        "memory": lambda: memory,
+        "knowledge": StubKnowledgeAgent,
+        "groq_client": lambda: FakeAsyncGroq(*llm),
+    })
+    return team, memory.agent
+
+def run(sessions, llm, retrieval):
+    team, memory = make_team(llm)
+    if not retrieval:
+        async def no_recall(session_id):
+            return None
+        team.load_recall = no_recall
+    latencies, agents = [], {}
+    for s in range(sessions):
+        for question in RECALL_QUESTIONS:
+            start = time.perf_counter()
+            _, agent_name = run_sync(team.process_query(question, None, f"session-{s}"))
+            latencies.append(time.perf_counter() - start)
+            agents[agent_name] = agents.get(agent_name, 0) + 1
+    stats = summarize(latencies)
+    return {"p50_ms": stats["p50_ms"], "p99_ms": stats["p99_ms"], "mean_ms": stats["mean_ms"],
+            "memory_llm_calls": memory.calls, "agents": agents}
+
+def main(args):
+    seed(args.sessions, args.turns)
+    llm = (args.llm_ms / 1000.0, args.token_ms / 1000.0, args.tokens)
+    baseline = run(args.sessions, llm, retrieval=False)
+    retrieval = run(args.sessions, llm, retrieval=True)
+    report(f"recall[{args.sessions} sessions x {len(RECALL_QUESTIONS)} questions, {args.turns} turns each]", {
+        "memory_agent_only": baseline,
+        "retrieval_first": retrieval,
+        "llm_calls_saved": baseline["memory_llm_calls"] - retrieval["memory_llm_calls"],
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--llm-ms", type=float, default=400.0, help="time to first token")
+    parser.add_argument("--token-ms", type=float, default=10.0)
+    parser.add_argument("--tokens", type=int, default=60)
+    main(parser.parse_args())
@@ -0,0 +1,100 @@
+"""Local intent router: accuracy on a labeled query set, routing latency, LLM calls avoided.
+
+LLM calls are counted per routing decision: a KnowledgeAgent run with
+YFinanceTools is two calls (tool selection, then the answer); the memory,
+RAG and fallback agents are one call each; MCP tools and CSV lookups are none.
+Open-price queries are run through KnowledgeAgent.query_knowledge (CSV in
+app/data, agent replaced by a counting fake), so they count as CSV lookups
+only when they are actually answered from the CSV.
+
+    python benchmarks/bench_router.py
+"""
+import csv
+import os
+import time
+from common import ROOT, report, summarize
+from fakes import FakeAgent, install_fake_db
+
+install_fake_db()
+
+from agents import router
+from agents.knowledge_agent import KnowledgeAgent
+from agents.router import IntentRouter
+
+QUERIES = os.path.join(ROOT, "benchmarks", "data", "intent_queries.csv")
+
+def legacy_llm_calls(query, has_file):
+    """LLM calls made by the substring chain process_query used before the router."""
+    q = query.lower()
+    if any(k in q for k in ['earlier', 'previous', 'history']):
+        return 1
+    if any(k in q for k in ['ceo', 'capital', 'president', 'news']):
+        return 1
+    if 'market open price' in q:
+        return 0
+    return 2
+
+def open_price_llm_calls(knowledge, query, has_file):
+    """LLM calls for a query routed as open_price: none if the CSV path answers it."""
+    before = knowledge.agent.calls
+    answer = knowledge.query_knowledge(query, csv_lookup=True)
+    if answer is None:
+        # Declined by the KnowledgeAgent; the escalated chain answers it
+        return legacy_llm_calls(query, has_file)
+    return 2 if knowledge.agent.calls > before else 0
+
+def routed_llm_calls(intent, query, has_file, confident, knowledge):
+    if not confident:
+        return legacy_llm_calls(query, has_file)
+    if intent.name in (router.MEMORY, router.PDF, router.GENERAL):
+        return 1
+    if intent.name == router.OPEN_PRICE:
+        return open_price_llm_calls(knowledge, query, has_file)
+    return 0
+
+def main():
+    rows = list(csv.DictReader(open(QUERIES)))
+    route = IntentRouter()
+    knowledge = KnowledgeAgent()
+    knowledge.agent = FakeAgent("KnowledgeAgent", latency=0)
+    correct = confident_correct = confident = 0
+    symbol_checked = symbol_correct = 0
+    legacy_calls = routed_calls = 0
+    for row in rows:
+        has_file = row["has_file"] == "1"
+        intent = route.route(row["query"], has_file=has_file)
+        is_confident = route.is_confident(intent)
+        correct += intent.name == row["intent"]
+        confident += is_confident
+        confident_correct += is_confident and intent.name == row["intent"]
+        if row["symbol"]:
+            symbol_checked += 1
+            symbol_correct += intent.params.get("symbol") == row["symbol"]
+        legacy_calls += legacy_llm_calls(row["query"], has_file)
+        routed_calls += routed_llm_calls(intent, row["query"], has_file, is_confident, knowledge)
+
+    samples = []
+    for _ in range(50):
+        for row in rows:
+            start = time.perf_counter()
+            route.route(row["query"], has_file=row["has_file"] == "1")
+            samples.append(time.perf_counter() - start)
+    latency = summarize(samples)
+    latency["p99_us"] = latency.pop("p99_ms") * 1000
+    latency["p50_us"] = latency.pop("p50_ms") * 1000
+    latency.pop("mean_ms")
+
+    report("intent_router", {
+        "queries": len(rows),
+        "accuracy": correct / len(rows),
+        "confident_share": confident / len(rows),
+        "confident_precision": confident_correct / max(confident, 1),
+        "symbol_accuracy": symbol_correct / max(symbol_checked, 1),
+        "llm_calls_legacy": legacy_calls,
+        "llm_calls_routed": routed_calls,
+        "llm_calls_avoided": legacy_calls - routed_calls,
+        "route_latency": latency,
+    })
+
+if __name__ == "__main__":
+    main()
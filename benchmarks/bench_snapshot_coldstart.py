@@ -0,0 +1,55 @@
+"""Cold start of the market data store: parsing the CSV vs. memory-mapping a snapshot.
+
+Each measurement runs in a fresh interpreter so nothing is cached in-process.
+
+    python benchmarks/bench_snapshot_coldstart.py --sizes 10x2520 100x2520 1000x5040
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from common import APP_DIR, report
+from datagen import write_price_csv
+
+from utils.market_data import compile_snapshot
+
+PROBE = """
+import json, sys, time, resource
+sys.path.insert(0, {app_dir!r})
+start = time.perf_counter()
+from utils.market_data import MarketDataStore
+store = MarketDataStore({path!r}, snapshot_dir={snapshot_dir!r})
+store.data()
+loaded = time.perf_counter()
+store.get_range(store.symbols()[-1], '01/01/2006', '12/31/2006')
+done = time.perf_counter()
+print(json.dumps({{"load_ms": (loaded - start) * 1000, "first_query_ms": (done - loaded) * 1000,
+                  "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+def cold_start(path, snapshot_dir):
+    code = PROBE.format(app_dir=APP_DIR, path=path, snapshot_dir=snapshot_dir)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            n_symbols, n_days = (int(x) for x in size.split("x"))
+            path = write_price_csv(os.path.join(tmp, f"prices_{size}.csv"), n_symbols, n_days)
+            # A snapshot dir that does not exist forces the CSV fallback
+            results[f"{size}_csv"] = cold_start(path, os.path.join(tmp, "missing.snapshot"))
+            snapshot_dir = compile_snapshot(path, os.path.join(tmp, f"prices_{size}.snapshot"))
+            results[f"{size}_snapshot"] = cold_start(path, snapshot_dir)
+            results[f"{size}_csv_bytes"] = os.path.getsize(path)
+            results[f"{size}_snapshot_bytes"] = sum(
+                os.path.getsize(os.path.join(snapshot_dir, f)) for f in os.listdir(snapshot_dir))
+    report("snapshot_coldstart", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["10x2520", "100x2520", "500x5040"])
+    main(parser.parse_args())
@@ -0,0 +1,82 @@
+"""Time to first token and total time per answer, blocking vs. streamed, with a stubbed Groq client.
+
+General questions go through ReasoningStockTeam to the fallback model, which
+answers word by word after a first-token delay. The blocking run is what the UI
+showed before: nothing until process_query returned. The streamed run reads
+process_query_stream the way main.py does, through iterate_sync from a
+non-loop thread.
+
+    python benchmarks/bench_streaming.py --queries 20 --first-token-ms 400 --token-ms 20 --tokens 200
+"""
+import argparse
+import os
+import time
+from common import report, summarize
+from fakes import FakeAsyncGroq, install_fake_db
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+# Every question is distinct anyway; keep cache hits out of the measurement
+os.environ.setdefault("LLM_CACHE", "off")
+install_fake_db()
+
+from agents.coordinator_team import ReasoningStockTeam
+from agents.registry import AgentRegistry
+from utils.aio import iterate_sync, run_sync
+
+class StubKnowledgeAgent:
+    """KnowledgeAgent stand-in that declines general questions."""
+
+    def query_knowledge(self, query, session_id=None, stream=False, csv_lookup=False):
+        return None
+
+def make_team(first_token, token_latency, tokens):
+    groq = FakeAsyncGroq(first_token, token_latency, tokens)
+    team = ReasoningStockTeam()
+    team.agents = AgentRegistry({
+        "knowledge": StubKnowledgeAgent,
+        "groq_client": lambda: groq,
+    })
+    return team
+
+def blocking(team, query):
+    start = time.perf_counter()
+    run_sync(team.process_query(query, None))
+    total = time.perf_counter() - start
+    return total, total
+
+def streamed(team, query):
+    start = time.perf_counter()
+    first = None
+    _, chunks = run_sync(team.process_query_stream(query, None))
+    for _ in iterate_sync(chunks):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+def measure(team, func, queries, label):
+    firsts, totals = [], []
+    for i in range(queries):
+        first, total = func(team, f"Explain topic {label} {i} in detail")
+        firsts.append(first)
+        totals.append(total)
+    ttft = summarize(firsts)
+    return {
+        "ttft_p50_ms": ttft["p50_ms"],
+        "ttft_p99_ms": ttft["p99_ms"],
+        "total_p50_ms": summarize(totals)["p50_ms"],
+    }
+
+def main(args):
+    team = make_team(args.first_token_ms / 1000.0, args.token_ms / 1000.0, args.tokens)
+    report(f"streaming[{args.tokens} tokens, {args.token_ms}ms/token]", {
+        "blocking": measure(team, blocking, args.queries, "blocking"),
+        "streamed": measure(team, streamed, args.queries, "streamed"),
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=400.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    parser.add_argument("--tokens", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,83 @@
+"""Symbol resolution for infer_context: the old per-company substring loop vs. the Aho-Corasick resolver.
+
+Each lookup resolves a follow-up query against ten turns of history whose newest
+turn names the company, over synthetic universes of increasing size.
+
+    python benchmarks/bench_symbols.py --sizes 7 1000 20000 50000
+"""
+import argparse
+import random
+import time
+from common import report
+from datagen import make_company_universe
+
+from utils.symbols import SessionSymbolCache, SymbolResolver
+
+FILLER = [
+    "what did i ask earlier", "explain the term dividend yield", "who is the ceo of the company",
+    "summarize the uploaded report", "what is a market order", "how do earnings calls work",
+]
+
+def legacy_infer(query, chat_history, symbol_map):
+    """infer_context before the resolver: names only, history oldest first, query ignored."""
+    for entry in reversed(chat_history):
+        query_text = entry['user_query'].lower()
+        for company, symbol in symbol_map.items():
+            if company in query_text:
+                return symbol
+    return None
+
+def resolver_infer(query, chat_history, resolver):
+    symbol = resolver.resolve(query)
+    if symbol is None:
+        for entry in chat_history:
+            symbol = resolver.resolve(entry['user_query'])
+            if symbol:
+                break
+    return symbol
+
+def per_call_us(func, calls):
+    start = time.perf_counter()
+    for args in calls:
+        func(*args)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+def main(args):
+    rng = random.Random(0)
+    results = {}
+    for size in args.sizes:
+        universe = make_company_universe(size)
+        symbol_map = {name: symbol for symbol, names in universe.items() for name in names}
+        start = time.perf_counter()
+        resolver = SymbolResolver(universe)
+        build_ms = (time.perf_counter() - start) * 1000
+        companies = list(symbol_map.items())
+        calls, expected = [], []
+        for _ in range(args.lookups):
+            name, symbol = rng.choice(companies)
+            history = [{"user_query": f"What is the price of {name} today?"}] + [{"user_query": rng.choice(FILLER)} for _ in range(9)]
+            calls.append(("and predict it for next week", history))
+            expected.append(symbol)
+        legacy_calls = calls[:max(1, args.lookups // 10)] if size > 1000 else calls
+        legacy_us = per_call_us(lambda q, h: legacy_infer(q, h, symbol_map), legacy_calls)
+        resolver_us = per_call_us(lambda q, h: resolver_infer(q, h, resolver), calls)
+        cache = SessionSymbolCache()
+        for i, symbol in enumerate(expected):
+            cache.remember(i, symbol)
+        cached_us = per_call_us(cache.get, [(i,) for i in range(len(expected))])
+        correct = sum(resolver_infer(q, h, resolver) == s for (q, h), s in zip(calls, expected))
+        results[f"names_{len(symbol_map)}"] = {
+            "build_ms": build_ms,
+            "legacy_us": legacy_us,
+            "resolver_us": resolver_us,
+            "session_cached_us": cached_us,
+            "speedup": legacy_us / resolver_us,
+            "resolver_accuracy": correct / len(calls),
+        }
+    report("symbol_resolution", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7, 1000, 20000, 50000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,37 @@
+"""Startup cost of the agent team: rebuilt per Streamlit rerun vs. the process-wide registry.
+
+Run from the repository root: python benchmarks/bench_team_startup.py
+"""
+import os
+import time
+from common import report, summarize, timeit
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+
+from agents.coordinator_team import ReasoningStockTeam
+from agents import registry
+
+def eager_build():
+    # What every rerun paid before: the team plus all three member agents and the Team object
+    team = ReasoningStockTeam()
+    team.memory_agent, team.knowledge_agent, team.rag_agent, team.groq_client, team.team
+    return team
+
+def main(reruns=20):
+    start = time.perf_counter()
+    registry.get_team()
+    first_call = time.perf_counter() - start
+
+    start = time.perf_counter()
+    registry.get_team().knowledge_agent
+    first_knowledge = time.perf_counter() - start
+
+    report("team_startup", {
+        "rebuild_per_rerun": summarize(timeit(eager_build, repeat=reruns)),
+        "registry_first_call_ms": first_call * 1000,
+        "registry_first_knowledge_query_ms": first_knowledge * 1000,
+        "registry_per_rerun": summarize(timeit(registry.get_team, repeat=reruns)),
+    })
+
+if __name__ == "__main__":
+    main()
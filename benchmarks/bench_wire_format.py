@@ -0,0 +1,87 @@
+"""fetch_historical_data payload size and round-trip time: per-day row dicts vs. the columnar formats.
+
+For each range length the tool is called over the MCP stdio transport (the
+offline server on a synthetic CSV) and the reply is decoded into NumPy
+arrays, as the coordinator does. "rows" is the original list of
+{'Date', 'Open', 'Close'} dicts; "columns" and "packed" are utils.bars
+encodings of the same bars; "weekly"/"monthly" add server-side downsampling
+and a summary.
+
+    python benchmarks/bench_wire_format.py --years 1 5 20 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from common import report, summarize
+from datagen import write_price_csv
+
+from agents.mcp_client import MCPClient
+from utils import bars
+from utils.aio import run_sync
+
+OFFLINE_MCP_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "offline_mcp_server.py")
+BUSINESS_DAYS = 261
+VARIANTS = {
+    "rows": {},
+    "columns": {"format": "columns"},
+    "packed": {"format": "packed"},
+    "weekly_packed": {"format": "packed", "interval": "1wk", "summary": True},
+    "monthly_packed": {"format": "packed", "interval": "1mo", "summary": True},
+}
+
+def to_numpy(result):
+    if isinstance(result, list):
+        return {
+            "Date": np.array([np.datetime64(f"{d['Date'][6:]}-{d['Date'][:2]}-{d['Date'][3:5]}") for d in result]),
+            "Open": np.array([d["Open"] for d in result]),
+            "Close": np.array([d["Close"] for d in result]),
+        }
+    return bars.decode(result["data"], result["format"])
+
+async def measure(client, symbol, start, end, options, repeat):
+    params = {"market": symbol, "start": start, "end": end, **options}
+    # The raw reply as sent by the server, for its size
+    raw = await asyncio.wrap_future(client.request("fetch_historical_data", params))
+    size = len(json.dumps(raw).encode("utf-8"))
+    samples = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        series = to_numpy(await client.send("fetch_historical_data", params))
+        samples.append(time.perf_counter() - begin)
+    stats = summarize(samples)
+    return {"bytes": size, "bars": len(series["Date"]), "p50_ms": stats["p50_ms"], "p99_ms": stats["p99_ms"]}
+
+async def run(client, years, repeat):
+    results = {}
+    for n in years:
+        # The synthetic series starts on 01/03/2005
+        start, end = "01/01/2005", f"12/31/{2004 + n}"
+        rows = None
+        for label, options in VARIANTS.items():
+            stats = await measure(client, "AAA", start, end, options, repeat)
+            if rows is None:
+                rows = stats
+            stats["bytes_vs_rows"] = stats["bytes"] / rows["bytes"]
+            results[f"{n}y {label}"] = stats
+    return results
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_price_csv(os.path.join(tmp, "prices.csv"), 1, max(args.years) * BUSINESS_DAYS)
+        client = MCPClient(command=[sys.executable, OFFLINE_MCP_SERVER, csv_path, "0"])
+        try:
+            results = run_sync(run(client, args.years, args.repeat))
+        finally:
+            client.close()
+    report(f"wire_format[repeat {args.repeat}]", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import time
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "app")
+
+# The app imports its modules as `agents.*` / `utils.*`, relative to app/
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+def summarize(samples):
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+def timeit(func, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def report(name, results):
+    print(f"== {name} ==")
+    for label, stats in results.items():
+        if isinstance(stats, dict):
+            fields = ", ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items())
+            print(f"  {label}: {fields}")
+        else:
+            print(f"  {label}: {stats}")
+    out = os.getenv("BENCH_JSON")
+    if out:
+        with open(out, "a") as f:
+            f.write(json.dumps({"benchmark": name, "results": results}) + "\n")
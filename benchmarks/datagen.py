@@ -0,0 +1,140 @@
+import os
+import numpy as np
+import pandas as pd
+
+def make_symbols(count):
+    """Deterministic ticker-like names: AAA, AAB, ..."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    symbols = []
+    for i in range(count):
+        name = ""
+        n = i
+        for _ in range(3):
+            name = letters[n % 26] + name
+            n //= 26
+        symbols.append(name)
+    return symbols
+
+SYLLABLES = "ka lo mi ren tor vex qua dyn zen pho lux cor mar tel vis gen bio syn nex tri".split()
+SUFFIXES = ["holdings", "group", "systems", "industries", "labs"]
+
+def make_company_universe(count):
+    """Deterministic {symbol: {name, alias}} for a synthetic universe of `count` companies."""
+    universe = {}
+    for i in range(count):
+        symbol, n = "", i
+        for _ in range(4):
+            symbol = chr(65 + n % 26) + symbol
+            n //= 26
+        parts, n = [], i
+        for _ in range(5):
+            parts.append(SYLLABLES[n % len(SYLLABLES)])
+            n //= len(SYLLABLES)
+        alias = "".join(parts)
+        universe["Q" + symbol] = {alias, f"{alias} {SUFFIXES[i % len(SUFFIXES)]}"}
+    return universe
+
+def make_price_frame(n_symbols=10, n_days=252, start="2005-01-03", seed=0):
+    """Synthetic daily OHLCV bars (business days) for n_symbols, in the app's CSV layout."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_days)
+    frames = []
+    for symbol in make_symbols(n_symbols):
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+        open_ = close * (1 + rng.normal(0, 0.005, n_days))
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n_days))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n_days))
+        volume = rng.integers(100_000, 5_000_000, n_days)
+        frames.append(pd.DataFrame({
+            "Date": dates.strftime("%-m/%-d/%Y"),
+            "Symbol": symbol,
+            "Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def write_price_csv(path, n_symbols=10, n_days=252, seed=0):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    make_price_frame(n_symbols, n_days, seed=seed).to_csv(path, index=False)
+    return path
+
+WORDS = (
+    "revenue margin guidance quarter fiscal growth earnings share dividend cash flow operating "
+    "segment datacenter gaming automotive inventory supply demand outlook risk factor capital "
+    "expenditure debt liquidity acquisition market competition customer product research "
+    "development headcount tax rate gross net income expense forecast board director"
+).split()
+
+def make_text(n_words, rng):
+    return " ".join(rng.choice(WORDS, n_words))
+
+def write_text_pdf(path, n_pages, words_per_page=350, seed=0):
+    """Write a minimal multi-page text PDF (Helvetica, no external dependencies)."""
+    rng = np.random.default_rng(seed)
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # filled in once the page ids are known
+    page_ids = []
+    for page in range(n_pages):
+        words = make_text(words_per_page, rng).split()
+        words[:3] = ["Page", str(page + 1), "section"]
+        lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        for line in lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({escaped}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content, font)))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+# name: (symbols, trading days, PDF pages)
+SIZES = {
+    "small": (10, 252, 10),
+    "medium": (100, 252 * 10, 100),
+    "large": (1000, 252 * 20, 500),
+}
+
+def generate(out_dir, sizes=tuple(SIZES)):
+    """Write prices-<size>.csv and report-<size>.pdf for each named size; returns {size: (csv, pdf)}."""
+    paths = {}
+    for size in sizes:
+        n_symbols, n_days, n_pages = SIZES[size]
+        paths[size] = (
+            write_price_csv(os.path.join(out_dir, f"prices-{size}.csv"), n_symbols, n_days),
+            write_text_pdf(os.path.join(out_dir, f"report-{size}.pdf"), n_pages),
+        )
+    return paths
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Write synthetic price CSVs and text PDFs at the named sizes.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--sizes", default=",".join(SIZES), help=f"comma-separated subset of {', '.join(SIZES)}")
+    args = parser.parse_args()
+    for size, (csv_path, pdf_path) in generate(args.out_dir, args.sizes.split(",")).items():
+        print(f"{size}: {csv_path} ({os.path.getsize(csv_path) / 1e6:.1f} MB), {pdf_path} ({os.path.getsize(pdf_path) / 1e6:.1f} MB)")
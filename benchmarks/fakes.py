@@ -0,0 +1,216 @@
+"""Deterministic local stand-ins for upstream services used by the benchmarks."""
+import asyncio
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+import numpy as np
+
+class FakeMarketProvider:
+    """Serves synthetic daily OHLC bars like yfinance's Ticker.history, with a fixed latency."""
+
+    PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260}
+
+    def __init__(self, latency=0.05, end="2025-06-30"):
+        # pandas is imported here rather than with the module, so cold-start probes can use the fake DBs without it
+        import pandas as pd
+        self.latency = latency
+        self.end = pd.Timestamp(end)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _bars(self, symbol, index):
+        import pandas as pd
+        seed = sum(map(ord, symbol))
+        rng = np.random.default_rng(seed)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+        return pd.DataFrame({
+            "Open": close * 0.995, "High": close * 1.01, "Low": close * 0.99,
+            "Close": close, "Volume": rng.integers(1_000_000, 5_000_000, len(index)),
+        }, index=pd.DatetimeIndex(index, name="Date"))
+
+    def _index(self, period, start, end):
+        import pandas as pd
+        if start is not None or end is not None:
+            return pd.bdate_range(start or self.end - pd.Timedelta(days=30), (pd.Timestamp(end) if end is not None else self.end) - pd.Timedelta(days=1))
+        return pd.bdate_range(end=self.end, periods=self.PERIOD_DAYS.get(period or "1mo", 21))
+
+    def _request(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+
+    def history(self, symbol, period=None, interval="1d", start=None, end=None):
+        self._request()
+        index = self._index(period, start, end)
+        if symbol.startswith("XYZ"):
+            return self._bars(symbol, index[:0])
+        return self._bars(symbol, index)
+
+    def download(self, symbols, period=None, interval="1d", start=None, end=None):
+        """Like YFinanceProvider.download: every symbol in one request, same latency as one history call."""
+        self._request()
+        index = self._index(period, start, end)
+        return {symbol: self._bars(symbol, index[:0] if symbol.startswith("XYZ") else index) for symbol in symbols}
+
+class FakeGroq:
+    """Mimics Groq.chat.completions.create with a fixed latency; counts calls.
+
+    With stream=True the answer arrives word by word: latency is the time to the
+    first token and token_latency the delay before each following one. With
+    `tokens` set, every answer is that many words long.
+    """
+
+    def __init__(self, latency=0.5, token_latency=0.0, tokens=None):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.tokens = tokens
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _answer(self, messages):
+        with self._lock:
+            self.calls += 1
+        answer = f"stub answer to: {messages[-1]['content']}"
+        if self.tokens:
+            # Exactly `tokens` words, however long the prompt being echoed
+            words = answer.split()
+            answer = " ".join((words + ["lorem"] * self.tokens)[:self.tokens])
+        return answer
+
+    def _response(self, messages):
+        message = SimpleNamespace(content=self._answer(messages))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    @staticmethod
+    def _chunk(text):
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    def _tokens(self, answer):
+        words = answer.split(" ")
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    def _stream(self, messages):
+        for i, token in enumerate(self._tokens(self._answer(messages))):
+            if i:
+                time.sleep(self.token_latency)
+            yield self._chunk(token)
+
+    def create(self, model, messages, stream=False, **kwargs):
+        time.sleep(self.latency)
+        return self._stream(messages) if stream else self._response(messages)
+
+class FakeAsyncGroq(FakeGroq):
+    """Mimics AsyncGroq.chat.completions.create."""
+
+    async def _astream(self, messages):
+        for i, token in enumerate(self._tokens(self._answer(messages))):
+            if i:
+                await asyncio.sleep(self.token_latency)
+            yield self._chunk(token)
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._astream(messages) if stream else self._response(messages)
+
+class FakeChatDB:
+    """In-memory replacement for the utils.db functions, with an optional per-call latency."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.rows = []
+        self._lock = threading.Lock()
+
+    def init_db(self):
+        pass
+
+    def save_chat(self, user_query, response, agent_name, session_id="default"):
+        time.sleep(self.latency)
+        with self._lock:
+            self.rows.append({"session_id": session_id, "user_query": user_query, "response": response, "agent_name": agent_name})
+
+    def get_chat_history(self, session_id="default", limit=10, before=None):
+        time.sleep(self.latency)
+        with self._lock:
+            rows = [row for row in self.rows if row["session_id"] == session_id]
+            return list(reversed(rows[-limit:]))
+
+class SQLiteChatDB:
+    """utils.db replacement on SQLite (a file, or ':memory:'), with the chat_history schema and session index."""
+
+    def __init__(self, path=":memory:", latency=0.0):
+        self.latency = latency
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.init_db()
+
+    def init_db(self):
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_history ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, user_query TEXT NOT NULL, response TEXT NOT NULL, "
+                "agent_name TEXT NOT NULL, timestamp TEXT NOT NULL, session_id TEXT NOT NULL DEFAULT 'default')"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS chat_history_session_ts_idx ON chat_history (session_id, timestamp DESC, id DESC)")
+            self._conn.commit()
+
+    def save_chat(self, user_query, response, agent_name, session_id="default"):
+        time.sleep(self.latency)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO chat_history (session_id, user_query, response, agent_name, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (session_id, user_query, response, agent_name, datetime.now().isoformat()))
+            self._conn.commit()
+
+    def get_chat_history(self, session_id="default", limit=10, before=None):
+        time.sleep(self.latency)
+        sql = "SELECT id, timestamp, user_query, response, agent_name FROM chat_history WHERE session_id = ?"
+        params = [session_id]
+        if before is not None:
+            sql += " AND (timestamp < ? OR (timestamp = ? AND id < ?))"
+            params += [before[0], before[0], before[1]]
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [{"id": r[0], "timestamp": r[1], "user_query": r[2], "response": r[3], "agent_name": r[4]} for r in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chat_history").fetchone()[0]
+
+class FakeAgent:
+    """Mimics an agno Agent's run() (blocking or stream=True) with FakeGroq timing; counts calls."""
+
+    def __init__(self, name, latency=0.5, token_latency=0.0, tokens=None):
+        self.name = name
+        self.model = SimpleNamespace(id=f"fake-{name}")
+        self.llm = FakeGroq(latency, token_latency, tokens)
+
+    @property
+    def calls(self):
+        return self.llm.calls
+
+    def run(self, message, stream=False):
+        messages = [{"role": "user", "content": message}]
+        if stream:
+            return (SimpleNamespace(content=chunk.choices[0].delta.content)
+                    for chunk in self.llm.create(self.model.id, messages, stream=True))
+        return SimpleNamespace(content=self.llm.create(self.model.id, messages).choices[0].message.content)
+
+def install_fake_db(db=None):
+    """Register `db` as the utils.db module so importing the app needs no Postgres."""
+    import sys
+    import types
+    import utils
+    db = FakeChatDB() if db is None else db
+    module = types.ModuleType("utils.db")
+    for name in ("init_db", "save_chat", "get_chat_history"):
+        setattr(module, name, getattr(db, name))
+    module.DEFAULT_SESSION = "default"
+    module.fake = db
+    sys.modules["utils.db"] = module
+    utils.db = module
+    return db
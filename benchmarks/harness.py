@@ -0,0 +1,269 @@
+"""Offline end-to-end replay: a recorded query mix through ReasoningStockTeam at a target concurrency.
+
+Every upstream is a local stand-in from fakes.py. The agno agents and the
+Groq fallback answer with FakeGroq timing (first-token latency plus a token
+rate). The MCP server runs its real tools over a synthetic price CSV, with
+yfinance replaced by FakeMarketProvider. Chat history lives in SQLite.
+
+The mix is a CSV with a `query` column (or `user_query`, as in a chat_history
+export) and optional `pdf` (1 = asked with the synthetic PDF attached) and
+`weight` columns. Results are written as JSON: throughput, end-to-end and
+first-chunk latency, per-stage latency from utils.metrics (app and MCP
+server), LLM calls, and time and peak memory per phase. --compare prints the
+change against an earlier results file, e.g. one from the previous commit.
+
+    python benchmarks/harness.py --size small --concurrency 8 --requests 200 --out before.json
+    python benchmarks/harness.py --size small --concurrency 8 --requests 200 --out after.json --compare before.json
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from common import ROOT, percentile, report, summarize
+from datagen import SIZES, write_price_csv, write_text_pdf
+from fakes import FakeAgent, FakeAsyncGroq, SQLiteChatDB, install_fake_db
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+db = install_fake_db(SQLiteChatDB())
+
+from agents.coordinator_team import ReasoningStockTeam
+from agents.knowledge_agent import KnowledgeAgent
+from agents.mcp_client import MCPClient
+from agents.memory_agent import MemoryAgent
+from agents.rag_agent import RAGAgent
+from agents.registry import AgentRegistry
+from utils.aio import run_blocking, run_sync
+from utils.llm_cache import LLMResponseCache, MemoryTier, set_llm_cache
+from utils.market_data import MarketDataStore
+from utils.metrics import Metrics, set_metrics
+from utils.rag import get_document_index
+
+MIX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "query_mix.csv")
+OFFLINE_MCP_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "offline_mcp_server.py")
+
+def load_mix(path):
+    """[(query, with_pdf, weight)] from a mix CSV or a chat_history export."""
+    mix = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            query = (row.get("query") or row.get("user_query") or "").strip()
+            if query:
+                mix.append((query, (row.get("pdf") or "0").strip() == "1", float(row.get("weight") or 1)))
+    return mix
+
+def make_workload(mix, requests, sessions, seed=0):
+    rng = random.Random(seed)
+    picks = rng.choices(mix, [weight for _, _, weight in mix], k=requests)
+    return [(query, with_pdf, f"session-{i % sessions}") for i, (query, with_pdf, _) in enumerate(picks)]
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux; it only ever grows, so per phase it is the high-water mark so far
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+@contextmanager
+def phase(name, phases, trace_memory):
+    if trace_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    yield
+    result = {"seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()}
+    if trace_memory:
+        result["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+    phases[name] = result
+
+class OfflineStack:
+    """ReasoningStockTeam wired to the stand-ins; keeps the fakes so their calls can be counted."""
+
+    def __init__(self, args, csv_path):
+        llm = (args.llm_ms / 1000.0, args.token_ms / 1000.0, args.tokens)
+        self.fake_agents = []
+        self.groq = FakeAsyncGroq(*llm)
+        self.store = MarketDataStore(csv_path, snapshot_dir=csv_path + ".snapshot")
+
+        def offline(cls, name):
+            def build():
+                instance = cls()
+                instance.agent = FakeAgent(name, *llm)
+                self.fake_agents.append(instance.agent)
+                return instance
+            return build
+
+        def knowledge():
+            agent = offline(KnowledgeAgent, "KnowledgeAgent")()
+            agent.csv_path, agent.store = csv_path, self.store
+            return agent
+
+        self.team = ReasoningStockTeam()
+        self.team.agents = AgentRegistry({
+            "memory": offline(MemoryAgent, "MemoryAgent"),
+            "knowledge": knowledge,
+            "rag": offline(RAGAgent, "RAGAgent"),
+            "groq_client": lambda: self.groq,
+        })
+        self.team.mcp_client = MCPClient(command=[sys.executable, OFFLINE_MCP_SERVER, csv_path, str(args.provider_ms)])
+
+    def llm_calls(self):
+        return self.groq.calls + sum(agent.calls for agent in self.fake_agents)
+
+async def replay(team, workload, concurrency, pdf_path):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, firsts, agents, errors = [], [], Counter(), Counter()
+
+    async def one(query, with_pdf, session_id):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                agent_name, chunks = await team.process_query_stream(query, pdf_path if with_pdf else None, session_id)
+                parts = []
+                async for chunk in chunks:
+                    if not parts:
+                        firsts.append(time.perf_counter() - start)
+                    parts.append(chunk)
+                latencies.append(time.perf_counter() - start)
+                agents[agent_name] += 1
+                # As main.py: the turn is saved once the answer is complete
+                await run_blocking(db.save_chat, query, "".join(parts), agent_name, session_id)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(*item) for item in workload))
+    return time.perf_counter() - start, latencies, firsts, agents, errors
+
+def latency_stats(samples):
+    stats = summarize(samples)
+    stats["p95_ms"] = percentile(samples, 95) * 1000
+    return stats
+
+def stage_table(rows):
+    table = {}
+    for row in rows:
+        label = row["name"] + "".join(f"[{k}={v}]" for k, v in sorted(row["tags"].items()))
+        table[label] = {k: row[k] for k in ("count", "errors", "p50_ms", "p95_ms", "p99_ms")}
+    return table
+
+def run(args):
+    phases = {}
+    if args.trace_memory:
+        tracemalloc.start()
+    metrics = set_metrics(Metrics(enabled=True))
+    set_llm_cache(LLMResponseCache([MemoryTier()]) if args.llm_cache else LLMResponseCache(enabled=False))
+    workload = make_workload(load_mix(args.mix), args.requests, args.sessions, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        n_symbols, n_days, n_pages = SIZES[args.size]
+        with phase("generate_data", phases, args.trace_memory):
+            csv_path = write_price_csv(os.path.join(tmp, "prices.csv"), n_symbols, n_days)
+            pdf_path = write_text_pdf(os.path.join(tmp, "report.pdf"), n_pages)
+        stack = OfflineStack(args, csv_path)
+        with phase("load_market_data", phases, args.trace_memory):
+            stack.store.data()
+        with phase("index_pdf", phases, args.trace_memory):
+            get_document_index(pdf_path)
+        with phase("start_mcp", phases, args.trace_memory):
+            run_sync(stack.team.initialize_mcp_client())
+            run_sync(stack.team.mcp_client.send("ping", {}))
+        try:
+            with phase("replay", phases, args.trace_memory):
+                elapsed, latencies, firsts, agents, errors = run_sync(
+                    replay(stack.team, workload, args.concurrency, pdf_path))
+            server_stages = run_sync(stack.team.mcp_client.send("metrics", {}))
+        finally:
+            stack.team.mcp_client.close()
+    if args.trace_memory:
+        tracemalloc.stop()
+    return {
+        "benchmark": "harness",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "params": vars(args),
+        "requests": len(workload),
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": latency_stats(latencies),
+        "first_chunk": latency_stats(firsts),
+        "llm_calls": stack.llm_calls(),
+        "chat_rows": len(db),
+        "agents": dict(agents),
+        "errors": dict(errors),
+        "stages": stage_table(metrics.to_json()),
+        "mcp_server_stages": stage_table(server_stages) if isinstance(server_stages, list) else {},
+        "phases": phases,
+    }
+
+def flatten(results):
+    """{"latency.p50_ms": value, "stages.route.p99_ms": value, ...} for the numbers worth comparing."""
+    flat = {"throughput_rps": results["throughput_rps"], "llm_calls": results["llm_calls"]}
+    for section in ("latency", "first_chunk"):
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            flat[f"{section}.{key}"] = results[section][key]
+    for section in ("stages", "mcp_server_stages"):
+        for label, stats in results[section].items():
+            for key in ("p50_ms", "p99_ms"):
+                flat[f"{section}.{label}.{key}"] = stats[key]
+    for name, stats in results["phases"].items():
+        for key, value in stats.items():
+            flat[f"phases.{name}.{key}"] = value
+    return flat
+
+def compare(baseline, current):
+    before, after = flatten(baseline), flatten(current)
+    rows = {}
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        rows[key] = f"{old:.3f} -> {new:.3f} ({change})"
+    report(f"harness compare[{baseline.get('commit')} -> {current.get('commit')}]", rows)
+
+def main(args):
+    results = run(args)
+    report(f"harness[{args.size}, {args.requests} requests, concurrency {args.concurrency}]", {
+        "throughput_rps": results["throughput_rps"],
+        "latency": results["latency"],
+        "first_chunk": results["first_chunk"],
+        "llm_calls": results["llm_calls"],
+        "agents": results["agents"],
+        "errors": results["errors"],
+        **{f"stage {label}": stats for label, stats in results["stages"].items()},
+        **{f"mcp_server {label}": stats for label, stats in results["mcp_server_stages"].items()},
+        **{f"phase {name}": stats for name, stats in results["phases"].items()},
+    })
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", default=MIX_PATH)
+    parser.add_argument("--size", choices=list(SIZES), default="small")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="time to first token")
+    parser.add_argument("--token-ms", type=float, default=10.0, help="delay per following token")
+    parser.add_argument("--tokens", type=int, default=80, help="tokens per answer")
+    parser.add_argument("--provider-ms", type=float, default=50.0, help="fake yfinance latency")
+    parser.add_argument("--llm-cache", action="store_true", help="enable the in-memory LLM response cache")
+    parser.add_argument("--trace-memory", action="store_true", help="also report tracemalloc peaks per phase (slower)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="results JSON from an earlier run to diff against")
+    main(parser.parse_args())
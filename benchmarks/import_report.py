@@ -0,0 +1,84 @@
+"""Import-time report for the two entry points, from `python -X importtime` in a fresh interpreter.
+
+For the Streamlit app the measured statement is main.py's own top-level
+imports (the script itself only runs under Streamlit); for the MCP server it
+is `import agents.mcp_server`. The report gives the total, the heaviest
+top-level packages by self time, and any of LAZY_PACKAGES that were
+imported. Those are meant to load on first use or during warm-up; with
+--check the script exits 1 if one of them is imported at start-up, so a
+stray top-level import is caught as a regression.
+
+    python benchmarks/import_report.py
+    python benchmarks/import_report.py --check --top 15
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from common import APP_DIR, report
+
+ENTRY_POINTS = {
+    "main": ("script", os.path.join(APP_DIR, "main.py")),
+    "mcp_server": ("module", "agents.mcp_server"),
+}
+# Heavy dependencies that must stay off the start-up path
+LAZY_PACKAGES = ("pandas", "sklearn", "scipy", "pyarrow", "groq", "agno", "PyPDF2", "psycopg2", "yfinance")
+MARKER = "-- entry point --"
+
+def import_statements(path):
+    """The top-level import statements of a script, as source."""
+    tree = ast.parse(open(path).read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def measure(kind, target):
+    """[(self_us, cumulative_us, depth, name)] for everything the entry point imports."""
+    statement = import_statements(target) if kind == "script" else f"import {target}"
+    code = f"import sys; sys.stderr.write({MARKER!r} + '\\n'); sys.stderr.flush()\n{statement}"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-u", "-c", code], cwd=APP_DIR,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"{target}: {result.stderr.strip().splitlines()[-1]}")
+    lines = result.stderr.splitlines()
+    # Imports made by site (e.g. .pth files) before the statement runs are not the entry point's
+    lines = lines[lines.index(MARKER) + 1:] if MARKER in lines else lines
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # One space before a top-level name, two more per level of nesting
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return entries
+
+def summarize_imports(entries, top):
+    by_package = {}
+    for self_us, _, _, name in entries:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    heaviest = sorted(by_package.items(), key=lambda item: -item[1])[:top]
+    return {
+        "total_ms": sum(cumulative for _, cumulative, depth, _ in entries if depth == 0) / 1000,
+        "modules": len(entries),
+        "heaviest_packages_ms": ", ".join(f"{package}={us / 1000:.1f}" for package, us in heaviest),
+        "lazy_packages_imported": [package for package in LAZY_PACKAGES if package in by_package],
+    }
+
+def main(args):
+    results = {}
+    for name in args.entry_points:
+        kind, target = ENTRY_POINTS[name]
+        results[name] = summarize_imports(measure(kind, target), args.top)
+    report("import_time", results)
+    violations = {name: result["lazy_packages_imported"] for name, result in results.items() if result["lazy_packages_imported"]}
+    if args.check and violations:
+        print(f"Imported at start-up, expected to load lazily: {violations}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entry-points", nargs="+", default=list(ENTRY_POINTS), choices=list(ENTRY_POINTS))
+    parser.add_argument("--top", type=int, default=10, help="heaviest packages listed")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a LAZY_PACKAGES module is imported")
+    main(parser.parse_args())
@@ -0,0 +1,24 @@
+"""The MCP server's real tools over a given market data CSV, with yfinance replaced by FakeMarketProvider.
+
+Started by harness.py through MCPClient(command=...):
+
+    python benchmarks/offline_mcp_server.py <csv_path> [provider_latency_ms]
+"""
+import asyncio
+import os
+import sys
+import common  # puts app/ on sys.path
+from fakes import FakeMarketProvider
+
+from agents import mcp_server
+from utils.market_cache import MarketDataCache, set_market_cache
+from utils.market_data import MarketDataStore
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1]
+    latency = float(sys.argv[2]) / 1000.0 if len(sys.argv) > 2 else 0.05
+    mcp_server.store = MarketDataStore(csv_path, snapshot_dir=csv_path + ".snapshot")
+    set_market_cache(MarketDataCache(provider=FakeMarketProvider(latency)))
+    if os.getenv("MCP_METRICS_PORT"):
+        mcp_server.serve_metrics(int(os.getenv("MCP_METRICS_PORT")))
+    asyncio.run(mcp_server.app.run())
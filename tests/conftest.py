@@ -0,0 +1,8 @@
+"""Puts app/ (imported as `agents.*` / `utils.*`) and benchmarks/ (for the fakes) on sys.path."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "app"), os.path.join(ROOT, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
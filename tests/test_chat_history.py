@@ -0,0 +1,20 @@
+from utils import db
+
+def test_pages_through_turns_not_yet_written(monkeypatch):
+    # Postgres holds nothing and the writer never runs, so every page must come from the cache
+    monkeypatch.setattr(db, "recent_history", db.RecentHistoryCache())
+    monkeypatch.setattr(db, "fetch_chat_history", lambda session_id, limit=db.HISTORY_LIMIT, before=None: [])
+    monkeypatch.setattr(db.chat_writer, "submit", lambda row: None)
+    db.get_chat_history("s")
+    for i in range(5):
+        db.save_chat(f"q{i}", f"a{i}", "Agent", "s")
+
+    first = db.get_chat_history("s", limit=2)
+    assert [row["user_query"] for row in first] == ["q4", "q3"]
+    assert first[-1]["id"] is None
+    second = db.get_chat_history("s", limit=2, before=(first[-1]["timestamp"], first[-1]["id"]))
+    assert [row["user_query"] for row in second] == ["q2", "q1"]
+
+def test_row_timestamps_strictly_increase():
+    stamps = [db._stamp() for _ in range(1000)]
+    assert all(a < b for a, b in zip(stamps, stamps[1:]))
@@ -0,0 +1,38 @@
+import asyncio
+import numpy as np
+import pytest
+from datagen import make_price_frame
+from fakes import FakeMarketProvider
+
+from agents import mcp_server
+from utils.forecast import ForecastCache, set_forecast_cache
+from utils.market_cache import MarketDataCache, set_market_cache
+from utils.market_data import MarketDataStore
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    frame = make_price_frame(n_symbols=3, n_days=60)
+    # AAB has no closes at all
+    frame.loc[frame["Symbol"] == "AAB", "Close"] = np.nan
+    csv_path = tmp_path / "prices.csv"
+    frame.to_csv(csv_path, index=False)
+    monkeypatch.setattr(mcp_server, "store", MarketDataStore(str(csv_path), snapshot_dir=str(tmp_path / "snapshot")))
+    set_forecast_cache(ForecastCache())
+    set_market_cache(MarketDataCache(provider=FakeMarketProvider(0)))
+    yield mcp_server
+    set_forecast_cache(None)
+    set_market_cache(None)
+
+def test_predict_without_closes_reports_no_data(server):
+    assert asyncio.run(server.predict_stock_price({"market": "AAB"})) == {"error": "No historical data for AAB"}
+    assert "result" in asyncio.run(server.predict_stock_price({"market": "AAA"}))
+
+def test_batch_prediction_survives_a_symbol_without_closes(server):
+    params = {"symbols": ["AAA", "AAB", "AAC", "XYZQ"], "days_ahead": 5}
+    results = asyncio.run(server.predict_stock_price_batch(params))["result"]
+    assert float(results["AAA"]["result"]) > 0
+    assert float(results["AAC"]["result"]) > 0
+    assert results["AAB"] == {"error": "No historical data for AAB"}
+    assert results["XYZQ"] == {"error": "No historical data for XYZQ"}
+    # Models now cached: the incremental path as well
+    assert asyncio.run(server.predict_stock_price_batch(params))["result"] == results
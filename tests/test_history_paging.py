@@ -0,0 +1,35 @@
+import asyncio
+import numpy as np
+from datagen import write_price_csv
+
+from agents import mcp_server
+from agents.coordinator_team import HISTORY_MAX_BARS, format_history, history_params
+from utils import bars
+from utils.market_data import MarketDataStore, format_dates
+
+def series(n):
+    days = np.datetime64('2020-01-01') + np.arange(n)
+    return {'Date': days, 'Open': np.arange(n, dtype=np.float64), 'Close': np.arange(n, dtype=np.float64)}
+
+def test_tail_pages_back_from_newest_bar():
+    full = series(10)
+    first, cursor = bars.page(full, limit=4, tail=True)
+    assert first['Close'].tolist() == [6, 7, 8, 9]
+    second, cursor = bars.page(full, limit=4, cursor=cursor, tail=True)
+    assert second['Close'].tolist() == [2, 3, 4, 5]
+    last, cursor = bars.page(full, limit=4, cursor=cursor, tail=True)
+    assert last['Close'].tolist() == [0, 1]
+    assert cursor is None
+
+def test_default_history_request_returns_recent_bars(tmp_path, monkeypatch):
+    csv_path = write_price_csv(str(tmp_path / "prices.csv"), n_symbols=2, n_days=600)
+    store = MarketDataStore(csv_path, snapshot_dir=str(tmp_path / "snapshot"))
+    monkeypatch.setattr(mcp_server, "store", store)
+    newest = format_dates(store.get_range("AAA")['Date'][-1:])[0]
+    params = {"market": "AAA", "period": "1mo", **history_params(None)}
+    result = asyncio.run(mcp_server.fetch_historical_data(params))["result"]
+    page = bars.decode(result["data"], result["format"])
+    assert len(page['Date']) == HISTORY_MAX_BARS
+    assert format_dates(page['Date'][-1:])[0] == newest
+    assert result["summary"]["end"] == newest
+    assert format_history(result).startswith("...")
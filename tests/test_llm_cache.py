@@ -0,0 +1,104 @@
+import asyncio
+from fakes import FakeAsyncGroq
+
+from agents.coordinator_team import ReasoningStockTeam
+from agents.registry import AgentRegistry
+from utils.llm_cache import LLMResponseCache, MemoryTier, SQLiteTier, cache_from_env, set_llm_cache
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def counting(answer):
+    calls = []
+
+    def call():
+        calls.append(1)
+        return answer
+    return call, calls
+
+def test_hit_after_miss_ignores_case_and_punctuation():
+    cache = LLMResponseCache([MemoryTier()])
+    call, calls = counting("42")
+    assert cache.get_or_call("fallback", "m", "What is the answer?", call) == "42"
+    assert cache.get_or_call("fallback", "m", "  what is the ANSWER ", call) == "42"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_entries_expire_after_route_ttl():
+    clock = Clock()
+    cache = LLMResponseCache([MemoryTier()], ttls={"fallback": 60}, clock=clock)
+    call, calls = counting("42")
+    cache.get_or_call("fallback", "m", "question", call)
+    clock.now += 59
+    cache.get_or_call("fallback", "m", "question", call)
+    assert len(calls) == 1
+    clock.now += 2
+    cache.get_or_call("fallback", "m", "question", call)
+    assert len(calls) == 2
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = LLMResponseCache([MemoryTier(max_entries=2)])
+    call, calls = counting("answer")
+    for prompt in ("a", "b", "a", "c"):
+        cache.get_or_call("fallback", "m", prompt, call)
+    assert len(calls) == 3
+    cache.get_or_call("fallback", "m", "a", call)
+    assert len(calls) == 3
+    cache.get_or_call("fallback", "m", "b", call)
+    assert len(calls) == 4
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    call, calls = counting("42")
+    LLMResponseCache([MemoryTier(), SQLiteTier(path)]).get_or_call("fallback", "m", "question", call)
+    assert LLMResponseCache([MemoryTier(), SQLiteTier(path)]).get_or_call("fallback", "m", "question", call) == "42"
+    assert len(calls) == 1
+
+def test_empty_answers_and_time_sensitive_queries_are_not_cached():
+    cache = LLMResponseCache([MemoryTier()])
+    call, calls = counting("")
+    cache.get_or_call("fallback", "m", "question", call)
+    cache.get_or_call("fallback", "m", "question", call)
+    call, news = counting("headline")
+    cache.get_or_call("fallback", "m", "latest news on NVDA", call)
+    cache.get_or_call("fallback", "m", "latest news on NVDA", call)
+    assert len(calls) == 2 and len(news) == 2
+
+def test_llm_cache_off_bypasses(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE", "off")
+    cache = cache_from_env()
+    call, calls = counting("42")
+    cache.get_or_call("fallback", "m", "question", call)
+    cache.get_or_call("fallback", "m", "question", call)
+    assert len(calls) == 2
+    assert cache.stats()["bypassed"] == 2 and cache.stats()["hits"] == 0
+
+def fallback_team(cache):
+    set_llm_cache(cache)
+    groq = FakeAsyncGroq(latency=0)
+    team = ReasoningStockTeam()
+    team.agents = AgentRegistry({"groq_client": lambda: groq})
+    return team, groq
+
+def test_fallback_stream_is_served_from_cache():
+    team, groq = fallback_team(LLMResponseCache([MemoryTier()]))
+    try:
+        first = asyncio.run(team.fallback_groq_query("Explain dividends", "no history"))
+        second = asyncio.run(team.fallback_groq_query("explain dividends?", "no history"))
+    finally:
+        set_llm_cache(None)
+    assert first == second == "stub answer to: Explain dividends"
+    assert groq.calls == 1
+
+def test_fallback_stream_without_cache_calls_upstream_each_time():
+    team, groq = fallback_team(LLMResponseCache(enabled=False))
+    try:
+        for _ in range(2):
+            asyncio.run(team.fallback_groq_query("Explain dividends", "no history"))
+    finally:
+        set_llm_cache(None)
+    assert groq.calls == 2
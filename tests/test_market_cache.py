@@ -0,0 +1,131 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import pytest
+from fakes import FakeMarketProvider
+
+from utils import market_cache
+from utils.market_cache import QUOTE_TTL, RECENT_TTL, MarketDataCache, estimate_size
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_cache(latency=0.0, **kwargs):
+    provider = FakeMarketProvider(latency)
+    return MarketDataCache(provider=provider, today=lambda: date(2025, 6, 30), **kwargs), provider
+
+def test_repeated_request_is_served_from_cache():
+    cache, provider = make_cache()
+    first = cache.history("nvda", period="1mo")
+    second = cache.history("NVDA", period="1mo")
+    assert second is first
+    assert provider.calls == 1
+    assert cache.stats()["hits"] == 1
+
+def test_concurrent_misses_share_one_fetch():
+    cache, provider = make_cache(latency=0.2)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(lambda _: cache.history("NVDA", period="1mo"), range(8)))
+    assert provider.calls == 1
+    assert all(frame is frames[0] for frame in frames)
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] + stats["hits"] == 7
+
+def test_failed_fetch_is_not_cached_and_reaches_waiters():
+    cache, _ = make_cache()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(cache.get_or_fetch, ("NVDA", "1d", "1mo"), failing, RECENT_TTL)
+        started.wait(5)
+        waiter = pool.submit(cache.get_or_fetch, ("NVDA", "1d", "1mo"), lambda: "fresh", RECENT_TTL)
+        release.set()
+        with pytest.raises(RuntimeError):
+            leader.result()
+        with pytest.raises(RuntimeError):
+            waiter.result()
+    assert cache.get_or_fetch(("NVDA", "1d", "1mo"), lambda: "fresh", RECENT_TTL) == "fresh"
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache, provider = make_cache(clock=clock)
+    cache.history("NVDA", period="1d")
+    clock.now += QUOTE_TTL - 1
+    cache.history("NVDA", period="1d")
+    assert provider.calls == 1
+    clock.now += 2
+    cache.history("NVDA", period="1d")
+    assert provider.calls == 2
+
+def test_ttl_depends_on_range():
+    cache, _ = make_cache()
+    assert cache.ttl_for(period="1d") == QUOTE_TTL
+    assert cache.ttl_for(period="1y") == RECENT_TTL
+    assert cache.ttl_for(interval="5m", period="1mo") == QUOTE_TTL
+    assert cache.ttl_for(start="2024-01-01", end="2024-02-01") is None
+    assert cache.ttl_for(start="2025-06-01", end="2025-07-01") == RECENT_TTL
+
+def test_least_recently_used_evicted_by_bytes():
+    probe, _ = make_cache()
+    size = estimate_size(probe.history("AAA", period="1mo"))
+    cache, provider = make_cache(max_bytes=int(size * 2.5))
+    for symbol in ("AAA", "BBB", "AAA", "CCC"):
+        cache.history(symbol, period="1mo")
+    assert provider.calls == 3
+    assert cache.stats()["evictions"] == 1
+    cache.history("AAA", period="1mo")
+    assert provider.calls == 3
+    cache.history("BBB", period="1mo")
+    assert provider.calls == 4
+
+def test_history_many_fetches_only_missing_symbols_in_one_request():
+    cache, provider = make_cache()
+    cache.history("AAA", period="1mo")
+    frames = cache.history_many(["AAA", "BBB", "CCC"], period="1mo")
+    assert list(frames) == ["AAA", "BBB", "CCC"]
+    assert provider.calls == 2
+    cache.history_many(["BBB", "CCC"], period="1mo")
+    assert provider.calls == 2
+
+def test_empty_results_are_retried_soon():
+    clock = Clock()
+    cache, provider = make_cache(clock=clock)
+    assert cache.history("XYZQ", start="2024-01-01", end="2024-02-01").empty
+    clock.now += QUOTE_TTL + 1
+    cache.history("XYZQ", start="2024-01-01", end="2024-02-01")
+    assert provider.calls == 2
+
+def test_failed_store_reaches_waiters(monkeypatch):
+    cache, _ = make_cache()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "fetched"
+
+    def unsizable(value):
+        raise ValueError("cannot size")
+
+    monkeypatch.setattr(market_cache, "estimate_size", unsizable)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(cache.get_or_fetch, ("NVDA", "1d", "1mo"), slow, RECENT_TTL)
+        started.wait(5)
+        waiter = pool.submit(cache.get_or_fetch, ("NVDA", "1d", "1mo"), lambda: "fresh", RECENT_TTL)
+        release.set()
+        with pytest.raises(ValueError):
+            leader.result(5)
+        with pytest.raises(ValueError):
+            waiter.result(5)
+        with pytest.raises(ValueError):
+            cache.history_many(["NVDA", "TSLA"], period="1mo")
+    assert not cache._inflight
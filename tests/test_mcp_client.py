@@ -0,0 +1,20 @@
+import asyncio
+import sys
+
+from agents.mcp_client import MCPClient
+
+# Reads requests and never answers, like a server stuck in a tool
+SILENT_SERVER = [sys.executable, "-c", "import sys\nfor line in sys.stdin: pass"]
+
+def test_timed_out_requests_are_not_left_pending():
+    client = MCPClient(command=SILENT_SERVER)
+
+    async def calls():
+        return await asyncio.gather(*(client.send("fetch_stock_price", {"symbol": "NVDA"}, timeout=0.05) for _ in range(5)))
+
+    try:
+        replies = asyncio.run(calls())
+    finally:
+        client.close()
+    assert replies == ["MCP request fetch_stock_price timed out"] * 5
+    assert client.pending == {}
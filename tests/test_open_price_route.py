@@ -0,0 +1,32 @@
+import asyncio
+import pytest
+from fakes import FakeAgent
+
+from agents import knowledge_agent, router
+from agents.coordinator_team import ReasoningStockTeam
+from agents.registry import AgentRegistry
+
+@pytest.fixture
+def team(monkeypatch):
+    # The agno agent is replaced by a counting fake below; its tools and model are never used
+    for name in ("Agent", "Groq", "CachedYFinanceTools", "ReasoningTools"):
+        monkeypatch.setattr(knowledge_agent, name, lambda *args, **kwargs: None)
+    knowledge = knowledge_agent.KnowledgeAgent()
+    knowledge.agent = FakeAgent("KnowledgeAgent", latency=0)
+    team = ReasoningStockTeam()
+    team.agents = AgentRegistry({"knowledge": lambda: knowledge})
+    return team, knowledge.agent
+
+@pytest.mark.parametrize("query, expected", [
+    ("What was the opening price on 4/10/2025", "The market open price on April 10, 2025 was 18.08."),
+    ("What was the open price on 5th May", "The market open price on May 05, 2025 (assuming 2025) was 18.98."),
+    ("What is the market open price on 4/10/2025", "The market open price on April 10, 2025 was 18.08."),
+])
+def test_open_price_queries_are_answered_from_csv(team, query, expected):
+    team, agent = team
+    intent = team.router.route(query)
+    assert intent.name == router.OPEN_PRICE and team.router.is_confident(intent)
+    answer, agent_name = asyncio.run(team.answer_intent(intent, query, None, None))
+    assert agent_name == "KnowledgeAgent"
+    assert answer.startswith(expected)
+    assert agent.calls == 0
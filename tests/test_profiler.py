@@ -0,0 +1,41 @@
+import asyncio
+import pstats
+import time
+
+from utils.aio import run_blocking
+from utils.metrics import RequestProfiler
+
+def blocking_marker():
+    time.sleep(0.01)
+    return "done"
+
+def other_request_marker():
+    time.sleep(0.01)
+
+def functions(path):
+    return {name for _, _, name in pstats.Stats(path).stats}
+
+def test_executor_work_is_in_the_request_profile(tmp_path):
+    async def request():
+        profiler = RequestProfiler("what is up", "session1234", directory=str(tmp_path)).start()
+        assert await run_blocking(blocking_marker) == "done"
+        return profiler.stop()
+
+    path = asyncio.run(request())
+    assert "session1" in path
+    assert "blocking_marker" in functions(path)
+
+def test_other_requests_executor_work_is_not_captured(tmp_path):
+    async def unprofiled():
+        await run_blocking(other_request_marker)
+
+    async def request():
+        profiler = RequestProfiler("profiled", directory=str(tmp_path)).start()
+        # A different task context, as another session's request would be
+        await asyncio.get_running_loop().run_in_executor(None, asyncio.run, unprofiled())
+        await run_blocking(blocking_marker)
+        return profiler.stop()
+
+    names = functions(asyncio.run(request()))
+    assert "blocking_marker" in names
+    assert "other_request_marker" not in names
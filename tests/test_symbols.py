@@ -0,0 +1,17 @@
+from agents.router import IntentRouter
+from utils.symbols import SymbolResolver
+
+def resolver():
+    return SymbolResolver({"AAPL": {"apple"}, "MSFT": {"microsoft"}, "NVDA": {"nvidia"}})
+
+def test_all_caps_words_are_not_tickers():
+    query = "WHAT IS THE PRICE OF APPLE"
+    assert resolver().resolve_all(query) == ["AAPL"]
+    assert resolver().resolve("WHAT IS THE PRICE") is None
+    assert "symbols" not in IntentRouter(resolver=resolver()).route(query).params
+
+def test_unknown_tickers_beside_known_matches_need_a_dollar():
+    assert resolver().resolve_all("Compare Apple and ZZZZ") == ["AAPL"]
+    assert resolver().resolve_all("Compare Apple and $ZZZZ") == ["AAPL", "ZZZZ"]
+    assert resolver().resolve_all("Compare ZZZZ and QQQQ") == ["ZZZZ", "QQQQ"]
+    assert resolver().resolve_all("COMPARE NVDA AND $ZZZZ") == ["NVDA", "ZZZZ"]